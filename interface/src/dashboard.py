@@ -1,10 +1,13 @@
 import streamlit as st
-from utils.dockermanager import DockerManager
-from utils.monitoring import get_container_metrics
+from utils.dockermanager import get_docker_manager
+from utils.monitoring import get_fleet_metrics
 import time
 import os
 
-docker_manager = DockerManager()
+docker_manager = get_docker_manager()
+
+# Seconds between metric refreshes, matching the query cache TTL.
+METRICS_REFRESH_INTERVAL = 1.0
 
 def load_css():
     css_file = os.path.join(os.path.dirname(__file__), "public", "css", "style.css")
@@ -48,80 +51,106 @@ def display_container(container):
         except Exception as e:
             st.error(f"Failed to restart container {name}: {str(e)}")
 
+def display_metrics(metrics):
+    st.subheader("Metrics")
+    metrics_grid = [
+        ("CPU Usage", f"{metrics['cpu_usage']}%", "💻"),
+        ("Memory Usage", f"{metrics['memory_usage']['percentage']}%", "🧠"),
+        ("Memory Used", f"{metrics['memory_usage']['usage_mb']} MB", "📊"),
+        ("Memory Limit", f"{metrics['memory_usage']['limit_mb']} MB", "🚫"),
+        ("Disk Usage", f"{metrics['disk_usage']} MB", "💾"),
+        ("Network Receive", f"{metrics['network_traffic']['receive']} KB/s", "📥"),
+        ("Network Transmit", f"{metrics['network_traffic']['transmit']} KB/s", "📤"),
+        ("I/O Read", f"{metrics['io_usage']['read']} MB/s", "📖"),
+        ("I/O Write", f"{metrics['io_usage']['write']} MB/s", "✍️"),
+        ("Processes", f"{metrics['processes']}", "🔢"),
+        ("CPU Throttling", f"{metrics['cpu_throttling']['throttling_ratio']}%", "🐢"),
+    ]
+
+    for i in range(0, len(metrics_grid), 3):
+        cols = st.columns(3)
+        for j in range(3):
+            if i + j < len(metrics_grid):
+                label, value, icon = metrics_grid[i + j]
+                with cols[j]:
+                    st.markdown(f"""
+                    <div class="metric-card">
+                        <div class="metric-value">{value}</div>
+                        <div class="metric-label"><span class="metric-icon">{icon}</span> {label}</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+def display_fleet(fleet):
+    st.subheader("Fleet")
+    st.dataframe([{
+        'Container': name,
+        'CPU (%)': metrics['cpu_usage'],
+        'Memory (MB)': metrics['memory_usage']['usage_mb'],
+        'Memory (%)': metrics['memory_usage']['percentage'],
+        'Receive (KB/s)': metrics['network_traffic']['receive'],
+        'Transmit (KB/s)': metrics['network_traffic']['transmit'],
+    } for name, metrics in fleet.items()], use_container_width=True, hide_index=True)
+
+def display_quick_links(containers):
+    st.subheader("Quick Links")
+    
+    st.markdown('<div class="quick-links">', unsafe_allow_html=True)
+    for container in containers:
+        if not container['ports']:
+            continue
+        
+        name = container['name']
+        status = container['status']
+        ports = container['ports']
+        
+        status_class = {
+            'running': 'status-running',
+            'exited': 'status-stopped'
+        }.get(status, 'status-other')
+        
+        link = f"http://localhost:{ports[0].split(':')[0]}"
+        
+        st.markdown(f"""
+        <div class="quick-link">
+            <span class="quick-link-icon">🐳</span>
+            <strong>{name.upper()}</strong>
+            <a href={link}>{link}</a>
+            <div class="container-status {status_class}">{status.upper()}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
 def main():
     st.title("LogWatcher Dashboard")
 
     configuration = st.selectbox("Select Configuration", [x['name'] for x in docker_manager.list_containers(all=True, networks=['monitoring'])])
     
-    dashboard_page = st.empty()
+    col1, col2 = st.columns([2, 1])
+    metrics_page = col1.empty()
+    links_page = col2.empty()
+    containers_page = st.empty()
 
+    # Metrics refresh every tick; the container views only redraw when the registry reports a change.
+    seen_version = -1
     while True:
-        metrics = get_container_metrics(configuration)
-        containers = docker_manager.list_containers(all=True, networks=['monitoring'])
-        with dashboard_page.container():
-            col1, col2 = st.columns([2, 1])
-
-            with col1:
-                st.subheader("Metrics")
-                metrics_grid = [
-                    ("CPU Usage", f"{metrics['cpu_usage']}%", "💻"),
-                    ("Memory Usage", f"{metrics['memory_usage']['percentage']}%", "🧠"),
-                    ("Memory Used", f"{metrics['memory_usage']['usage_mb']} MB", "📊"),
-                    ("Memory Limit", f"{metrics['memory_usage']['limit_mb']} MB", "🚫"),
-                    ("Disk Usage", f"{metrics['disk_usage']} MB", "💾"),
-                    ("Network Receive", f"{metrics['network_traffic']['receive']} KB/s", "📥"),
-                    ("Network Transmit", f"{metrics['network_traffic']['transmit']} KB/s", "📤"),
-                    ("I/O Read", f"{metrics['io_usage']['read']} MB/s", "📖"),
-                    ("I/O Write", f"{metrics['io_usage']['write']} MB/s", "✍️"),
-                    ("Processes", f"{metrics['processes']}", "🔢"),
-                    ("CPU Throttling", f"{metrics['cpu_throttling']['throttling_ratio']}%", "🐢"),
-                ]
-
-                for i in range(0, len(metrics_grid), 3):
-                    cols = st.columns(3)
-                    for j in range(3):
-                        if i + j < len(metrics_grid):
-                            label, value, icon = metrics_grid[i + j]
-                            with cols[j]:
-                                st.markdown(f"""
-                                <div class="metric-card">
-                                    <div class="metric-value">{value}</div>
-                                    <div class="metric-label"><span class="metric-icon">{icon}</span> {label}</div>
-                                </div>
-                                """, unsafe_allow_html=True)
-
-            with col2:
-                st.subheader("Quick Links")
-                
-                st.markdown('<div class="quick-links">', unsafe_allow_html=True)
-                for container in containers:
-                    if not container['ports']:
-                        continue
-                    
-                    name = container['name']
-                    status = container['status']
-                    ports = container['ports']
-                    
-                    status_class = {
-                        'running': 'status-running',
-                        'exited': 'status-stopped'
-                    }.get(status, 'status-other')
-                    
-                    link = f"http://localhost:{ports[0].split(':')[0]}"
-                    
-                    st.markdown(f"""
-                    <div class="quick-link">
-                        <span class="quick-link-icon">🐳</span>
-                        <strong>{name.upper()}</strong>
-                        <a href={link}>{link}</a>
-                        <div class="container-status {status_class}">{status.upper()}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                st.markdown('</div>', unsafe_allow_html=True)
-
-            display_all_containers(containers)
+        version = docker_manager.wait_for_container_change(seen_version, timeout=METRICS_REFRESH_INTERVAL)
+        if version != seen_version:
+            seen_version = version
+            containers = docker_manager.list_containers(all=True, networks=['monitoring'])
+            names = sorted({container['name'] for container in containers} | ({configuration} if configuration else set()))
+            with links_page.container():
+                display_quick_links(containers)
+            with containers_page.container():
+                display_all_containers(containers)
 
-        time.sleep(0.1)
+        if not names:
+            continue
+        # One query per metric for every container, instead of a snapshot per container.
+        fleet = get_fleet_metrics(names)
+        with metrics_page.container():
+            if configuration:
+                display_metrics(fleet[configuration])
+            display_fleet(fleet)
 
 if __name__ == "__main__":
     try:
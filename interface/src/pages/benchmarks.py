@@ -1,16 +1,23 @@
 # pages/benchmarks.py
 
+import datetime
+import functools
+import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 from utils.benchmarking import ContainerBenchmark
-from utils.dockermanager import DockerManager
+from utils.benchstore import compare_runs, get_benchmark_store
+from utils.loadgen import LoadResult
+from utils.scenario import Scenario, ScenarioError, list_scenarios
+from utils.dockermanager import get_docker_manager
 import os 
 def load_css():
     css_file = os.path.join(os.path.dirname(__file__), "..", "public", "css", "style.css")
     with open(css_file, "r") as f:
         st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
-docker_manager = DockerManager()
+docker_manager = get_docker_manager()
 
 def plot_benchmark_results(results):
     fig = go.Figure()
@@ -18,14 +25,14 @@ def plot_benchmark_results(results):
     if 'cpu' in results:
         fig.add_trace(go.Bar(x=['CPU Avg', 'CPU Max', 'CPU Min'], 
                              y=[results['cpu']['average'], results['cpu']['max'], results['cpu']['min']],
-                             name='CPU Usage (%)', marker_color='blue'))
+                             name='CPU Usage Under Load (%)', marker_color='blue'))
 
     if 'memory' in results:
         fig.add_trace(go.Bar(x=['Memory Avg', 'Memory Max', 'Memory Min'], 
                              y=[results['memory']['average'], results['memory']['max'], results['memory']['min']],
-                             name='Memory Usage (MB)', marker_color='green'))
+                             name='Memory Usage Under Load (MB)', marker_color='green'))
 
-    if 'http' in results:
+    if 'http' in results and results['http']['total_requests']:
         fig.add_trace(go.Bar(x=['Requests/s', 'Success Rate'], 
                              y=[results['http']['requests_per_second'], 
                                 results['http']['successful_requests'] / results['http']['total_requests'] * 100],
@@ -34,6 +41,310 @@ def plot_benchmark_results(results):
     fig.update_layout(title='Benchmark Results', barmode='group')
     st.plotly_chart(fig)
 
+def plot_latency(load_result):
+    summary = load_result.summary()
+    latency = summary['latency']
+    client_cpu = summary['client_cpu']
+    if client_cpu['saturated']:
+        st.warning(f"A load worker used {client_cpu['max_worker_percent']:.0f}% of a core: the load generator may be "
+                   "the bottleneck. Add worker processes.")
+    else:
+        st.caption(f"Load generator CPU: {client_cpu['total_percent']:.0f}% of one core across "
+                   f"{client_cpu['workers']} worker(s), busiest {client_cpu['max_worker_percent']:.0f}%")
+    percentiles = [key for key in latency if key.startswith('p')]
+    cols = st.columns(len(percentiles))
+    for col, key in zip(cols, percentiles):
+        col.metric(key[:-3].replace('_', '.'), f"{latency[key]:.1f} ms" if latency[key] is not None else "N/A")
+
+    buckets = list(load_result.histogram.buckets())
+    if buckets:
+        fig = go.Figure(go.Bar(x=[bound * 1000 for bound, _ in buckets], y=[count for _, count in buckets],
+                               marker_color='red'))
+        fig.update_layout(title='Latency Distribution', xaxis_title='Latency (ms)', yaxis_title='Requests',
+                          xaxis_type='log')
+        st.plotly_chart(fig)
+
+    if load_result.errors:
+        st.subheader("Errors")
+        st.table([{"error": error, "count": count} for error, count in summary['errors'].items()])
+
+def plot_timeline(timeline, stages=()):
+    """Throughput, latency, CPU, memory, network and throttling on one shared time axis, with stage boundaries."""
+    seconds = [row['second'] for row in timeline]
+    panels = [
+        ("Throughput (req/s)", [("requests/s", 'requests_per_second'), ("errors/s", 'errors_per_second')]),
+        ("Mean Latency (ms)", [("latency", 'mean_latency_ms')]),
+        ("CPU (%)", [("average", 'cpu_average'), ("max", 'cpu_max'), ("throttled periods", 'cpu_throttling')]),
+        ("Memory (MB)", [("memory", 'memory_mb')]),
+        ("Network (B/s)", [("receive", 'network_receive'), ("transmit", 'network_transmit')]),
+    ]
+    fig = make_subplots(rows=len(panels), cols=1, shared_xaxes=True, vertical_spacing=0.03,
+                        subplot_titles=[title for title, _ in panels])
+    for row, (_, series) in enumerate(panels, start=1):
+        for name, key in series:
+            fig.add_trace(go.Scatter(x=seconds, y=[r[key] for r in timeline], mode='lines', name=name), row=row, col=1)
+    for name, start in stages:
+        fig.add_vline(x=start, line_dash='dot', line_color='gray', annotation_text=name, annotation_position='top right')
+    fig.update_layout(height=180 * len(panels), showlegend=False)
+    fig.update_xaxes(title_text="Seconds since start of measurement", row=len(panels), col=1)
+    st.plotly_chart(fig, use_container_width=True)
+
+def describe_params(params):
+    if params.get('sizing'):
+        return f"{params.get('base_url')} · sizing with scenario {params.get('scenario')}"
+    if params.get('sweep'):
+        return f"{params.get('url')} · capacity sweep · p99 ≤ {params.get('p99_slo_ms')} ms"
+    if 'scenario' in params:
+        return f"{params.get('base_url')} · scenario {params['scenario']} · {len(params.get('stages', []))} stages"
+    load = f"rate {params['rate']}/s" if params.get('rate') else f"concurrency {params.get('concurrency')}"
+    length = f"{params['duration']}s" if params.get('duration') else f"{params.get('num_requests')} requests"
+    return f"{params.get('url')} · {load} · {length}"
+
+def plot_latency_cdf(groups):
+    fig = go.Figure()
+    for name, result in groups:
+        seen, xs, ys = 0, [], []
+        for bound, count in result.histogram.buckets():
+            seen += count
+            xs.append(bound * 1000)
+            ys.append(seen / result.histogram.total * 100)
+        fig.add_trace(go.Scatter(x=xs, y=ys, mode='lines', name=name))
+    fig.update_layout(title='Latency CDF', xaxis_title='Latency (ms)', yaxis_title='Requests (%)', xaxis_type='log')
+    st.plotly_chart(fig)
+
+def show_history(container_name):
+    store = get_benchmark_store()
+    runs = store.runs(container=container_name)
+    if not runs:
+        st.info("No stored benchmark runs for this container yet.")
+        return
+
+    st.dataframe(pd.DataFrame([{
+        'id': run['id'],
+        'time': datetime.datetime.fromtimestamp(run['created_at']).strftime('%Y-%m-%d %H:%M:%S'),
+        'image': run['image'],
+        'host': run['host'],
+        'parameters': describe_params(run['params']),
+        'requests/s': run['summary'].get('http', {}).get('requests_per_second'),
+        'p50 (ms)': run['summary'].get('http', {}).get('latency', {}).get('p50_ms'),
+        'p99 (ms)': run['summary'].get('http', {}).get('latency', {}).get('p99_ms'),
+        'error rate': run['summary'].get('http', {}).get('error_rate'),
+    } for run in runs]), use_container_width=True)
+
+    st.subheader("Compare Image Tags")
+    by_key = {}
+    for run in runs:
+        by_key.setdefault(run['params_key'], []).append(run)
+    key = st.selectbox("Parameter Set", list(by_key), format_func=lambda k: describe_params(by_key[k][0]['params']))
+    hosts = sorted({run['host'] for run in by_key[key]})
+    host = st.selectbox("Host", hosts)
+    group = [run for run in by_key[key] if run['host'] == host]
+    images = list(dict.fromkeys(run['image'] for run in group))
+    if len(group) < 2:
+        st.info("Need at least two runs with these parameters on this host to compare.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        baseline_image = st.selectbox("Baseline", images, index=min(1, len(images) - 1))
+    with col2:
+        candidate_image = st.selectbox("Candidate", images, index=0)
+    baseline = [store.load(run['id'])['load_result'] for run in group if run['image'] == baseline_image]
+    candidate = [store.load(run['id'])['load_result'] for run in group if run['image'] == candidate_image]
+    if baseline_image == candidate_image:
+        # Same tag on both sides: compare the latest run against the ones before it.
+        baseline, candidate = baseline[1:], baseline[:1]
+    baseline = [result for result in baseline if result is not None]
+    candidate = [result for result in candidate if result is not None]
+    if not baseline or not candidate:
+        st.info("Nothing to compare yet.")
+        return
+
+    comparison = compare_runs(baseline, candidate)
+    p50, p99 = comparison['latency_change']['p50_ms'], comparison['latency_change']['p99_ms']
+    throughput = comparison['throughput_change']
+    col1, col2, col3 = st.columns(3)
+    col1.metric("p50 latency", f"{comparison['candidate']['latency']['p50_ms']} ms",
+                f"{p50 * 100:+.1f}%" if p50 is not None else None, delta_color="inverse")
+    col2.metric("p99 latency", f"{comparison['candidate']['latency']['p99_ms']} ms",
+                f"{p99 * 100:+.1f}%" if p99 is not None else None, delta_color="inverse")
+    col3.metric("Throughput", f"{comparison['throughput_test']['candidate_mean'] or 0:.1f} req/s",
+                f"{throughput * 100:+.1f}%" if throughput is not None else None)
+
+    latency_p = comparison['latency_test']['p_value']
+    throughput_p = comparison['throughput_test']['p_value']
+    st.caption(f"Mann-Whitney U on latency: p = {latency_p:.3g}" if latency_p is not None else "Latency test: not enough data")
+    st.caption(f"Welch's t-test on throughput ({comparison['throughput_test']['samples']}): p = {throughput_p:.3g}"
+               if throughput_p is not None else "Throughput test: not enough data")
+    if throughput_p is not None and comparison['throughput_test']['samples'] == "seconds":
+        st.caption("With a single run on either side the test uses per-second counts, which are autocorrelated "
+                   "rather than independent, so the p-value is optimistic. Repeat both runs to compare per-run "
+                   "throughput instead.")
+    if comparison['regression']:
+        st.error(f"Regression: {candidate_image} is significantly "
+                 f"{'slower' if comparison['latency_regression'] else 'lower throughput'} than {baseline_image}.")
+    else:
+        st.success("No significant regression.")
+
+    plot_latency_cdf([(f"baseline ({baseline_image})", functools.reduce(LoadResult.merge, baseline, LoadResult())),
+                      (f"candidate ({candidate_image})", functools.reduce(LoadResult.merge, candidate, LoadResult()))])
+
+def scenario_editor():
+    """Pick a scenario from config/benchmarks and edit it; returns the parsed scenario or None."""
+    files = list_scenarios()
+    choice = st.selectbox("Scenario", files + ["Custom"], format_func=os.path.basename)
+    default = open(choice).read() if choice != "Custom" else ""
+    text = st.text_area("Scenario (YAML)", default, height=300, key=f"scenario-{choice}")
+    if not text.strip():
+        return None
+    try:
+        scenario = Scenario.from_yaml(text)
+    except ScenarioError as e:
+        st.error(str(e))
+        return None
+    st.caption(" → ".join(f"{stage.name}: {stage.describe()}" for stage in scenario.stages) +
+               f" ({scenario.duration:g}s, {len(scenario.requests)} request types)")
+    return scenario
+
+def show_stage_results(results):
+    if results['passed']:
+        st.success(f"All stages of {results['scenario']} met their SLOs.")
+    else:
+        failed = [stage['name'] for stage in results['stages'] if not stage['passed']]
+        st.error(f"SLO violations in: {', '.join(failed)}")
+
+    rows = []
+    for stage in results['stages']:
+        http = stage['http']
+        rows.append({
+            'stage': stage['name'],
+            'load': stage['load'],
+            'requests/s': http['requests_per_second'],
+            'p50 (ms)': http['latency']['p50_ms'],
+            'p99 (ms)': http['latency']['p99_ms'],
+            'error rate': round(http['error_rate'], 4),
+            'cpu avg (%)': round(stage['cpu']['average'], 1) if stage['cpu']['average'] is not None else None,
+            'memory max (MB)': round(stage['memory']['max'], 1) if stage['memory']['max'] is not None else None,
+            'SLO': ', '.join(f"{'✅' if check['passed'] else '❌'} {key} ≤ {check['limit']}"
+                             if key != 'min_rps' else f"{'✅' if check['passed'] else '❌'} rps ≥ {check['limit']}"
+                             for key, check in stage['slo'].items()) or '—',
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
+def sweep_settings():
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        start_rate = st.number_input("Start Rate (req/s)", min_value=1, max_value=100000, value=10)
+        max_rate = st.number_input("Max Rate (req/s)", min_value=1, max_value=1000000, value=5000)
+        growth = st.number_input("Rate Growth per Step", min_value=1.1, max_value=4.0, value=1.5, step=0.1)
+    with col2:
+        step_duration = st.number_input("Step Duration (seconds)", min_value=2, max_value=300, value=10)
+        warmup = st.number_input("Warmup per Step (seconds)", min_value=0, max_value=60, value=2)
+        refine_steps = st.number_input("Refinement Steps", min_value=0, max_value=10, value=3,
+                                       help="Bisections between the last passing and first failing rate")
+    with col3:
+        p99_slo_ms = st.number_input("p99 SLO (ms)", min_value=1, max_value=60000, value=500)
+        max_error_rate = st.number_input("Max Error Rate (%)", min_value=0.0, max_value=100.0, value=1.0) / 100
+    return dict(start_rate=start_rate, max_rate=max_rate, growth=growth, step_duration=step_duration,
+                warmup=warmup, refine_steps=refine_steps, p99_slo_ms=p99_slo_ms, max_error_rate=max_error_rate)
+
+def show_sweep_results(sweep):
+    if sweep['max_sustainable_rps'] is not None:
+        col1, col2 = st.columns(2)
+        col1.metric("Max Sustainable RPS", f"{sweep['max_sustainable_rps']:.1f}")
+        col2.metric("At Offered Rate", f"{sweep['knee_offered_rps']:.0f} req/s")
+    else:
+        st.error("Even the starting rate was not sustainable.")
+    st.caption(f"Limited by: {sweep['limit_reason']}")
+
+    steps = sweep['steps']
+    offered = [step['offered_rps'] for step in steps]
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Scatter(x=offered, y=offered, mode='lines', name='offered', line=dict(dash='dot', color='gray')))
+    fig.add_trace(go.Scatter(x=offered, y=[step['http']['requests_per_second'] for step in steps],
+                             mode='lines+markers', name='served req/s'))
+    fig.add_trace(go.Scatter(x=offered, y=[step['http']['latency']['p99_ms'] for step in steps],
+                             mode='lines+markers', name='p99 (ms)'), secondary_y=True)
+    fig.add_hline(y=sweep['p99_slo_ms'], line_dash='dash', line_color='red', annotation_text='p99 SLO',
+                  secondary_y=True)
+    if sweep['knee_offered_rps'] is not None:
+        fig.add_vline(x=sweep['knee_offered_rps'], line_dash='dot', line_color='green', annotation_text='knee')
+    fig.update_layout(title='Capacity Sweep', xaxis_title='Offered Load (req/s)')
+    fig.update_yaxes(title_text='Served (req/s)', secondary_y=False)
+    fig.update_yaxes(title_text='p99 Latency (ms)', type='log', secondary_y=True)
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.dataframe(pd.DataFrame([{
+        'offered (req/s)': round(step['offered_rps'], 1),
+        'served (req/s)': step['http']['requests_per_second'],
+        'p50 (ms)': step['http']['latency']['p50_ms'],
+        'p99 (ms)': step['http']['latency']['p99_ms'],
+        'error rate': round(step['http']['error_rate'], 4),
+        'cpu avg (%)': round(step['cpu']['average'], 1) if step['cpu']['average'] is not None else None,
+        'memory max (MB)': round(step['memory']['max'], 1) if step['memory']['max'] is not None else None,
+        'result': step['failure'] or 'ok',
+    } for step in steps]), use_container_width=True)
+
+def parse_limits(text, cast):
+    try:
+        values = [cast(value) for value in text.replace(' ', '').split(',') if value]
+    except ValueError:
+        return None
+    return values if values and all(value > 0 for value in values) else None
+
+def sizing_settings():
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        cpu_limits = parse_limits(st.text_input("CPU Limits (cores)", "4, 2, 1, 0.5, 0.25"), float)
+    with col2:
+        memory_limits = parse_limits(st.text_input("Memory Limits (MB)", "2048, 1024, 512, 256, 128"), int)
+    with col3:
+        settle = st.number_input("Settle Time (seconds)", min_value=0, max_value=120, value=5,
+                                 help="Pause after each limit change before the load starts")
+    keep_memory_limit = st.checkbox("Size a container without a memory limit",
+                                    help="docker update cannot remove a memory limit once set, so the container "
+                                         "is left at the largest memory limit tried")
+    if cpu_limits is None or memory_limits is None:
+        st.error("Limits must be comma-separated positive numbers.")
+        return None
+    return dict(cpu_limits=cpu_limits, memory_limits=memory_limits, settle=settle,
+                keep_memory_limit=keep_memory_limit)
+
+def show_sizing_results(sizing):
+    if sizing['recommended_cpus'] is not None and sizing['recommended_memory_mb'] is not None:
+        col1, col2 = st.columns(2)
+        col1.metric("Recommended CPU Limit", f"{sizing['recommended_cpus']:g} cores")
+        col2.metric("Recommended Memory Limit", f"{sizing['recommended_memory_mb']} MB")
+        if sizing['confirmed']:
+            st.success("The recommended limits passed a confirmation run.")
+        else:
+            st.warning("The recommended limits failed their confirmation run; results are noisy, try a larger setting.")
+    else:
+        st.error("No tested setting met the SLOs.")
+    restore = sizing.get('restore') or {}
+    if not restore.get('restored', True):
+        st.error(f"The container's original limits could not be restored: {restore['error']}. "
+                 "Check them with docker inspect.")
+    elif restore.get('memory_kept_mb'):
+        st.info(f"The container had no memory limit and keeps {restore['memory_kept_mb']} MB.")
+
+    rows = []
+    for step in sizing['steps']:
+        http = step['http'] or {}
+        rows.append({
+            'phase': step['phase'],
+            'cpus': step['cpus'],
+            'memory (MB)': step['memory_mb'],
+            'requests/s': http.get('requests_per_second'),
+            'p99 (ms)': (http.get('latency') or {}).get('p99_ms'),
+            'error rate': round(http['error_rate'], 4) if http else None,
+            'throttled (%)': round(step['throttling'], 1) if step['throttling'] is not None else None,
+            'memory max (MB)': round(step['memory']['max'], 1) if (step['memory'] or {}).get('max') is not None else None,
+            'OOM events': step['oom_events'],
+            'result': step['failure'] or 'ok',
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
 def show_benchmarks_page():
     # Container selection
     containers = docker_manager.list_containers(all=True, networks=['monitoring'])
@@ -44,25 +355,112 @@ def show_benchmarks_page():
 
     # Benchmark parameters
     st.subheader("Benchmark Parameters")
-    duration = st.slider("Benchmark Duration (seconds)", min_value=5, max_value=60, value=10)
+    benchmark_type = st.radio("Benchmark Type", ["Simple load", "Scenario", "Capacity sweep", "Resource sizing"],
+                              horizontal=True)
     http_url = st.text_input("Application URL", "http://localhost:8080")
-    num_requests = st.number_input("Number of HTTP Requests", min_value=10, max_value=1000, value=100)
+    if benchmark_type == "Simple load":
+        load_mode = st.radio("Load Mode", ["Fixed concurrency", "Fixed arrival rate"], horizontal=True)
+    elif benchmark_type == "Scenario":
+        scenario = scenario_editor()
+    elif benchmark_type == "Capacity sweep":
+        sweep_options = sweep_settings()
+    else:
+        scenario = scenario_editor()
+        sizing_options = sizing_settings()
+        if scenario is not None and not any(stage.slo for stage in scenario.stages):
+            st.warning("The scenario sets no SLOs: only OOM kills and exits will fail a setting.")
+    col1, col2, col3 = st.columns(3)
+    if benchmark_type == "Simple load":
+        with col1:
+            if load_mode == "Fixed concurrency":
+                concurrency = st.number_input("Concurrent Connections", min_value=1, max_value=1000, value=10)
+                rate = None
+            else:
+                rate = st.number_input("Requests per Second", min_value=1, max_value=100000, value=100)
+                concurrency = None
+        with col2:
+            run_by = st.selectbox("Run For", ["Duration", "Request count"])
+            if run_by == "Duration":
+                duration = st.number_input("Load Duration (seconds)", min_value=1, max_value=600, value=10)
+                num_requests = None
+            else:
+                num_requests = st.number_input("Number of HTTP Requests", min_value=10, max_value=1000000, value=100)
+                duration = None
+        with col3:
+            warmup = st.number_input("Warmup (seconds)", min_value=0, max_value=60, value=0)
+    with col1 if benchmark_type != "Simple load" else col2:
+        sample_interval = st.select_slider("Resource Sample Interval (seconds)",
+                                           options=[0.1, 0.25, 0.5, 1.0], value=0.25)
+    with col2 if benchmark_type != "Simple load" else col3:
+        processes = st.number_input("Worker Processes", min_value=1, max_value=os.cpu_count() or 1, value=1,
+                                    help="Spread the load over several processes when one cannot saturate the target")
+
+    save_run = st.checkbox("Save run to history", value=True)
 
-    if st.button("Run Benchmark"):
+    ready = True
+    if benchmark_type in ("Scenario", "Resource sizing"):
+        ready = scenario is not None and (benchmark_type == "Scenario" or sizing_options is not None)
+    if st.button("Run Benchmark", disabled=not ready):
         with st.spinner("Running benchmarks..."):
             benchmark = ContainerBenchmark(selected_container)
-            benchmark.run_all_benchmarks(http_url, duration, num_requests)
+            if benchmark_type == "Simple load":
+                benchmark.run_all_benchmarks(http_url, num_requests, duration=duration, concurrency=concurrency,
+                                             rate=rate, warmup=warmup, processes=processes,
+                                             sample_interval=sample_interval)
+            elif benchmark_type == "Scenario":
+                benchmark.run_scenario(scenario, base_url=http_url, processes=processes,
+                                       sample_interval=sample_interval)
+            elif benchmark_type == "Capacity sweep":
+                progress = st.empty()
+                benchmark.capacity_sweep(http_url, processes=processes, sample_interval=sample_interval,
+                                         on_step=lambda step: progress.caption(
+                                             f"{step['offered_rps']:.0f} req/s offered: "
+                                             f"{step['http']['requests_per_second']:.0f} served, "
+                                             f"p99 {step['http']['latency']['p99_ms']} ms"
+                                             + (f" — {step['failure']}" if step['failure'] else "")),
+                                         **sweep_options)
+                progress.empty()
+            else:
+                progress = st.empty()
+                try:
+                    benchmark.sizing_sweep(scenario, base_url=http_url, processes=processes,
+                                           sample_interval=sample_interval,
+                                           on_step=lambda step: progress.caption(
+                                               f"{step['cpus']:g} CPUs / {step['memory_mb']} MB: "
+                                               f"{step['failure'] or 'ok'}"),
+                                           **sizing_options)
+                except ValueError as e:
+                    st.error(f"Cannot size {selected_container}: {e}")
+                    st.stop()
+                progress.empty()
             results = benchmark.get_results()
+            if save_run:
+                benchmark.save_results()
 
         st.success("Benchmark completed!")
         
         # Display results
         st.subheader("Benchmark Results")
+        if results.get('stages'):
+            show_stage_results(results)
+        if results.get('sweep'):
+            show_sweep_results(results['sweep'])
+        if results.get('sizing'):
+            show_sizing_results(results['sizing'])
         plot_benchmark_results(results)
+        if benchmark.load_result is not None:
+            st.subheader("HTTP Latency")
+            plot_latency(benchmark.load_result)
+        if results.get('timeline'):
+            st.subheader("Timeline")
+            plot_timeline(results['timeline'], [(stage['name'], stage['start']) for stage in results.get('stages', [])])
 
         # Detailed results
         st.subheader("Detailed Results")
-        st.json(results)
+        st.json({key: value for key, value in results.items() if key != 'timeline'})
+
+    st.subheader("Benchmark History")
+    show_history(selected_container)
 
 if __name__ == "__main__":
     load_css()
@@ -5,14 +5,14 @@ import configparser
 import json
 from streamlit_monaco import st_monaco
 from utils.configuration import save_yaml, get_config_path, update_config
-from utils.dockermanager import DockerManager
+from utils.dockermanager import get_docker_manager
 
 def load_css():
     css_file = os.path.join(os.path.dirname(__file__), "..", "public", "css", "style.css")
     with open(css_file, "r") as f:
         st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
-docker_manager = DockerManager()
+docker_manager = get_docker_manager()
 
 config_extensions = {
     'grafana': {'ext':'ini','name':'grafana', 'isEnv':False},
@@ -1,65 +1,279 @@
 import streamlit as st
-from utils.dockermanager import DockerManager
+from utils.dockermanager import get_docker_manager
+from utils.logbuffer import LogBuffer, DEFAULT_MAX_LINES
+from utils.logindex import LogIndex
+from utils.logparsing import get_log_metrics, parse_lines, start_metrics_server
+from utils.logtemplates import TemplateMiner
+from utils.logarchive import get_log_archive
+from datetime import datetime, timedelta, timezone
+from utils.loki import CONTAINER_LABEL, LokiTail, build_logql, get_loki_client
+import html
 import asyncio
 from streamlit.runtime.scriptrunner import add_script_run_ctx
-from datetime import datetime, timedelta
+import time
 import os 
-docker_manager = DockerManager()
+docker_manager = get_docker_manager()
 
 def load_css():
     css_file = os.path.join(os.path.dirname(__file__), "..", "public", "css", "style.css")
     with open(css_file, "r") as f:
         st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
-async def update_logs(logs_container, stop_event, log_time_option, config_type='application'):
-    all_logs = []
-    last_log_time = None
-    logs_found = False
-
-    while not stop_event.is_set():
-        minutes_back = int(log_time_option.split('/')[0]) if log_time_option.split('/')[0] != 'all' else None
-        end_time = datetime.now()
-        
-        if last_log_time:
-            start_time = last_log_time
-        elif minutes_back:
-            start_time = end_time - timedelta(seconds=minutes_back)
+def render_logs(logs_container, log_buffer, visible_lines, pattern=None, regex=False):
+    """Render only the newest visible_lines lines (or matches of pattern), so each update costs the same however long the tail runs."""
+    if pattern:
+        started = time.perf_counter()
+        visible = log_buffer.search(pattern, regex=regex, limit=visible_lines)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        header = f"# {len(visible)} newest matches of {pattern!r} in {len(log_buffer)} buffered lines ({elapsed_ms:.1f} ms)"
+    else:
+        visible = log_buffer.tail(visible_lines)
+        header = f"# showing {len(visible)} of {len(log_buffer)} buffered lines"
+    if log_buffer.evicted:
+        header += f" ({log_buffer.evicted} older lines evicted)"
+    logs_container.empty()
+    logs_container.code("\n".join([header] + [str(line) for line in reversed(visible)]))
+
+def get_session_buffer(key, max_lines):
+    """Keep the indexed buffer across reruns, so changing the filter does not drop the tail."""
+    if st.session_state.get('log_buffer_key') != key:
+        st.session_state.log_buffer = LogBuffer(max_lines=max_lines, index=LogIndex())
+        st.session_state.log_templates = TemplateMiner()
+        st.session_state.log_templates_seq = 0
+        st.session_state.log_buffer_key = key
+    return st.session_state.log_buffer
+
+def render_templates(logs_container, miner, visible_lines, order):
+    """Render one row per template instead of one per line."""
+    rows = [{
+        'Count': t['count'],
+        'Errors': t['errors'],
+        'Template': t['template'],
+        'Example values': "; ".join(", ".join(values) for values in t['examples'].values()),
+        'Last line': t['last'],
+    } for t in miner.templates(order=order, limit=visible_lines)]
+    logs_container.empty()
+    with logs_container.container():
+        st.caption(f"{len(miner.clusters)} templates from {miner.lines} lines")
+        st.dataframe(rows, use_container_width=True)
+
+async def update_logs(logs_container, stop_event, log_time_option, config_type='application',
+                      max_lines=DEFAULT_MAX_LINES, visible_lines=500, pattern=None, regex=False, rates_container=None,
+                      template_order=None, archive=False):
+    log_buffer = get_session_buffer((config_type, log_time_option, max_lines), max_lines)
+    miner = st.session_state.log_templates
+
+    def render():
+        if template_order:
+            # Lines are only mined while the template view is shown; it catches up on what was buffered meanwhile.
+            miner.extend(log_buffer.since(st.session_state.log_templates_seq))
+            st.session_state.log_templates_seq = log_buffer.next_seq
+            render_templates(logs_container, miner, visible_lines, template_order)
         else:
-            start_time = None
-        
-        app_logs = docker_manager.get_container_logs(config_type, since=start_time, until=end_time)
-        
-        new_logs = [log.strip() for log in app_logs.decode('utf-8').split('\n') if log.strip()]
-
-        if new_logs:
-            logs_found = True
-            all_logs.extend(new_logs)
-            last_log_time = end_time
-            
-            formatted_logs = "\n".join(reversed(all_logs))
-            logs_container.empty()  
-            logs_container.code(formatted_logs)
-        
-        if not logs_found:
-            logs_container.empty()  
-            logs_container.info('No logs found in the last ' + log_time_option.split('/')[1])
-
-        await asyncio.sleep(0.1 if new_logs else 1)
+            render_logs(logs_container, log_buffer, visible_lines, pattern, regex)
+
+    seconds_back = int(log_time_option.split('/')[0]) if log_time_option.split('/')[0] != 'all' else None
+    since = time.time() - seconds_back if seconds_back else None
+
+    last_line = log_buffer.get(log_buffer.next_seq - 1)
+    if last_line is not None:
+        since = last_line.timestamp.timestamp()
+        render()
+
+    # One follow-mode connection for the whole session instead of a request per poll.
+    log_stream = docker_manager.stream_container_logs(config_type, since=since)
+    try:
+        while not stop_event.is_set():
+            new_logs = log_stream.read()
+            if log_stream.error is not None and not new_logs:
+                logs_container.error(f"Stopped tailing {config_type}: {log_stream.error}")
+                break
+            if last_line is not None:
+                new_logs = [line for line in new_logs if line.timestamp > last_line.timestamp]
+
+            if new_logs:
+                parsed = list(parse_lines(new_logs, config_type))
+                log_buffer.extend(parsed)
+                if archive:
+                    get_log_archive().append(config_type, parsed)
+                render()
+            if new_logs and rates_container is not None:
+                rates = get_log_metrics().rates(config_type)
+                rates_container.caption(f"{rates['lines_per_second']:.2f} lines/s · "
+                                        f"{rates['errors_per_second']:.2f} errors/s · "
+                                        f"{rates['error_ratio']:.1%} errors (last minute)")
+
+            if not len(log_buffer):
+                logs_container.empty()
+                logs_container.info('No logs found in the last ' + log_time_option.split('/')[-1])
+
+            await asyncio.sleep(0.1 if new_logs else 0.5)
+    finally:
+        log_stream.close()
+        if archive:
+            get_log_archive().flush(config_type)
+
+def render_tail(logs_container, log_buffer, visible_lines, tail):
+    """Render the visible window with one color per source and the per-source counters."""
+    rows = []
+    for line in reversed(log_buffer.tail(visible_lines)):
+        color = tail.color(line.source)
+        rows.append(f'<span style="color:{color}">{html.escape(str(line))}</span>')
+    counters = " · ".join(
+        f'<span style="color:{tail.color(source)}">{html.escape(source)}</span>: {c["lines"]} lines, '
+        f'{c["rate_limited"]} rate-limited, {c["server_dropped"]} dropped by Loki'
+        for source, c in sorted(tail.stats().items()))
+    logs_container.empty()
+    logs_container.markdown(f'<div>{counters}</div><pre>{"<br>".join(rows)}</pre>', unsafe_allow_html=True)
+
+async def update_loki_tail(logs_container, stop_event, container_names, line_filters, max_rate,
+                           max_lines=DEFAULT_MAX_LINES, visible_lines=500):
+    log_buffer = LogBuffer(max_lines=max_lines)
+    # Every selected container shares one websocket.
+    tail = LokiTail.for_containers(container_names, line_filters, max_rate=max_rate).start()
+    try:
+        while not stop_event.is_set():
+            new_logs = tail.read()
+            if new_logs:
+                log_buffer.extend(new_logs)
+                render_tail(logs_container, log_buffer, visible_lines, tail)
+            elif not len(log_buffer):
+                logs_container.info('Waiting for logs from ' + ', '.join(container_names))
+            await asyncio.sleep(0.2)
+    finally:
+        tail.close()
+
+def show_archive_replay(container_names, max_lines, visible_lines):
+    """Jump to any minute of an archived container and replay from there."""
+    st.title("Archive Replay")
+    archive = get_log_archive()
+    archived = archive.containers()
+    if not archived:
+        st.info("Nothing archived yet. Enable 'Archive tailed lines to disk' on the Docker live tail.")
+        return
+
+    with st.sidebar:
+        container = st.selectbox("Archived container", archived)
+    time_range = archive.time_range(container)
+    if time_range is None:
+        st.info(f"No archived lines for {container}.")
+        return
+    oldest, newest = (t.astimezone() for t in time_range)
+    st.caption(f"Archived from {oldest:%Y-%m-%d %H:%M:%S} to {newest:%Y-%m-%d %H:%M:%S}")
+
+    day = st.date_input("Day", value=newest.date(), min_value=oldest.date(), max_value=newest.date())
+    at = st.time_input("From", value=(newest - timedelta(minutes=5)).time().replace(second=0, microsecond=0))
+    minutes = st.number_input("Minutes to replay", min_value=1, max_value=24 * 60, value=5)
+
+    since = datetime.combine(day, at).astimezone(timezone.utc)
+    log_buffer = LogBuffer(max_lines=max_lines, index=LogIndex())
+    log_buffer.extend(archive.read(container, since, since + timedelta(minutes=int(minutes))))
+    logs_container = st.empty()
+    if len(log_buffer):
+        render_logs(logs_container, log_buffer, visible_lines, st.text_input("Filter replayed lines"))
+    else:
+        logs_container.info("No archived lines in that range.")
+
+SEARCH_WINDOWS = {'15 minutes': 900, '1 hour': 3600, '6 hours': 21600, '24 hours': 86400, '7 days': 604800}
+
+def search_loki_logs(logs_container, container_names, search_window, contains, exclude, regex,
+                     max_lines=DEFAULT_MAX_LINES, visible_lines=500):
+    """Run the search inside Loki and page through its results, newest first."""
+    operator = '|~' if regex else '|='
+    line_filters = [(operator, contains)] if contains else []
+    if exclude:
+        line_filters.append(('!~' if regex else '!=', exclude))
+    query = build_logql({CONTAINER_LABEL: container_names}, line_filters)
+
+    end = time.time()
+    log_buffer = LogBuffer(max_lines=max_lines)
+    with st.spinner(f"Searching Loki: {query}"):
+        lines = list(get_loki_client().stream(query, end - search_window, end, max_lines=max_lines))
+    # Loki pages newest first; the buffer keeps lines oldest first.
+    log_buffer.extend(reversed(lines))
+
+    if len(log_buffer):
+        render_logs(logs_container, log_buffer, visible_lines)
+    else:
+        logs_container.info(f"No matching logs for {query}")
 
 def show_logs_page():
+    # Exposes the per-container line and error counters to Prometheus.
+    start_metrics_server()
+    container_names = [x.get('name') for x in docker_manager.list_containers(all=True, networks=['monitoring'])]
+    with st.sidebar:
+        source = st.radio("Source", ['Live tail (Docker)', 'Live tail (Loki, many containers)', 'Search (Loki)',
+                                     'Replay (local archive)'])
+        max_lines = st.number_input("Buffered lines", min_value=1000, max_value=1_000_000, value=DEFAULT_MAX_LINES, step=1000)
+        visible_lines = st.number_input("Visible lines", min_value=50, max_value=5000, value=500, step=50)
+
+    if source == 'Replay (local archive)':
+        show_archive_replay(container_names, int(max_lines), int(visible_lines))
+        return
+
+    if source == 'Search (Loki)':
+        st.title("Log Search")
+        with st.sidebar:
+            selected = st.multiselect("Containers", container_names, default=container_names[:1])
+            search_window = SEARCH_WINDOWS[st.selectbox("Search window", list(SEARCH_WINDOWS), index=1)]
+        contains = st.text_input("Line contains")
+        exclude = st.text_input("Line does not contain")
+        regex = st.checkbox("Treat patterns as regular expressions")
+        logs_container = st.empty()
+        if st.button("Search"):
+            if not selected:
+                st.warning("Select at least one container to search.")
+                return
+            search_loki_logs(logs_container, selected, search_window, contains, exclude, regex,
+                             max_lines=int(max_lines), visible_lines=int(visible_lines))
+        return
+
+    if source == 'Live tail (Loki, many containers)':
+        st.title("Live Tail")
+        with st.sidebar:
+            selected = st.multiselect("Containers", container_names, default=container_names)
+            max_rate = st.number_input("Max lines per second", min_value=10, max_value=10000, value=500, step=10)
+        contains = st.text_input("Line contains")
+        if not selected:
+            st.warning("Select at least one container to tail.")
+            return
+        logs_container = st.empty()
+        stop_event = asyncio.Event()
+
+        async def start_tail():
+            add_script_run_ctx(asyncio.current_task())
+            await update_loki_tail(logs_container, stop_event, selected, [('|=', contains)] if contains else [],
+                                   float(max_rate), max_lines=int(max_lines), visible_lines=int(visible_lines))
+
+        try:
+            asyncio.run(start_tail())
+        except st.runtime.scriptrunner.StopException:
+            stop_event.set()
+        return
+
     with st.sidebar:
-        config_type = st.selectbox("Select Container", [x.get('name') for x in docker_manager.list_containers(all=True, networks=['monitoring'])])
+        config_type = st.selectbox("Select Container", container_names)
         log_time_option = st.selectbox("Select Timing", ['60/1min', '300/5min', '1800/30min', '3600/1hour', 'all'])
-    
+
     st.title("Application Logs - " + config_type)
-    
+    pattern = st.text_input("Filter buffered lines")
+    regex = st.checkbox("Filter is a regular expression")
+    archive = st.sidebar.checkbox("Archive tailed lines to disk")
+    template_order = None
+    if st.checkbox("Group into templates"):
+        orders = {'Most frequent first': 'count', 'Errors and rare first': 'rare', 'Most recent first': 'recent'}
+        template_order = orders[st.selectbox("Template order", list(orders))]
+
+    rates_container = st.empty()
     logs_container = st.empty()
 
     stop_event = asyncio.Event()
 
     async def start_log_update():
         add_script_run_ctx(asyncio.current_task())
-        await update_logs(logs_container, stop_event, log_time_option, config_type)
+        await update_logs(logs_container, stop_event, log_time_option, config_type,
+                          max_lines=int(max_lines), visible_lines=int(visible_lines), pattern=pattern, regex=regex,
+                          rates_container=rates_container, template_order=template_order, archive=archive)
 
     try:
         asyncio.run(start_log_update())
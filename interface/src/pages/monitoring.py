@@ -2,10 +2,14 @@ import streamlit as st
 import time
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
-from utils.monitoring import PrometheusMonitor, get_container_metrics
-from utils.dockermanager import DockerManager
+from utils.monitoring import HISTORY_QUERIES, get_container_metrics, get_live_container_metrics, get_monitor, history_step
+from utils.history import MetricHistory
+from datetime import datetime
+from utils.dockermanager import get_docker_manager
 import os
 
+HISTORY_WINDOWS = {'5 minutes': 300, '1 hour': 3600, '6 hours': 21600, '24 hours': 86400}
+
 def load_css():
     css_file = os.path.join(os.path.dirname(__file__), "..", "public", "css", "style.css")
     with open(css_file, "r") as f:
@@ -13,12 +17,12 @@ def load_css():
 
 def initialize_app():
     st.title("📊 Container Monitoring Dashboard")
-    
-    if 'history' not in st.session_state:
-        st.session_state.history = {
-            'cpu_usage': [], 'memory_usage': [], 'disk_usage': [], 'network_receive': [],
-            'network_transmit': [], 'io_read': [], 'io_write': [], 'processes': []
-        }
+
+def reset_history(container_name, window):
+    capacity = window // history_step(window) + 1
+    st.session_state.history = MetricHistory(HISTORY_QUERIES, capacity)
+    st.session_state.history_source = (container_name, window)
+    st.session_state.history_last = None
 
 def create_gauge(value, title, max_value=100):
     return go.Indicator(
@@ -44,21 +48,57 @@ def create_gauge(value, title, max_value=100):
         }
     )
 
-def create_time_series(data, title):
-    return go.Scatter(y=data, mode='lines+markers', name=title, line={'width': 2}, marker={'size': 4})
-
-def update_history(metrics):
-    for key in ['cpu_usage', 'memory_usage', 'disk_usage', 'processes']:
-        value = metrics[key]['percentage'] if isinstance(metrics[key], dict) else metrics[key]
-        st.session_state.history[key].append(value)
-    
-    st.session_state.history['network_receive'].append(metrics['network_traffic']['receive'])
-    st.session_state.history['network_transmit'].append(metrics['network_traffic']['transmit'])
-    st.session_state.history['io_read'].append(metrics['io_usage']['read'])
-    st.session_state.history['io_write'].append(metrics['io_usage']['write'])
-
-    for key in st.session_state.history:
-        st.session_state.history[key] = st.session_state.history[key][-60:]
+def create_time_series(key, title):
+    timestamps, values = st.session_state.history.downsampled(key)
+    x = [datetime.fromtimestamp(ts) for ts in timestamps]
+    return go.Scatter(x=x, y=values, mode='lines+markers', name=title, line={'width': 2}, marker={'size': 4})
+
+def update_history(container_name, window):
+    """Backfill the window from Prometheus on first use, then fetch only samples newer than the last one."""
+    if st.session_state.get('history_source') != (container_name, window):
+        reset_history(container_name, window)
+
+    end = time.time()
+    step = history_step(window)
+    last = st.session_state.history_last
+    start = end - window if last is None else last + step
+    if start > end:
+        return
+
+    history = st.session_state.history
+    for key, samples in get_monitor().get_container_history(container_name, start, end, step).items():
+        history.extend(key, samples)
+    history.drop_before(end - window)
+
+    newest = history.last_timestamp()
+    st.session_state.history_last = newest if newest is not None else (last if last is not None else end - step)
+
+def append_live_history(container_name, window, metrics):
+    """Record a live sample; the history is kept locally since Prometheus is not consulted in live mode."""
+    source = (container_name, window, 'live')
+    if st.session_state.get('history_source') != source:
+        reset_history(container_name, window)
+        st.session_state.history_source = source
+
+    now = time.time()
+    last = st.session_state.history.last_timestamp()
+    if last is not None and now - last < history_step(window):
+        return
+
+    values = {
+        'cpu_usage': metrics['cpu_usage'],
+        'memory_usage': metrics['memory_usage']['percentage'],
+        'disk_usage': metrics['disk_usage'],
+        'processes': metrics['processes'],
+        'network_receive': metrics['network_traffic']['receive'],
+        'network_transmit': metrics['network_traffic']['transmit'],
+        'io_read': metrics['io_usage']['read'],
+        'io_write': metrics['io_usage']['write'],
+    }
+    history = st.session_state.history
+    for key, value in values.items():
+        history.extend(key, [(now, value if value is not None else float('nan'))])
+    history.drop_before(now - window)
 
 def create_dashboard(metrics):
     fig = make_subplots(
@@ -77,15 +117,18 @@ def create_dashboard(metrics):
     fig.add_trace(create_gauge(metrics['disk_usage'], "Disk Usage (MB)"), row=1, col=3)
 
     for i, key in enumerate(['cpu_usage', 'memory_usage', 'disk_usage']):
-        fig.add_trace(create_time_series(st.session_state.history[key], f"{key.split('_')[0].capitalize()} Usage"), row=2, col=1)
+        fig.add_trace(create_time_series(key, f"{key.split('_')[0].capitalize()} Usage"), row=2, col=1)
 
     for key in ['network_receive', 'network_transmit', 'io_read', 'io_write']:
-        fig.add_trace(create_time_series(st.session_state.history[key], f"{key.replace('_', ' ').title()} ({'KB/s' if 'network' in key else 'MB/s'})"), row=3, col=1)
+        fig.add_trace(create_time_series(key, f"{key.replace('_', ' ').title()} ({'KB/s' if 'network' in key else 'MB/s'})"), row=3, col=1)
 
     fig.update_layout(height=1000, grid={'rows': 3, 'columns': 3, 'pattern': "independent"}, template="plotly_dark")
     
     return fig
 
+def format_stat(value, unit):
+    return f"{round(value, 2)}{unit}" if value is not None else "n/a"
+
 def display_additional_metrics(metrics):
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -95,27 +138,49 @@ def display_additional_metrics(metrics):
     with col3:
         st.metric("CPU Throttling", f"{metrics['cpu_throttling']['throttling_ratio']}%")
 
+    cpu = st.session_state.history.buffers['cpu_usage']
+    memory = st.session_state.history.buffers['memory_usage']
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("CPU Min / Max (window)", f"{format_stat(cpu.min(), '%')} / {format_stat(cpu.max(), '%')}")
+    with col2:
+        st.metric("CPU Mean (window)", format_stat(cpu.mean(), '%'))
+    with col3:
+        st.metric("Memory Peak (window)", format_stat(memory.max(), '%'))
+
 def main():
     initialize_app()
-    docker_manager = DockerManager()
-    monitor = PrometheusMonitor()
+    docker_manager = get_docker_manager()
 
     containers = docker_manager.list_containers()
     container_names = [c['name'] for c in containers]
     selected_container = st.selectbox("Select a container to monitor:", container_names, index=0)
+    window = HISTORY_WINDOWS[st.selectbox("History window:", list(HISTORY_WINDOWS), index=0)]
+    live_mode = st.checkbox("Live mode (Docker stats stream, bypasses Prometheus)", value=False)
 
     metrics_placeholder = st.empty()
 
     while True:
-        metrics = get_container_metrics(selected_container)
-        update_history(metrics)
+        if live_mode:
+            try:
+                metrics = get_live_container_metrics(selected_container)
+            except LookupError as e:
+                metrics_placeholder.error(f"{e}; live mode stopped.")
+                break
+            if metrics is None:
+                time.sleep(0.2)
+                continue
+            append_live_history(selected_container, window, metrics)
+        else:
+            metrics = get_container_metrics(selected_container)
+            update_history(selected_container, window)
 
         with metrics_placeholder.container():
             fig = create_dashboard(metrics)
             st.plotly_chart(fig, use_container_width=True)
             display_additional_metrics(metrics)
 
-        time.sleep(1)
+        time.sleep(0.5 if live_mode else 1)
 
 if __name__ == "__main__":
     st.set_page_config(layout="wide", page_title="Container Monitoring Dashboard", page_icon="📊")
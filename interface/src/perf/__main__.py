@@ -0,0 +1,38 @@
+# perf/__main__.py
+"""Benchmark LogWatcher's hot paths against local stand-ins.
+
+Run from interface/src:  python -m perf --containers 200 --log-rate 5000
+"""
+
+import argparse
+import json
+import logging
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--containers", type=int, default=50, help="containers the fakes report")
+    parser.add_argument("--log-rate", type=float, default=1000.0, help="log lines per second per followed container")
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per case")
+    parser.add_argument("--log-seconds", type=float, default=5.0, help="how long to run the update_logs loop")
+    parser.add_argument("--log-batch", type=int, default=500, help="lines per batch in the log pipeline case")
+    parser.add_argument("--max-lines", type=int, default=100000, help="log buffer size")
+    parser.add_argument("--prometheus-latency", type=float, default=0.0, help="fake Prometheus delay per query (ms)")
+    parser.add_argument("--only", help="run only groups containing this text: metrics, docker, logs, history, "
+                                       "dashboard, log loop")
+    parser.add_argument("--json", help="also write the full report to this file")
+    args = parser.parse_args()
+
+    # Streamlit warns about every call made outside `streamlit run`.
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    from perf.suite import format_report, run_suite
+
+    report = run_suite(containers=args.containers, log_rate=args.log_rate, iterations=args.iterations,
+                       log_seconds=args.log_seconds, prometheus_latency=args.prometheus_latency / 1000,
+                       log_batch=args.log_batch, max_lines=args.max_lines, only=args.only)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
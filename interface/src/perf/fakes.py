@@ -0,0 +1,335 @@
+# perf/fakes.py
+
+import contextlib
+import datetime
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import streamlit as st
+
+_SELECTOR = re.compile(r'name(=~|!=|=)"((?:[^"\\]|\\.)*)"')
+_API_VERSION = re.compile(r"^/v\d+\.\d+")
+# Rough message shapes, so parsing and template mining see realistic variety.
+LOG_TEMPLATES = (
+    "INFO GET /api/items/{n} 200 {ms}ms",
+    "INFO POST /api/orders 201 {ms}ms user={user}",
+    "DEBUG cache hit key=item:{n}",
+    "WARN slow query took {ms}ms table=orders",
+    "ERROR failed to reach payment service: connection refused (attempt {attempt})",
+    "level=info msg=\"worker finished\" job={n} duration={ms}ms",
+)
+
+def container_names(count: int) -> List[str]:
+    return [f"app-{i:04d}" for i in range(count)]
+
+def _series_value(name: str, query: str) -> float:
+    """A stable pseudo-random value per container and query."""
+    digest = hashlib.md5(f"{name}|{query}".encode()).digest()
+    return struct.unpack(">I", digest[:4])[0] / 2 ** 32 * 100
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body leave in one write, as from a real server; split writes
+    # meet delayed ACKs and add ~40 ms that LogWatcher is not responsible for.
+    wbufsize = 64 * 1024
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload: Any, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def start_chunked(self, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.wfile.flush()
+
+    def send_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+class _QuietServerMixin:
+    def handle_error(self, request, client_address):
+        # Clients hang up on streams they are done with; that is not worth a traceback.
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+class _TCPServer(_QuietServerMixin, ThreadingHTTPServer):
+    daemon_threads = True
+
+class FakePrometheus:
+    """Prometheus HTTP API stand-in answering instant and range queries for a synthetic fleet.
+
+    Every series is grouped by container name, like the queries LogWatcher
+    sends; latency adds a fixed server-side delay to each response.
+    """
+
+    def __init__(self, names: List[str], latency: float = 0.0):
+        self.names = names
+        self.latency = latency
+        self.requests = 0
+        self._server: Optional[_TCPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def matching(self, query: str) -> List[str]:
+        match = _SELECTOR.search(query)
+        if match is None:
+            return self.names
+        op, value = match.group(1), match.group(2).replace('\\"', '"')
+        if op == "!=":
+            return [name for name in self.names if name != value]
+        if op == "=":
+            return [name for name in self.names if name == value]
+        pattern = re.compile(value.replace("\\\\", "\\"))
+        return [name for name in self.names if pattern.fullmatch(name)]
+
+    def start(self) -> "FakePrometheus":
+        fake = self
+
+        class Handler(_QuietHandler):
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                fake.requests += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                query = params.get("query", "")
+                names = fake.matching(query)
+                if url.path == "/api/v1/query":
+                    now = time.time()
+                    result = [{"metric": {"name": name}, "value": [now, str(_series_value(name, query))]}
+                              for name in names]
+                    self.send_json({"status": "success", "data": {"resultType": "vector", "result": result}})
+                elif url.path == "/api/v1/query_range":
+                    start, end, step = float(params["start"]), float(params["end"]), float(params["step"])
+                    count = int((end - start) // step) + 1
+                    result = []
+                    for name in names:
+                        base = _series_value(name, query)
+                        values = [[start + i * step, str(base + 10 * math.sin((start + i * step) / 60))]
+                                  for i in range(count)]
+                        result.append({"metric": {"name": name}, "values": values})
+                    self.send_json({"status": "success", "data": {"resultType": "matrix", "result": result}})
+                else:
+                    self.send_json({"status": "error", "error": "not found"}, status=404)
+
+        self._server = _TCPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, name="fake-prometheus", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+class _UnixHTTPServer(_QuietServerMixin, socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+class FakeDockerDaemon:
+    """Docker Engine API stand-in on a unix socket.
+
+    Serves what LogWatcher uses: version, ping, container list and inspect,
+    a silent event stream, one-shot stats, and followed logs that emit
+    log_rate timestamped lines per second per container.
+    """
+
+    def __init__(self, names: List[str], log_rate: float = 100.0, socket_path: Optional[str] = None):
+        self.names = names
+        self.log_rate = log_rate
+        self.socket_path = socket_path or os.path.join(tempfile.mkdtemp(prefix="fake-docker-"), "docker.sock")
+        self.containers = {name: self._container(i, name) for i, name in enumerate(names)}
+        self._by_id = {c["Id"]: c for c in self.containers.values()}
+        self._stopped = threading.Event()
+        self._server: Optional[_UnixHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"unix://{self.socket_path}"
+
+    @staticmethod
+    def _container(index: int, name: str) -> Dict[str, Any]:
+        return {
+            "Id": hashlib.sha256(name.encode()).hexdigest(),
+            "Names": [f"/{name}"],
+            "Image": "fake/app:latest",
+            "State": "running",
+            "Status": "Up 1 hour",
+            "Ports": [{"PrivatePort": 8080, "PublicPort": 18080 + index, "Type": "tcp"}],
+            "NetworkSettings": {"Networks": {"monitoring": {}}},
+        }
+
+    def lookup(self, ref: str) -> Optional[Dict[str, Any]]:
+        if ref in self.containers:
+            return self.containers[ref]
+        if ref in self._by_id:
+            return self._by_id[ref]
+        return next((c for cid, c in self._by_id.items() if cid.startswith(ref)), None)
+
+    def inspect(self, container: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "Id": container["Id"],
+            "Name": container["Names"][0],
+            "Image": "sha256:" + "0" * 64,
+            "State": {"Status": "running", "Running": True, "OOMKilled": False},
+            "Config": {"Tty": False, "Image": container["Image"]},
+            "HostConfig": {"CpuQuota": 0, "CpuPeriod": 0, "NanoCpus": 0, "Memory": 0, "MemorySwap": 0},
+            "NetworkSettings": container["NetworkSettings"],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "read": datetime.datetime.utcnow().isoformat() + "Z",
+            "cpu_stats": {"cpu_usage": {"total_usage": int(now * 1e8)}, "system_cpu_usage": int(now * 4e9),
+                          "online_cpus": 4, "throttling_data": {"periods": int(now), "throttled_periods": 0}},
+            "precpu_stats": {},
+            "memory_stats": {"usage": 256 * 2 ** 20, "limit": 2 ** 31, "stats": {"inactive_file": 0}},
+            "networks": {"eth0": {"rx_bytes": int(now * 1000), "tx_bytes": int(now * 500)}},
+            "pids_stats": {"current": 12},
+        }
+
+    @staticmethod
+    def log_frame(timestamp: float, rng: random.Random) -> bytes:
+        stamp = datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f000Z")
+        message = rng.choice(LOG_TEMPLATES).format(n=rng.randrange(10000), ms=rng.randrange(1, 900),
+                                                   user=rng.randrange(500), attempt=rng.randrange(1, 4))
+        payload = f"{stamp} {message}\n".encode()
+        return struct.pack(">BxxxL", 1, len(payload)) + payload
+
+    def stream_logs(self, handler: _QuietHandler, params: Dict[str, str]) -> None:
+        handler.start_chunked("application/vnd.docker.multiplexed-stream")
+        rng = random.Random(handler.path)
+        tail = params.get("tail", "all")
+        backlog = min(int(tail), 1000) if tail.isdigit() else 0
+        now = time.time()
+        if backlog:
+            handler.send_chunk(b"".join(self.log_frame(now - (backlog - i) / max(self.log_rate, 1), rng)
+                                        for i in range(backlog)))
+        if params.get("follow") not in ("1", "true", "True"):
+            handler.send_chunk(b"")
+            return
+        interval = 0.05
+        emitted, started = 0.0, time.time()
+        while not self._stopped.is_set():
+            due = (time.time() - started) * self.log_rate - emitted
+            count = int(due)
+            if count:
+                now = time.time()
+                handler.send_chunk(b"".join(self.log_frame(now - (count - i) * 1e-6, rng) for i in range(count)))
+                emitted += count
+            self._stopped.wait(interval)
+
+    def start(self) -> "FakeDockerDaemon":
+        fake = self
+
+        class Handler(_QuietHandler):
+            def do_HEAD(self):
+                self.do_GET()
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                path = _API_VERSION.sub("", url.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                try:
+                    fake.route(self, path, params)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def do_POST(self):
+                self.send_json({})
+
+        self._server = _UnixHTTPServer(self.socket_path, Handler)
+        threading.Thread(target=self._server.serve_forever, name="fake-docker", daemon=True).start()
+        return self
+
+    def route(self, handler: _QuietHandler, path: str, params: Dict[str, str]) -> None:
+        if path == "/_ping":
+            body = b"OK"
+            handler.send_response(200)
+            handler.send_header("Content-Type", "text/plain")
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        elif path == "/version":
+            handler.send_json({"ApiVersion": "1.43", "MinAPIVersion": "1.12", "Version": "24.0.0",
+                               "Os": "linux", "Arch": "amd64"})
+        elif path == "/containers/json":
+            filters = json.loads(params.get("filters", "{}"))
+            containers = list(self.containers.values())
+            ids = filters.get("id")
+            if ids:
+                containers = [c for c in containers if any(c["Id"].startswith(i) for i in ids)]
+            handler.send_json(containers)
+        elif path == "/events":
+            handler.start_chunked("application/json")
+            self._stopped.wait()
+        elif path.startswith("/containers/"):
+            _, _, ref, action = path.split("/", 3)
+            container = self.lookup(ref)
+            if container is None:
+                handler.send_json({"message": f"No such container: {ref}"}, status=404)
+            elif action == "json":
+                handler.send_json(self.inspect(container))
+            elif action == "stats":
+                handler.send_json(self.stats())
+            elif action == "logs":
+                self.stream_logs(handler, params)
+            else:
+                handler.send_json({"message": "not implemented"}, status=404)
+        else:
+            handler.send_json({"message": "not implemented"}, status=404)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+
+class SessionState(dict):
+    """Plain stand-in for st.session_state, which only holds values under `streamlit run`."""
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+@contextlib.contextmanager
+def session_state():
+    """Give page functions a working session state while running outside Streamlit."""
+    original = st.session_state
+    st.session_state = SessionState()
+    try:
+        yield st.session_state
+    finally:
+        st.session_state = original
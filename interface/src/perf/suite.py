@@ -0,0 +1,324 @@
+# perf/suite.py
+
+import asyncio
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import streamlit as st
+
+from perf.fakes import FakeDockerDaemon, FakePrometheus, container_names, session_state
+
+# Iterations of the allocation pass; tracemalloc slows calls down too much to time them in the same pass.
+ALLOC_ITERATIONS = 50
+WARMUP_ITERATIONS = 3
+
+def _serve_fakes(names: List[str], log_rate: float, prometheus_latency: float, socket_path: str,
+                 ready, stop) -> None:
+    prometheus = FakePrometheus(names, latency=prometheus_latency).start()
+    docker = FakeDockerDaemon(names, log_rate=log_rate, socket_path=socket_path).start()
+    ready.put(prometheus.url)
+    stop.wait()
+    docker.stop()
+    prometheus.stop()
+
+class Fakes:
+    """Runs the fake Prometheus and Docker daemon in a child process.
+
+    Keeping them out of the measured process means their threads neither take
+    the GIL from the code under test nor show up in its CPU time.
+    """
+
+    def __init__(self, containers: int, log_rate: float, prometheus_latency: float = 0.0):
+        self.names = container_names(containers)
+        self.log_rate = log_rate
+        self.prometheus_latency = prometheus_latency
+        self.socket_path = os.path.join(os.environ.get("TMPDIR", "/tmp"), f"logwatcher-perf-{os.getpid()}.sock")
+        self.prometheus_url: Optional[str] = None
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._process = None
+
+    @property
+    def docker_url(self) -> str:
+        return f"unix://{self.socket_path}"
+
+    def __enter__(self) -> "Fakes":
+        ready = self._context.Queue()
+        self._process = self._context.Process(
+            target=_serve_fakes, args=(self.names, self.log_rate, self.prometheus_latency, self.socket_path,
+                                       ready, self._stop), daemon=True)
+        self._process.start()
+        self.prometheus_url = ready.get(timeout=30)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+
+def measure(name: str, fn: Callable[[], Any], iterations: int, setup: Optional[Callable[[], Any]] = None,
+            warmup: int = WARMUP_ITERATIONS) -> Dict[str, Any]:
+    """Time fn over iterations calls, then trace the allocations of a shorter pass.
+
+    setup runs before every call, outside the timed region (but inside the
+    allocation pass, so keep it cheap).
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    timings = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    traced = min(iterations, ALLOC_ITERATIONS)
+    peaks = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(traced):
+            if setup:
+                setup()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            fn()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "name": name,
+        "iterations": iterations,
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "max_ms": timings[-1] * 1000,
+        "peak_kib": statistics.median(peaks) / 1024,
+        "retained_kib": retained / traced / 1024,
+    }
+
+def metrics_cases(fakes: Fakes, iterations: int) -> List[Dict[str, Any]]:
+    from utils.monitoring import configure_monitor, get_container_metrics, get_fleet_metrics, get_query_cache
+
+    configure_monitor(fakes.prometheus_url)
+    cache = get_query_cache()
+    name = fakes.names[0]
+    return [
+        measure("get_container_metrics (cold)", lambda: get_container_metrics(name), iterations,
+                setup=cache.invalidate),
+        measure("get_container_metrics (cached)", lambda: get_container_metrics(name), iterations),
+        measure(f"get_fleet_metrics ({len(fakes.names)} containers)", get_fleet_metrics, iterations,
+                setup=cache.invalidate),
+    ]
+
+def docker_cases(fakes: Fakes, iterations: int) -> List[Dict[str, Any]]:
+    from utils.dockermanager import configure_docker_client, get_docker_manager
+
+    os.environ["DOCKER_HOST"] = fakes.docker_url
+    configure_docker_client()
+    manager = get_docker_manager()
+    results = [
+        measure(f"list_containers ({len(fakes.names)} containers)", lambda: manager.list_containers(all=True),
+                iterations),
+        measure("list_containers (network filter)",
+                lambda: manager.list_containers(all=True, networks=['monitoring']), iterations),
+    ]
+    # A fresh client and registry: version handshake, container list and event subscription.
+    results.append(measure("list_containers (cold client)", lambda: manager.list_containers(all=True),
+                           max(5, iterations // 20), setup=configure_docker_client, warmup=1))
+    return results
+
+def log_pipeline_case(iterations: int, batch: int) -> Dict[str, Any]:
+    """Parsing, buffering, indexing and template mining of one batch of lines, as update_logs does it."""
+    import random
+    from perf.fakes import FakeDockerDaemon
+    from utils.dockermanager import parse_log_line
+    from utils.logbuffer import LogBuffer
+    from utils.logindex import LogIndex
+    from utils.logparsing import LogMetrics, parse_lines
+    from utils.logtemplates import TemplateMiner
+
+    rng = random.Random(0)
+    now = time.time()
+    raw = [FakeDockerDaemon.log_frame(now + i * 1e-3, rng)[8:].decode().rstrip("\n") for i in range(batch)]
+    buffer = LogBuffer(index=LogIndex())
+    miner = TemplateMiner()
+    metrics = LogMetrics()
+
+    def run():
+        parsed = list(parse_lines([parse_log_line(line) for line in raw], "app", metrics))
+        buffer.extend(parsed)
+        miner.extend(parsed)
+
+    return measure(f"log pipeline ({batch}-line batch)", run, iterations)
+
+def log_search_case(iterations: int, lines: int) -> Dict[str, Any]:
+    import random
+    from perf.fakes import FakeDockerDaemon
+    from utils.dockermanager import parse_log_line
+    from utils.logbuffer import LogBuffer
+    from utils.logindex import LogIndex
+    from utils.logparsing import LogMetrics, parse_lines
+
+    rng = random.Random(1)
+    now = time.time()
+    raw = [FakeDockerDaemon.log_frame(now + i * 1e-3, rng)[8:].decode().rstrip("\n") for i in range(lines)]
+    buffer = LogBuffer(max_lines=lines, index=LogIndex())
+    buffer.extend(list(parse_lines([parse_log_line(line) for line in raw], "app", LogMetrics())))
+    return measure(f"log search ({lines} buffered lines)",
+                   lambda: buffer.search("payment service", limit=500), iterations)
+
+def log_index_turnover_case(iterations: int, batch: int, max_lines: int = 1000) -> Dict[str, Any]:
+    """Batches pushed through a small indexed buffer that keeps turning over.
+
+    Timing only; tests/test_logindex.py checks that the postings stay bounded.
+    """
+    import random
+    from perf.fakes import FakeDockerDaemon
+    from utils.dockermanager import parse_log_line
+    from utils.logbuffer import LogBuffer
+    from utils.logindex import LogIndex
+    from utils.logparsing import LogMetrics, parse_lines
+
+    rng = random.Random(2)
+    now = time.time()
+    raw = [FakeDockerDaemon.log_frame(now + i * 1e-3, rng)[8:].decode().rstrip("\n") for i in range(batch)]
+    parsed = list(parse_lines([parse_log_line(line) for line in raw], "app", LogMetrics()))
+    buffer = LogBuffer(max_lines=max_lines, index=LogIndex())
+    return measure(f"log index turnover ({batch} into {max_lines} lines)",
+                   lambda: buffer.extend(parsed), iterations)
+
+def _run_log_loop(container: str, seconds: float, max_lines: int) -> int:
+    from pages import logs as logs_page
+
+    stop = threading.Event()
+    with session_state() as state:
+        async def run():
+            asyncio.get_running_loop().call_later(seconds, stop.set)
+            await logs_page.update_logs(st.empty(), stop, "all/all", config_type=container, max_lines=max_lines)
+
+        asyncio.run(run())
+        return state.log_buffer.next_seq if "log_buffer" in state else 0
+
+def log_loop_case(fakes: Fakes, seconds: float, max_lines: int) -> Dict[str, Any]:
+    """Run pages.logs.update_logs against the fake daemon and report its cost per line.
+
+    Throughput and CPU come from an untraced run; peak allocation from a
+    shorter second run under tracemalloc.
+    """
+    container = fakes.names[0]
+    cpu_started, started = time.process_time(), time.perf_counter()
+    lines = _run_log_loop(container, seconds, max_lines)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    tracemalloc.start()
+    try:
+        _run_log_loop(container, min(seconds, 2.0), max_lines)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "name": f"update_logs loop ({fakes.log_rate:g} lines/s offered)",
+        "seconds": round(elapsed, 2),
+        "lines": lines,
+        "lines_per_second": lines / elapsed,
+        "cpu_ms_per_1000_lines": cpu / lines * 1e6 if lines else None,
+        "cpu_percent": cpu / elapsed * 100,
+        "peak_kib": peak / 1024,
+    }
+
+def history_cases(fakes: Fakes, iterations: int) -> List[Dict[str, Any]]:
+    from pages import monitoring as monitoring_page
+    from utils.monitoring import configure_monitor
+
+    configure_monitor(fakes.prometheus_url)
+    name = fakes.names[0]
+    results = []
+    with session_state() as state:
+        for label, window in (("5 minutes", 300), ("1 hour", 3600)):
+            results.append(measure(f"update_history backfill ({label})",
+                                   lambda: monitoring_page.update_history(name, window),
+                                   max(5, iterations // 10), setup=lambda: state.clear()))
+        # Incremental fetches: pretend the last sample is a few steps old, as on a normal rerun.
+        monitoring_page.update_history(name, 3600)
+
+        def rewind():
+            state.history_last -= 30
+
+        results.append(measure("update_history incremental (1 hour)",
+                               lambda: monitoring_page.update_history(name, 3600), iterations, setup=rewind))
+    return results
+
+def dashboard_case(fakes: Fakes, iterations: int) -> Dict[str, Any]:
+    from pages import monitoring as monitoring_page
+    from utils.monitoring import configure_monitor, get_container_metrics
+
+    configure_monitor(fakes.prometheus_url)
+    name = fakes.names[0]
+    with session_state():
+        monitoring_page.update_history(name, 3600)
+        metrics = get_container_metrics(name)
+        return measure("create_dashboard figure (1 hour history)",
+                       lambda: monitoring_page.create_dashboard(metrics), iterations)
+
+def run_suite(containers: int = 50, log_rate: float = 1000.0, iterations: int = 200, log_seconds: float = 5.0,
+              prometheus_latency: float = 0.0, log_batch: int = 500, max_lines: int = 100000,
+              only: Optional[str] = None) -> Dict[str, Any]:
+    """Run every case (or those whose group name contains `only`) and return their reports."""
+    groups = {
+        "metrics": lambda fakes: metrics_cases(fakes, iterations),
+        "docker": lambda fakes: docker_cases(fakes, iterations),
+        "logs": lambda fakes: [log_pipeline_case(iterations, log_batch), log_index_turnover_case(iterations, log_batch),
+                              log_search_case(iterations, max_lines)],
+        "history": lambda fakes: history_cases(fakes, iterations),
+        "dashboard": lambda fakes: [dashboard_case(fakes, iterations)],
+    }
+    cases, loops = [], []
+    with Fakes(containers, log_rate, prometheus_latency) as fakes:
+        for group, run in groups.items():
+            if only and only not in group:
+                continue
+            cases.extend(run(fakes))
+        if not only or only in "log loop":
+            os.environ["DOCKER_HOST"] = fakes.docker_url
+            from utils.dockermanager import configure_docker_client
+            configure_docker_client()
+            loops.append(log_loop_case(fakes, log_seconds, max_lines))
+    return {
+        "settings": {"containers": containers, "log_rate": log_rate, "iterations": iterations,
+                     "prometheus_latency_ms": prometheus_latency * 1000},
+        "cases": cases,
+        "loops": loops,
+    }
+
+def format_report(report: Dict[str, Any]) -> str:
+    settings = report["settings"]
+    lines = [f"LogWatcher hot paths: {settings['containers']} containers, {settings['log_rate']:g} log lines/s, "
+             f"Prometheus latency {settings['prometheus_latency_ms']:g} ms", ""]
+    header = f"{'case':<44} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'peak KiB':>10} {'kept KiB':>9}"
+    lines += [header, "-" * len(header)]
+    for case in report["cases"]:
+        lines.append(f"{case['name']:<44} {case['mean_ms']:>9.3f} {case['p50_ms']:>9.3f} {case['p95_ms']:>9.3f} "
+                     f"{case['max_ms']:>9.3f} {case['peak_kib']:>10.1f} {case['retained_kib']:>9.2f}")
+    for loop in report["loops"]:
+        cpu = loop['cpu_ms_per_1000_lines']
+        lines += ["", f"{loop['name']}: {loop['lines']} lines in {loop['seconds']}s "
+                      f"({loop['lines_per_second']:.0f}/s), {cpu:.2f} CPU ms per 1000 lines, "
+                      f"{loop['cpu_percent']:.0f}% CPU, peak {loop['peak_kib']:.0f} KiB"
+                  if cpu is not None else f"{loop['name']}: no lines arrived in {loop['seconds']}s"]
+    return "\n".join(lines)
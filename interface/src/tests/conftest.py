@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app imports its modules as top-level packages (utils, perf) from interface/src.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,61 @@
+import asyncio
+import math
+
+from aiohttp import web
+
+from utils.loadgen import LatencyHistogram, run_load
+
+def histogram_of(latencies):
+    histogram = LatencyHistogram()
+    for latency in latencies:
+        histogram.record(latency)
+    return histogram
+
+def test_percentiles_are_within_one_percent():
+    latencies = [ms / 1000 for ms in range(1, 1001)]
+    histogram = histogram_of(latencies)
+    for percent in (50, 90, 99, 99.9):
+        exact = latencies[math.ceil(len(latencies) * percent / 100) - 1]
+        assert exact <= histogram.percentile(percent) <= exact * LatencyHistogram.RATIO
+    assert histogram.percentile(100) == 1.0
+    assert histogram.mean() == sum(latencies) / len(latencies)
+
+def test_empty_histogram_has_no_percentiles():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    assert histogram.summary()["min_ms"] is None
+
+def test_merge_equals_recording_everything_in_one():
+    latencies = [0.0005 * 1.7 ** i for i in range(30)]
+    merged = histogram_of(latencies[::2]).merge(histogram_of(latencies[1::2]))
+    whole = histogram_of(latencies)
+    assert merged.counts == whole.counts
+    assert (merged.total, merged.min, merged.max) == (whole.total, whole.min, whole.max)
+    assert math.isclose(merged.sum, whole.sum)
+    assert merged.summary() == whole.summary()
+
+def test_round_trips_through_a_dict():
+    histogram = histogram_of([0.001, 0.002, 0.5])
+    assert LatencyHistogram.from_dict(histogram.to_dict()).summary() == histogram.summary()
+
+async def _serve_and_load(**options):
+    async def handle(request):
+        await asyncio.sleep(0.005)
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await run_load(f"http://127.0.0.1:{port}/", **options)
+    finally:
+        await runner.cleanup()
+
+def test_warmup_requests_do_not_count_towards_num_requests():
+    result = asyncio.run(_serve_and_load(concurrency=2, num_requests=20, warmup=0.1))
+    assert result.requests == 20
+    assert result.successes == 20
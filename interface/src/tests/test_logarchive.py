@@ -0,0 +1,68 @@
+import datetime
+import time
+
+from utils.dockermanager import LogLine
+from utils.logarchive import LogArchive
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+def lines(count, start=0, source="app"):
+    return [LogLine(START + datetime.timedelta(seconds=i), f"line {i}\nwith \\ escapes", source)
+            for i in range(start, start + count)]
+
+def test_round_trip_and_time_seek(tmp_path):
+    archive = LogArchive(str(tmp_path), block_bytes=256)
+    written = lines(100)
+    assert archive.append("web", written) == 100
+    archive.close()
+
+    reader = LogArchive(str(tmp_path))
+    assert list(reader.read("web")) == written
+    since, until = START + datetime.timedelta(seconds=40), START + datetime.timedelta(seconds=59)
+    assert list(reader.read("web", since, until)) == written[40:60]
+    assert reader.time_range("web") == (START, START + datetime.timedelta(seconds=99))
+
+def test_repeats_are_skipped_across_restarts(tmp_path):
+    archive = LogArchive(str(tmp_path))
+    assert archive.append("web", lines(10)) == 10
+    assert archive.append("web", lines(12)) == 2
+    archive.close()
+
+    restarted = LogArchive(str(tmp_path))
+    # A reconnect replays the last few seconds; only the new lines are kept.
+    assert restarted.append("web", lines(6, start=8)) == 2
+    restarted.close()
+    assert list(LogArchive(str(tmp_path)).read("web")) == lines(14)
+
+def test_same_timestamp_lines_are_not_repeats(tmp_path):
+    archive = LogArchive(str(tmp_path))
+    same = [LogLine(START, "first", "app"), LogLine(START, "second", "app")]
+    assert archive.append("web", same) == 2
+    assert list(archive.read("web")) == same
+
+def test_retention_deletes_oldest_segments(tmp_path):
+    archive = LogArchive(str(tmp_path), block_bytes=1, segment_bytes=1, retention_bytes=600)
+    for i in range(20):
+        archive.append("web", lines(1, start=i * 10))
+    archive.close()
+
+    segments = sorted(p.name for p in (tmp_path / "web").glob("*.seg"))
+    assert 1 < len(segments) < 20
+    assert sum(p.stat().st_size for p in (tmp_path / "web").glob("*.seg")) <= 600 + 200
+    # What is left is the newest data.
+    kept = list(LogArchive(str(tmp_path)).read("web"))
+    assert kept[-1] == lines(1, start=190)[0]
+    assert kept[0].timestamp > START
+
+def test_pending_lines_are_flushed_by_the_timer(tmp_path):
+    archive = LogArchive(str(tmp_path), flush_seconds=0.05).start()
+    try:
+        archive.append("web", lines(3))
+        # A second archive only sees what is on disk.
+        reader = LogArchive(str(tmp_path))
+        deadline = time.monotonic() + 5
+        while list(reader.read("web")) != lines(3):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        archive.close()
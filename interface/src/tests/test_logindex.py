@@ -0,0 +1,80 @@
+import datetime
+import random
+import re
+
+import pytest
+
+from utils.dockermanager import LogLine
+from utils.logbuffer import LogBuffer
+from utils.logindex import COMPACTION_RATIO, LogIndex, required_literals, trigrams
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+WORDS = ["GET", "POST", "/api/users", "/api/orders", "status=200", "status=500", "error:", "timeout",
+         "connection", "refused", "took", "12ms", "340ms", "user=alice", "user=bob"]
+
+def random_lines(count, seed=1, start=0):
+    rng = random.Random(seed)
+    return [LogLine(START + datetime.timedelta(seconds=i), " ".join(rng.choices(WORDS, k=6)), "app")
+            for i in range(start, start + count)]
+
+def test_trigrams_are_lowercase_and_overlapping():
+    assert trigrams("ERRor") == {"err", "rro", "ror"}
+    assert trigrams("ab") == set()
+
+@pytest.mark.parametrize("pattern, literals", [
+    ("connection refused", ["connection refused"]),
+    (r"error: \d+ failed", ["error: ", " failed"]),
+    (r"GET /api/v1/users/[0-9]+ HTTP", ["GET /api/v1/users/", " HTTP"]),
+    ("colou?r", ["colo"]),
+    ("ab+cde", ["cde"]),
+    ("(foo)bar", ["bar"]),
+    (r"\x41bcd", ["bcd"]),
+    ("timeout|refused", []),
+    ("(?x) error", []),
+])
+def test_required_literals(pattern, literals):
+    assert required_literals(pattern) == literals
+
+def test_required_literals_occur_in_every_match():
+    lines = [line.message for line in random_lines(500)]
+    for pattern in [r"status=5\d\d", r"took \d+ms", r"user=\w+ GET", r"/api/(users|orders) took"]:
+        for message in lines:
+            if re.search(pattern, message):
+                assert all(literal in message for literal in required_literals(pattern))
+
+def test_substring_candidates_cover_every_match():
+    index = LogIndex()
+    lines = random_lines(500)
+    for seq, line in enumerate(lines):
+        index.add(seq, line)
+    for fragment in ["status=500", "ERROR:", "user=bob post", "refused conn"]:
+        candidates = set(index.substring_candidates([fragment], range(0, 2 ** 62)))
+        matches = {seq for seq, line in enumerate(lines) if fragment.lower() in line.message.lower()}
+        assert matches <= candidates
+    assert index.substring_candidates([], range(0, 2 ** 62)) is None
+
+@pytest.mark.parametrize("pattern, regex", [
+    ("status=500", False), ("User=Alice", False), (r"took \d{3}ms", True), (r"error: \w+ \S+ refused", True),
+])
+def test_indexed_search_matches_a_scan(pattern, regex):
+    indexed = LogBuffer(max_lines=300, index=LogIndex())
+    scanned = LogBuffer(max_lines=300)
+    for batch in range(5):
+        lines = random_lines(100, seed=batch, start=batch * 100)
+        indexed.extend(lines)
+        scanned.extend(lines)
+        assert indexed.search(pattern, regex=regex) == scanned.search(pattern, regex=regex)
+    since = (START + datetime.timedelta(seconds=250)).timestamp()
+    assert indexed.search(pattern, regex=regex, since=since) == scanned.search(pattern, regex=regex, since=since)
+
+def test_postings_stay_bounded_under_turnover():
+    max_lines, batch = 1000, 100
+    buffer = LogBuffer(max_lines=max_lines, index=LogIndex())
+    lines = random_lines(batch)
+    widest = max(len(trigrams(line.message)) for line in lines)
+    # At most the buffer plus the stale share compaction tolerates, plus one batch.
+    bound = (max_lines / (1 - COMPACTION_RATIO) + batch) * widest
+    for _ in range(200):
+        buffer.extend(lines)
+        assert buffer.index.postings <= bound
+    assert buffer.index.first_seq == buffer.first_seq
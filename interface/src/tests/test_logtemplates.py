@@ -0,0 +1,31 @@
+from utils.logtemplates import WILDCARD, LogCluster, TemplateMiner
+
+def test_wildcards_are_not_counted_as_similar():
+    cluster = LogCluster(1, ["user", WILDCARD, "logged", "in"], [])
+    assert cluster.similarity(["user", "bob", "logged", "in"]) == (0.75, 1)
+    assert cluster.similarity(["user", "bob", "logged", "out"]) == (0.5, 1)
+
+def test_ties_go_to_the_template_with_more_wildcards():
+    miner = TemplateMiner(similarity=0.5)
+    specific = LogCluster(1, ["job", "a", "done", "x"], [])
+    general = LogCluster(2, ["job", "a", WILDCARD, "x"], [])
+    leaf = miner._leaf(["job", "a", "done", "x"])
+    for cluster in (specific, general):
+        miner.clusters[cluster.cluster_id] = cluster
+        leaf.append(cluster.cluster_id)
+    miner._next_id = 3
+
+    # Both templates share three constants with the line.
+    assert miner.add("job a failed x") is general
+
+def test_lines_are_grouped_into_templates():
+    miner = TemplateMiner()
+    for user in ("alice", "bob", "carol"):
+        miner.add(f"login accepted for {user} from 10.0.0.1")
+    miner.add("connection reset by peer")
+
+    templates = miner.templates()
+    assert [t["template"] for t in templates] == [f"login accepted for {WILDCARD} from {WILDCARD}",
+                                                "connection reset by peer"]
+    assert templates[0]["count"] == 3
+    assert templates[0]["examples"][3] == ["alice", "bob", "carol"]
@@ -0,0 +1,61 @@
+import pytest
+
+from utils.scenario import Ramp, Scenario, ScenarioError, list_scenarios, load_scenario
+
+VALID = """
+name: checkout
+base_url: http://shop:8080
+defaults:
+  headers: {Accept: application/json}
+requests:
+  - path: /cart
+    weight: 3
+  - method: post
+    path: /checkout
+    headers: {X-Test: "1"}
+stages:
+  - name: ramp
+    duration: 10
+    rate: [10, 100]
+  - duration: 5
+    concurrency: 4
+    slo: {p99_ms: 250, error_rate: 0.01}
+"""
+
+def test_valid_scenario():
+    scenario = Scenario.from_yaml(VALID)
+    assert scenario.name == "checkout"
+    assert scenario.duration == 15
+    assert [r["name"] for r in scenario.requests] == ["GET /cart", "POST /checkout"]
+    assert scenario.requests[1]["headers"] == {"Accept": "application/json", "X-Test": "1"}
+    ramp, closed = scenario.stages
+    assert isinstance(ramp.rate, Ramp) and ramp.rate(5) == pytest.approx(55)
+    assert (closed.name, closed.concurrency, closed.rate) == ("stage 2", 4, None)
+    assert scenario.request_mix().specs[1][:2] == ("POST", "http://shop:8080/checkout")
+
+def test_shipped_scenarios_load():
+    for path in list_scenarios():
+        assert load_scenario(path).stages
+
+@pytest.mark.parametrize("text, message", [
+    ("stages: [", "Invalid YAML"),
+    ("- just a list", "must be a mapping"),
+    ("stages: []", "at least one stage"),
+    ("stages: [{duration: 10}]", "exactly one of rate or concurrency"),
+    ("stages: [{duration: 10, rate: 5, concurrency: 2}]", "exactly one of rate or concurrency"),
+    ("stages: [{rate: 5}]", "duration must be a positive number"),
+    ("stages: [{duration: -1, rate: 5}]", "duration must be a positive number"),
+    ("stages: [{duration: 10s, rate: 5}]", "duration must be a positive number"),
+    ("stages: [{duration: 10, rate: fast}]", "rate must be a positive number"),
+    ("stages: [{duration: 10, rate: [0, high]}]", "ramp rates must be non-negative"),
+    ("stages: [{duration: 10, rate: [1, 2, 3]}]", "a ramp is [start rate, end rate]"),
+    ("stages: [{duration: 10, concurrency: 0}]", "concurrency must be a positive integer"),
+    ("stages: [{duration: 10, rate: 5, slo: {p95_ms: 100}}]", "unknown SLO keys"),
+    ("stages: [ramp]", "Stage 1 must be a mapping"),
+    ("requests: [/health]\nstages: [{duration: 10, rate: 5}]", "Request 1 must be a mapping"),
+    ("requests: [{path: /, weight: 0}]\nstages: [{duration: 10, rate: 5}]", "weight must be positive"),
+    ("requests: [{path: /, weight: heavy}]\nstages: [{duration: 10, rate: 5}]", "weight must be positive"),
+])
+def test_invalid_scenarios_raise_scenario_error(text, message):
+    with pytest.raises(ScenarioError, match=message.replace("[", r"\[")):
+        Scenario.from_yaml(text)
@@ -0,0 +1,95 @@
+import math
+import random
+
+import pytest
+
+from utils.benchstore import compare_runs
+from utils.loadgen import LatencyHistogram, LoadResult
+from utils.significance import mann_whitney, regularized_beta, student_t_two_sided, welch_t_test
+
+def histogram_of(latencies):
+    histogram = LatencyHistogram()
+    for latency in latencies:
+        histogram.record(latency)
+    return histogram
+
+def test_regularized_beta_closed_forms():
+    for x in (0.1, 0.5, 0.9):
+        assert regularized_beta(3, 1, x) == pytest.approx(x ** 3)
+        assert regularized_beta(1, 4, x) == pytest.approx(1 - (1 - x) ** 4)
+    assert regularized_beta(7, 7, 0.5) == pytest.approx(0.5)
+    assert regularized_beta(2, 3, 0) == 0.0 and regularized_beta(2, 3, 1) == 1.0
+
+@pytest.mark.parametrize("t", [0.5, 1.0, 3.0, 12.706])
+def test_student_t_matches_the_closed_forms_for_one_and_two_degrees_of_freedom(t):
+    assert student_t_two_sided(t, 1) == pytest.approx(1 - 2 / math.pi * math.atan(t))
+    assert student_t_two_sided(t, 2) == pytest.approx(1 - t / math.sqrt(2 + t * t))
+
+def test_student_t_critical_values():
+    assert student_t_two_sided(2.228, 10) == pytest.approx(0.05, abs=1e-4)
+    assert student_t_two_sided(2.086, 20) == pytest.approx(0.05, abs=1e-4)
+    assert student_t_two_sided(1.959964, math.inf) == pytest.approx(0.05, abs=1e-6)
+
+def test_welch_against_a_published_example():
+    # Welch's t-test example from the literature: t = 2.46, df = 24.9, p = 0.021 (sign: candidate - baseline).
+    a1 = [27.5, 21.0, 19.0, 23.6, 17.0, 17.9, 16.9, 20.1, 21.9, 22.6, 23.1, 19.6, 19.0, 21.7, 21.4]
+    a2 = [27.1, 22.0, 20.8, 23.4, 23.4, 23.5, 25.8, 22.0, 24.8, 20.2, 21.9, 22.1, 22.9, 20.5, 24.4]
+    result = welch_t_test(a1, a2)
+    assert result["t"] == pytest.approx(2.46, abs=0.01)
+    assert result["df"] == pytest.approx(24.9, abs=0.1)
+    assert result["p_value"] == pytest.approx(0.021, abs=0.001)
+
+def test_welch_degenerate_inputs():
+    assert welch_t_test([1.0], [1.0, 2.0])["p_value"] is None
+    assert welch_t_test([3.0, 3.0], [3.0, 3.0])["p_value"] == 1.0
+    assert welch_t_test([3.0, 3.0], [4.0, 4.0])["p_value"] == 0.0
+
+def test_mann_whitney_separated_samples():
+    result = mann_whitney(histogram_of([0.001, 0.002, 0.003, 0.004, 0.005]),
+                          histogram_of([0.006, 0.007, 0.008, 0.009, 0.010]))
+    # U = 25 out of 25 pairs; z = 12.5 / sqrt(25 * 11 / 12) without continuity correction.
+    assert result["u"] == 25
+    assert result["effect"] == 1.0
+    assert result["z"] == pytest.approx(2.6112, abs=1e-4)
+    assert result["p_value"] == pytest.approx(0.00902, abs=1e-5)
+
+def test_mann_whitney_interleaved_and_tied_samples():
+    interleaved = mann_whitney(histogram_of([0.001, 0.003, 0.005, 0.007, 0.009]),
+                               histogram_of([0.002, 0.004, 0.006, 0.008, 0.010]))
+    assert interleaved["u"] == 15 and interleaved["effect"] == 0.6
+
+    same = histogram_of([0.002, 0.003, 0.004])
+    assert mann_whitney(same, same)["p_value"] == pytest.approx(1.0)
+    tied = mann_whitney(histogram_of([0.005] * 10), histogram_of([0.005] * 10))
+    assert (tied["z"], tied["effect"]) == (0.0, 0.5)
+    assert mann_whitney(LatencyHistogram(), same)["p_value"] is None
+
+def run(requests, latency_ms, seed, seconds=10):
+    rng = random.Random(seed)
+    result = LoadResult()
+    for i in range(requests):
+        result.record(i * seconds / requests, rng.gauss(latency_ms, latency_ms / 10) / 1000, None)
+    result.duration = seconds
+    return result
+
+def test_compare_runs_flags_slower_latency():
+    baseline = [run(1000, 10, seed) for seed in range(3)]
+    candidate = [run(1000, 13, seed) for seed in range(3, 6)]
+    comparison = compare_runs(baseline, candidate)
+    assert comparison["latency_regression"]
+    assert comparison["latency_change"]["p50_ms"] == pytest.approx(0.3, abs=0.05)
+    assert not comparison["throughput_regression"]
+    assert comparison["throughput_test"]["samples"] == "runs"
+
+def test_compare_runs_flags_lower_throughput():
+    baseline = [run(n, 10, seed) for seed, n in enumerate((1000, 1010, 990))]
+    candidate = [run(n, 10, seed) for seed, n in enumerate((500, 505, 495), start=3)]
+    comparison = compare_runs(baseline, candidate)
+    assert comparison["throughput_regression"]
+    assert comparison["throughput_change"] == pytest.approx(-0.5)
+    assert not comparison["latency_regression"]
+
+def test_compare_runs_passes_equivalent_runs():
+    comparison = compare_runs([run(1000, 10, 1)], [run(1000, 10, 2)])
+    assert comparison["throughput_test"]["samples"] == "seconds"
+    assert not comparison["regression"]
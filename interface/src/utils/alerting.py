@@ -1,15 +1,20 @@
 # utils/alerting.py
 
-import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from utils.transport import HTTPTransport, get_transport
 
 class PrometheusAlerts:
-    def __init__(self, prometheus_url: str = "http://localhost:9090"):
+    def __init__(self, prometheus_url: str = "http://localhost:9090", transport: Optional[HTTPTransport] = None):
         self.prometheus_url = prometheus_url
+        self._transport = transport
+
+    @property
+    def transport(self) -> HTTPTransport:
+        return self._transport or get_transport()
 
     def get_alerts(self) -> List[Dict[str, Any]]:
         """Fetch current alerts from Prometheus"""
-        response = requests.get(f"{self.prometheus_url}/api/v1/alerts")
+        response = self.transport.get(f"{self.prometheus_url}/api/v1/alerts")
         if response.status_code == 200:
             return response.json().get('data', {}).get('alerts', [])
         return []
@@ -21,10 +26,17 @@ class PrometheusAlerts:
         print(f"Creating alert: {name} with expression: {expression}")
         return True
 
+_alerts: Optional[PrometheusAlerts] = None
+
+def get_alerts_client() -> PrometheusAlerts:
+    """Return the shared PrometheusAlerts used by the module-level helpers."""
+    global _alerts
+    if _alerts is None:
+        _alerts = PrometheusAlerts()
+    return _alerts
+
 def get_current_alerts() -> List[Dict[str, Any]]:
-    alerts = PrometheusAlerts()
-    return alerts.get_alerts()
+    return get_alerts_client().get_alerts()
 
 def create_new_alert(name: str, expression: str, duration: str, severity: str) -> bool:
-    alerts = PrometheusAlerts()
-    return alerts.create_alert(name, expression, duration, severity)
\ No newline at end of file
+    return get_alerts_client().create_alert(name, expression, duration, severity)
\ No newline at end of file
@@ -2,78 +2,481 @@
 
 import time
 import asyncio
-import aiohttp
-from typing import Dict, Any
-from utils.dockermanager import DockerManager
-from utils.monitoring import get_container_metrics
+import functools
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from utils.dockermanager import get_docker_manager
+from utils.monitoring import live_values
+from utils.benchstore import BenchmarkStore, get_benchmark_store
+from utils.scenario import RequestMix, Scenario
+from utils.loadgen import DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT, LoadResult, run_load, run_load_processes
 
-docker_manager = DockerManager()
+docker_manager = get_docker_manager()
+
+DEFAULT_SAMPLE_INTERVAL = 0.25
+DEFAULT_P99_SLO_MS = 500.0
+DEFAULT_MAX_ERROR_RATE = 0.01
+# A step serving this much less than the offered rate is saturated even if its latency looks fine.
+SATURATION_SHORTFALL = 0.05
+# CFS period used when applying CPU limits: a quota of N * CPU_PERIOD allows N cores.
+CPU_PERIOD = 100000
+
+class ResourceSampler:
+    """Polls one-shot Docker stats for a container on a background thread.
+
+    Each sample is (wall-clock time, values keyed like CONTAINER_QUERIES). CPU
+    usage is the delta against the previous sample, so the first one has none.
+    """
+
+    def __init__(self, container_id: str, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.container_id = container_id
+        self.interval = interval
+        self.samples: List[Tuple[float, Dict[str, Optional[float]]]] = []
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ResourceSampler":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"sampler-{self.container_id[:12]}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> List[Tuple[float, Dict[str, Optional[float]]]]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def __enter__(self) -> "ResourceSampler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        previous, previous_time = None, None
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                stats = docker_manager.get_container_stats(self.container_id)
+                now = time.time()
+                if previous is not None:
+                    stats["precpu_stats"] = previous.get("cpu_stats") or {}
+                    self.samples.append((now, live_values(stats, previous, now - previous_time)))
+                previous, previous_time = stats, now
+            except Exception:
+                self.errors += 1
+            next_at += self.interval
+            self._stop.wait(max(0.0, next_at - time.monotonic()))
+
+    def summary(self, key: str, scale: float = 1.0, since: float = 0.0,
+                until: float = float('inf')) -> Dict[str, Optional[float]]:
+        """Average, max and min of one value over samples taken in [since, until)."""
+        values = [v[key] / scale for ts, v in self.samples if since <= ts < until and v.get(key) is not None]
+        if not values:
+            return {'average': None, 'max': None, 'min': None}
+        return {'average': sum(values) / len(values), 'max': max(values), 'min': min(values)}
+
+def align_timeline(load_result: Optional[LoadResult], samples: List[Tuple[float, Dict[str, Optional[float]]]],
+                   started_at: float) -> List[Dict[str, Any]]:
+    """Merge the load's per-second counters and the resource samples into one row per second."""
+    bins: Dict[int, List[Dict[str, Optional[float]]]] = {}
+    for ts, values in samples:
+        if ts >= started_at:
+            bins.setdefault(int(ts - started_at), []).append(values)
+    load_timeline = load_result.timeline if load_result is not None else {}
+
+    def mean(values):
+        values = [v for v in values if v is not None]
+        return sum(values) / len(values) if values else None
+
+    rows = []
+    last_periods = last_throttled = None
+    for second in range(max(list(bins) + list(load_timeline), default=-1) + 1):
+        requests, errors, latency = load_timeline.get(second, (0, 0, 0.0))
+        window = bins.get(second, [])
+        cpu = [v["cpu_usage"] for v in window if v.get("cpu_usage") is not None]
+        memory = [v["memory_usage"] for v in window if v.get("memory_usage") is not None]
+        periods = max((v["cpu_periods"] for v in window if v.get("cpu_periods") is not None), default=None)
+        throttled = max((v["cpu_throttled_periods"] for v in window if v.get("cpu_throttled_periods") is not None),
+                        default=None)
+        throttling = None
+        if None not in (periods, throttled, last_periods, last_throttled) and periods > last_periods:
+            throttling = (throttled - last_throttled) / (periods - last_periods) * 100
+        if periods is not None:
+            last_periods, last_throttled = periods, throttled
+        rows.append({
+            "second": second,
+            "requests_per_second": requests,
+            "errors_per_second": errors,
+            "mean_latency_ms": latency / requests * 1000 if requests else None,
+            "cpu_average": mean(cpu),
+            "cpu_max": max(cpu, default=None),
+            "memory_mb": max(memory) / (1024 * 1024) if memory else None,
+            "network_receive": mean([v.get("network_receive") for v in window]),
+            "network_transmit": mean([v.get("network_transmit") for v in window]),
+            "cpu_throttling": throttling,
+            "samples": len(window),
+        })
+    return rows
+
+def throttling_ratio(samples: List[Tuple[float, Dict[str, Optional[float]]]]) -> Optional[float]:
+    """Share of CFS periods (%) in which the container was throttled over the sampled span."""
+    counters = [(v['cpu_periods'], v['cpu_throttled_periods']) for _, v in samples
+                if v.get('cpu_periods') is not None and v.get('cpu_throttled_periods') is not None]
+    if len(counters) < 2 or counters[-1][0] <= counters[0][0]:
+        return None
+    return (counters[-1][1] - counters[0][1]) / (counters[-1][0] - counters[0][0]) * 100
+
+def step_failure(summary: Dict[str, Any], offered_rps: float, p99_slo_ms: float,
+                 max_error_rate: float) -> Optional[str]:
+    """Why a load step counts as unsustainable, or None when the container kept up."""
+    p99 = summary['latency']['p99_ms']
+    if summary['total_requests'] == 0:
+        return "no requests completed"
+    if p99 is not None and p99 > p99_slo_ms:
+        return f"p99 {p99:.0f} ms > {p99_slo_ms:g} ms SLO"
+    if summary['error_rate'] > max_error_rate:
+        return f"error rate {summary['error_rate']:.2%} > {max_error_rate:.2%}"
+    if summary['dropped_requests'] or summary['requests_per_second'] < offered_rps * (1 - SATURATION_SHORTFALL):
+        return f"served {summary['requests_per_second']:.0f} of {offered_rps:.0f} req/s offered"
+    return None
 
 class ContainerBenchmark:
     def __init__(self, container_name: str):
+        self.container_name = container_name
         self.container_id = docker_manager.get_container_id_by_name(container_name)
         self.container = docker_manager.get_container(self.container_id)
         self.results = {}
+        self.load_result: Optional[LoadResult] = None
+        self.samples: List[Tuple[float, Dict[str, Optional[float]]]] = []
+        self.params: Dict[str, Any] = {}
+
+    def _load(self, target, processes: int = 1, **options) -> LoadResult:
+        if processes > 1:
+            return run_load_processes(target, processes, **options)
+        return asyncio.run(run_load(target, **options))
+
+    async def http_benchmark(self, url: str, num_requests: Optional[int] = 100, concurrency: int = DEFAULT_CONCURRENCY,
+                             rate: Optional[float] = None, duration: Optional[float] = None,
+                             warmup: float = 0.0, timeout: float = DEFAULT_TIMEOUT, processes: int = 1) -> Dict[str, Any]:
+        """Load the URL with fixed concurrency, or a fixed arrival rate when rate is set.
+
+        Runs for `duration` seconds when given, otherwise for `num_requests` requests.
+        With processes > 1 the load is spread over that many worker processes.
+        """
+        options = dict(concurrency=concurrency, rate=rate, duration=duration,
+                       num_requests=None if duration else num_requests, warmup=warmup, timeout=timeout)
+        if processes > 1:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, functools.partial(run_load_processes, url, processes, **options))
+        else:
+            result = await run_load(url, **options)
+        self.load_result = result
+        self.results['http'] = result.summary()
+        return self.results['http']
+
+    def run_all_benchmarks(self, http_url: str, num_requests: Optional[int] = 100, duration: Optional[float] = None,
+                           sample_interval: float = DEFAULT_SAMPLE_INTERVAL, **load_options) -> Dict[str, Any]:
+        """Apply the HTTP load while sampling the container's resources.
+
+        The load runs for `duration` seconds when given, otherwise for
+        `num_requests` requests. CPU and memory figures are the container's
+        usage under that load (after warmup), not separate CPU or memory
+        stress tests, and results['timeline'] lines them up second by second
+        with throughput and latency.
+        """
+        if duration is None and not num_requests:
+            raise ValueError("Either duration or num_requests is required")
+        self.params = {'url': http_url, 'num_requests': None if duration else num_requests,
+                       'duration': duration, **load_options}
+        with ResourceSampler(self.container_id, sample_interval) as sampler:
+            asyncio.run(self.http_benchmark(http_url, num_requests, duration=duration, **load_options))
+        self.samples = sampler.samples
+
+        started_at = self.load_result.started_at
+        self.results['cpu'] = sampler.summary('cpu_usage', since=started_at)
+        self.results['memory'] = sampler.summary('memory_usage', scale=1024 * 1024, since=started_at)
+        self.results['timeline'] = align_timeline(self.load_result, self.samples, started_at)
+        return self.results
+
+    def run_scenario(self, scenario: Scenario, base_url: Optional[str] = None, processes: int = 1,
+                     sample_interval: float = DEFAULT_SAMPLE_INTERVAL) -> Dict[str, Any]:
+        """Play a scenario's stages in order while sampling the container's resources.
 
-    def cpu_benchmark(self, duration: int = 10) -> Dict[str, float]:
-        start_time = time.time()
-        cpu_stats = []
-        
-        while time.time() - start_time < duration:
-            stats = get_container_metrics('application')
-            cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - stats['precpu_stats']['cpu_usage']['total_usage']
-            system_delta = stats['cpu_stats']['system_cpu_usage'] - stats['precpu_stats']['system_cpu_usage']
-            cpu_percent = (cpu_delta / system_delta) * len(stats['cpu_stats']['cpu_usage']['percpu_usage']) * 100.0
-            cpu_stats.append(cpu_percent)
-            time.sleep(1)
-        
-        self.results['cpu'] = {
-            'average': sum(cpu_stats) / len(cpu_stats),
-            'max': max(cpu_stats),
-            'min': min(cpu_stats)
+        results['stages'] holds each stage's load summary, resource usage and
+        SLO checks; results['http'] and results['timeline'] cover the whole run.
+        """
+        mix = scenario.request_mix(base_url)
+        combined = LoadResult()
+        stages = []
+        windows = []
+        with ResourceSampler(self.container_id, sample_interval) as sampler:
+            for stage in scenario.stages:
+                options = dict(concurrency=stage.concurrency, rate=stage.rate, duration=stage.duration,
+                               timeout=scenario.timeout)
+                result = self._load(mix, processes, **options)
+                if combined.started_at is None:
+                    combined.started_at = result.started_at
+                summary = result.summary()
+                checks = stage.check_slo(summary)
+                stages.append({
+                    'name': stage.name,
+                    'load': stage.describe(),
+                    # Seconds since the first stage started, including the time spent between stages.
+                    'start': result.started_at - combined.started_at,
+                    'http': summary,
+                    'slo': checks,
+                    'passed': all(check['passed'] for check in checks.values()),
+                })
+                windows.append((result.started_at, result.started_at + result.duration))
+                combined.merge(result, offset=int(round(result.started_at - combined.started_at)))
+        combined.duration = windows[-1][1] - combined.started_at if windows else 0.0
+        self.samples = sampler.samples
+        self.load_result = combined
+        self.params = {**scenario.params(), 'base_url': base_url or scenario.base_url, 'processes': processes}
+
+        for stage, (since, until) in zip(stages, windows):
+            stage['cpu'] = sampler.summary('cpu_usage', since=since, until=until)
+            stage['memory'] = sampler.summary('memory_usage', scale=1024 * 1024, since=since, until=until)
+
+        self.results = {
+            'scenario': scenario.name,
+            'stages': stages,
+            'passed': all(stage['passed'] for stage in stages),
+            'http': combined.summary(),
+            'cpu': sampler.summary('cpu_usage', since=combined.started_at),
+            'memory': sampler.summary('memory_usage', scale=1024 * 1024, since=combined.started_at),
+            'timeline': align_timeline(combined, self.samples, combined.started_at),
         }
-        return self.results['cpu']
-
-    def memory_benchmark(self, duration: int = 10) -> Dict[str, float]:
-        start_time = time.time()
-        memory_stats = []
-        
-        while time.time() - start_time < duration:
-            stats = docker_manager.get_container_stats(self.container_id)
-            memory_usage = stats['memory_stats']['usage'] / (1024 * 1024)  # Convert to MB
-            memory_stats.append(memory_usage)
-            time.sleep(1)
-        
-        self.results['memory'] = {
-            'average': sum(memory_stats) / len(memory_stats),
-            'max': max(memory_stats),
-            'min': min(memory_stats)
+        return self.results
+
+    def capacity_sweep(self, target: Union[str, RequestMix], start_rate: float = 10, max_rate: float = 10000,
+                       growth: float = 1.5, step_duration: float = 10, warmup: float = 2,
+                       p99_slo_ms: float = DEFAULT_P99_SLO_MS, max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+                       refine_steps: int = 3, processes: int = 1, timeout: float = DEFAULT_TIMEOUT,
+                       sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+                       on_step: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Raise the arrival rate step by step until the container stops keeping up.
+
+        Rates grow geometrically from start_rate until a step breaks the p99
+        SLO, exceeds max_error_rate, or completes noticeably fewer requests
+        than offered; refine_steps bisections then narrow down the gap between
+        the last passing and the first failing rate. The highest passing rate
+        is the container's max sustainable RPS (the knee).
+        """
+        steps = []
+
+        def run_step(rate: float) -> Dict[str, Any]:
+            result = self._load(target, processes, rate=rate, duration=step_duration, warmup=warmup, timeout=timeout)
+            summary = result.summary()
+            until = result.started_at + result.duration
+            step = {
+                'offered_rps': rate,
+                'http': summary,
+                'cpu': sampler.summary('cpu_usage', since=result.started_at, until=until),
+                'memory': sampler.summary('memory_usage', scale=1024 * 1024, since=result.started_at, until=until),
+                'failure': step_failure(summary, rate, p99_slo_ms, max_error_rate),
+            }
+            steps.append(step)
+            if on_step is not None:
+                on_step(step)
+            return step
+
+        with ResourceSampler(self.container_id, sample_interval) as sampler:
+            passed, failed = None, None
+            rate = start_rate
+            while rate <= max_rate:
+                step = run_step(rate)
+                if step['failure']:
+                    failed = step
+                    break
+                passed = step
+                rate *= growth
+            if failed is not None:
+                low = passed['offered_rps'] if passed else 0.0
+                high = failed['offered_rps']
+                for _ in range(refine_steps):
+                    if high - low < max(1.0, high * 0.02):
+                        break
+                    step = run_step((low + high) / 2)
+                    if step['failure']:
+                        high, failed = step['offered_rps'], step
+                    else:
+                        low, passed = step['offered_rps'], step
+        self.samples = sampler.samples
+
+        steps.sort(key=lambda step: step['offered_rps'])
+        self.load_result = None
+        self.params = {'sweep': True, 'url': target if isinstance(target, str) else target.base_url,
+                       'start_rate': start_rate, 'max_rate': max_rate, 'growth': growth,
+                       'step_duration': step_duration, 'warmup': warmup, 'p99_slo_ms': p99_slo_ms,
+                       'max_error_rate': max_error_rate, 'processes': processes}
+        self.results = {
+            'sweep': {
+                'steps': steps,
+                'max_sustainable_rps': passed['http']['requests_per_second'] if passed else None,
+                'knee_offered_rps': passed['offered_rps'] if passed else None,
+                'limit_reason': failed['failure'] if failed else f"max rate {max_rate:g} req/s reached",
+                'p99_slo_ms': p99_slo_ms,
+                'max_error_rate': max_error_rate,
+            },
         }
-        return self.results['memory']
-
-    async def http_benchmark(self, url: str, num_requests: int = 100) -> Dict[str, Any]:
-        async with aiohttp.ClientSession() as session:
-            start_time = time.time()
-            tasks = [session.get(url) for _ in range(num_requests)]
-            responses = await asyncio.gather(*tasks, return_exceptions=True)
-            end_time = time.time()
-
-        successful_requests = sum(1 for r in responses if isinstance(r, aiohttp.ClientResponse) and r.status == 200)
-        total_time = end_time - start_time
-        
-        self.results['http'] = {
-            "total_requests": num_requests,
-            "successful_requests": successful_requests,
-            "total_time": total_time,
-            "requests_per_second": num_requests / total_time,
+        if passed:
+            self.results['http'] = passed['http']
+            self.results['cpu'] = passed['cpu']
+            self.results['memory'] = passed['memory']
+        return self.results
+
+    def _apply_limits(self, cpus: Optional[float], memory_mb: Optional[int]) -> None:
+        """Set the CPU quota (in cores) and memory limit (MB, swap disabled); None lifts a limit."""
+        mem_limit = int(memory_mb * 1024 * 1024) if memory_mb else -1
+        docker_manager.update_container_resources(
+            self.container_id, cpu_period=CPU_PERIOD, cpu_quota=int(cpus * CPU_PERIOD) if cpus else -1,
+            mem_limit=mem_limit, memswap_limit=mem_limit)
+
+    def _restore_limits(self, original: Dict[str, Any], memory_mb: int) -> Dict[str, Any]:
+        """Put the original limits back and read them again to check; reports failures instead of raising.
+
+        docker update cannot remove a memory limit, so a container that had
+        none keeps memory_mb (with swap disabled, as during the sweep).
+        """
+        mem_limit = original['mem_limit'] or int(memory_mb * 1024 * 1024)
+        expected = {'cpu_quota': max(original['cpu_quota'], 0), 'mem_limit': mem_limit}
+        report = {'restored': False, 'memory_kept_mb': None if original['mem_limit'] else memory_mb, 'error': None}
+        try:
+            docker_manager.update_container_resources(
+                self.container_id, cpu_period=original['cpu_period'] or CPU_PERIOD,
+                cpu_quota=original['cpu_quota'] or -1, mem_limit=mem_limit,
+                memswap_limit=original['memswap_limit'] if original['mem_limit'] else mem_limit)
+            current = docker_manager.get_container_resources(self.container_id)
+            self._ensure_running(0)
+        except Exception as e:
+            report['error'] = f"{type(e).__name__}: {e}"
+            return report
+        differs = [f"{key} is {max(current[key], 0)}, expected {value}"
+                   for key, value in expected.items() if max(current[key], 0) != value]
+        report['restored'] = not differs
+        report['error'] = "; ".join(differs) or None
+        return report
+
+    def _ensure_running(self, settle: float) -> None:
+        """Start the container again if the last run killed it (OOM), then let it settle."""
+        if docker_manager.get_container(self.container_id).get('status') != 'running':
+            docker_manager.start_container(self.container_id)
+        time.sleep(settle)
+
+    def _run_setting(self, scenario: Scenario, cpus: Optional[float], memory_mb: Optional[int], settle: float,
+                     **run_options) -> Dict[str, Any]:
+        self._apply_limits(cpus, memory_mb)
+        self._ensure_running(settle)
+        started = time.time()
+        error = None
+        try:
+            results = self.run_scenario(scenario, **run_options)
+        except Exception as e:
+            results, error = {}, f"{type(e).__name__}: {e}"
+        events = docker_manager.get_container_events(self.container_id, started, time.time(), actions=['oom', 'die'])
+        ooms = sum(1 for event in events if (event.get('Action') or event.get('status')) == 'oom')
+        deaths = sum(1 for event in events if (event.get('Action') or event.get('status')) == 'die')
+
+        failure = error
+        if failure is None and ooms:
+            failure = f"{ooms} OOM event(s)"
+        elif failure is None and deaths:
+            failure = "container exited during the run"
+        elif failure is None and not results['passed']:
+            failure = "SLO missed in " + ", ".join(stage['name'] for stage in results['stages'] if not stage['passed'])
+        return {
+            'cpus': cpus,
+            'memory_mb': memory_mb,
+            'http': results.get('http'),
+            'stages': results.get('stages', []),
+            'cpu': results.get('cpu'),
+            'memory': results.get('memory'),
+            'throttling': throttling_ratio(self.samples) if results else None,
+            'oom_events': ooms,
+            'failure': failure,
         }
-        return self.results['http']
 
-    def run_all_benchmarks(self, http_url: str, duration: int = 10, num_requests: int = 100) -> Dict[str, Any]:
-        self.cpu_benchmark(duration)
-        self.memory_benchmark(duration)
-        asyncio.run(self.http_benchmark(http_url, num_requests))
+    def sizing_sweep(self, scenario: Scenario, cpu_limits: List[float], memory_limits: List[int],
+                     base_url: Optional[str] = None, processes: int = 1, settle: float = 5.0,
+                     sample_interval: float = DEFAULT_SAMPLE_INTERVAL, keep_memory_limit: bool = False,
+                     on_step: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Find the smallest CPU and memory limits under which a scenario still meets its SLOs.
+
+        One limit is changed per run (docker update): CPU limits (cores) are
+        tried from largest to smallest with memory at its largest candidate,
+        then memory limits (MB) from largest to smallest at the smallest passing
+        CPU; each axis stops at its first failure. A run fails on any stage SLO
+        miss, OOM event or container exit. The recommended pair is rerun once
+        to confirm it. The container's original limits are restored afterwards
+        and checked; results['sizing']['restore'] says whether that worked.
+
+        docker update cannot remove a memory limit, so a container without one
+        is refused unless keep_memory_limit is set, in which case it is left at
+        the largest memory limit tried.
+        """
+        original = docker_manager.get_container_resources(self.container_id)
+        if original['nano_cpus']:
+            raise ValueError("The container was started with --cpus; CPU quota cannot be changed with docker update")
+        if not original['mem_limit'] and not keep_memory_limit:
+            raise ValueError("The container has no memory limit and docker update cannot remove one once set; "
+                             "allow keeping the largest memory limit tried to size it anyway")
+        cpu_limits = sorted(set(cpu_limits), reverse=True)
+        memory_limits = sorted(set(memory_limits), reverse=True)
+        run_options = dict(base_url=base_url, processes=processes, sample_interval=sample_interval)
+        steps = []
+
+        def run(cpus, memory_mb, phase):
+            step = self._run_setting(scenario, cpus, memory_mb, settle, **run_options)
+            step['phase'] = phase
+            steps.append(step)
+            if on_step is not None:
+                on_step(step)
+            return step
+
+        try:
+            cpus = None
+            for candidate in cpu_limits:
+                if run(candidate, memory_limits[0], 'cpu')['failure']:
+                    break
+                cpus = candidate
+            memory_mb = None
+            if cpus is not None:
+                for candidate in memory_limits:
+                    if candidate == memory_limits[0]:
+                        memory_mb = candidate  # Already passed in the CPU phase.
+                        continue
+                    if run(cpus, candidate, 'memory')['failure']:
+                        break
+                    memory_mb = candidate
+            confirmed = None
+            if cpus is not None and memory_mb is not None:
+                confirmed = not run(cpus, memory_mb, 'confirm')['failure']
+        finally:
+            restore = self._restore_limits(original, memory_limits[0])
+
+        self.load_result = None
+        self.params = {**scenario.params(), 'sizing': True, 'cpu_limits': cpu_limits, 'memory_limits': memory_limits,
+                       'base_url': base_url or scenario.base_url, 'processes': processes}
+        self.results = {
+            'sizing': {
+                'steps': steps,
+                'recommended_cpus': cpus,
+                'recommended_memory_mb': memory_mb,
+                'confirmed': confirmed,
+                'restore': restore,
+            },
+        }
         return self.results
 
     def get_results(self) -> Dict[str, Any]:
         return self.results
+
+    def save_results(self, store: Optional[BenchmarkStore] = None) -> int:
+        """Record the last run in the benchmark history under the container's image tag."""
+        store = store or get_benchmark_store()
+        return store.save(self.container_name, self.container.get('image') or 'unknown', self.params, self.results,
+                          load_result=self.load_result, image_id=self.container.get('image_id'))
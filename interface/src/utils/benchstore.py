@@ -0,0 +1,182 @@
+# utils/benchstore.py
+
+import contextlib
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.helpers import get_project_root
+from utils.loadgen import LoadResult
+from utils.significance import mann_whitney, welch_t_test
+
+DEFAULT_DB_PATH = os.path.join(get_project_root(), "..", "..", "benchmarks.db")
+DEFAULT_ALPHA = 0.01
+# Changes smaller than this (relative) are not called regressions even when significant.
+DEFAULT_MIN_CHANGE = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    container TEXT NOT NULL,
+    image TEXT NOT NULL,
+    image_id TEXT,
+    host TEXT NOT NULL,
+    params_key TEXT NOT NULL,
+    params TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    load_result TEXT,
+    timeline TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_lookup ON runs (image, params_key, host, created_at);
+CREATE INDEX IF NOT EXISTS runs_container ON runs (container, created_at);
+"""
+
+def params_key(params: Dict[str, Any]) -> str:
+    """Stable key for a parameter set, so reruns of the same benchmark group together."""
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+class BenchmarkStore:
+    """Benchmark runs in a local SQLite file, keyed by image tag, parameters and host."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # A connection per call: Streamlit sessions run on different threads.
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, container: str, image: str, params: Dict[str, Any], results: Dict[str, Any],
+             load_result: Optional[LoadResult] = None, image_id: Optional[str] = None,
+             host: Optional[str] = None) -> int:
+        """Store one run and return its id."""
+        summary = {key: value for key, value in results.items() if key != 'timeline'}
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (created_at, container, image, image_id, host, params_key, params, summary, "
+                "load_result, timeline) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), container, image, image_id, host or socket.gethostname(), params_key(params),
+                 json.dumps(params, sort_keys=True, default=str), json.dumps(summary, default=str),
+                 json.dumps(load_result.to_dict()) if load_result is not None else None,
+                 json.dumps(results.get('timeline')) if results.get('timeline') is not None else None))
+            return cursor.lastrowid
+
+    def runs(self, container: Optional[str] = None, image: Optional[str] = None, key: Optional[str] = None,
+             host: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
+        """List runs, newest first, without their histograms and timelines."""
+        clauses, args = [], []
+        for column, value in (("container", container), ("image", image), ("params_key", key), ("host", host)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT id, created_at, container, image, image_id, host, params_key, params, summary FROM runs "
+                f"{where} ORDER BY created_at DESC LIMIT ?", (*args, limit)).fetchall()
+        return [dict(row, params=json.loads(row["params"]), summary=json.loads(row["summary"])) for row in rows]
+
+    def load(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """A full run, with its LoadResult and timeline decoded."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        run = dict(row, params=json.loads(row["params"]), summary=json.loads(row["summary"]))
+        run["load_result"] = LoadResult.from_dict(json.loads(row["load_result"])) if row["load_result"] else None
+        run["timeline"] = json.loads(row["timeline"]) if row["timeline"] else None
+        return run
+
+    def delete(self, run_id: int) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+def _throughput_samples(result: LoadResult) -> List[float]:
+    """Requests in each full second of a run; the last, partial second is left out."""
+    seconds = sorted(result.timeline)
+    if len(seconds) > 1:
+        seconds = seconds[:-1]
+    return [float(result.timeline[second][0]) for second in seconds]
+
+def _change(baseline: Optional[float], candidate: Optional[float]) -> Optional[float]:
+    if baseline in (None, 0) or candidate is None:
+        return None
+    return (candidate - baseline) / baseline
+
+def compare_runs(baseline: Iterable[LoadResult], candidate: Iterable[LoadResult], alpha: float = DEFAULT_ALPHA,
+                 min_change: float = DEFAULT_MIN_CHANGE) -> Dict[str, Any]:
+    """Compare two groups of runs for latency and throughput regressions.
+
+    Latency distributions are compared with a Mann-Whitney U test on the
+    merged histograms. Throughput uses Welch's t-test, on run-level rates when
+    both sides have repeated runs and on per-second counts otherwise; those
+    counts are autocorrelated, so the p-value of a single-run comparison is
+    optimistic. A regression needs both significance (p < alpha) and a
+    relative change of at least min_change in the bad direction.
+    """
+    baseline, candidate = list(baseline), list(candidate)
+    base, cand = LoadResult(), LoadResult()
+    for result in baseline:
+        base.merge(result)
+    for result in candidate:
+        cand.merge(result)
+
+    latency_test = mann_whitney(base.histogram, cand.histogram)
+    if len(baseline) > 1 and len(candidate) > 1:
+        throughput_test = welch_t_test([r.requests / (r.duration or 1e-9) for r in baseline],
+                                       [r.requests / (r.duration or 1e-9) for r in candidate])
+        throughput_test["samples"] = "runs"
+    else:
+        throughput_test = welch_t_test(sum((_throughput_samples(r) for r in baseline), []),
+                                       sum((_throughput_samples(r) for r in candidate), []))
+        throughput_test["samples"] = "seconds"
+
+    base_latency, cand_latency = base.histogram.summary(), cand.histogram.summary()
+    latency_changes = {key: _change(base_latency[key], cand_latency[key]) for key in base_latency}
+    throughput_change = _change(throughput_test["baseline_mean"], throughput_test["candidate_mean"])
+    median_change = latency_changes.get("p50_ms")
+    latency_regression = (latency_test["p_value"] is not None and latency_test["p_value"] < alpha
+                          and latency_test["effect"] > 0.5 and median_change is not None
+                          and median_change >= min_change)
+    throughput_regression = (throughput_test["p_value"] is not None and throughput_test["p_value"] < alpha
+                             and throughput_change is not None and throughput_change <= -min_change)
+
+    return {
+        "baseline": {"runs": len(baseline), "requests": base.requests, "latency": base_latency,
+                     "error_rate": base.summary()["error_rate"]},
+        "candidate": {"runs": len(candidate), "requests": cand.requests, "latency": cand_latency,
+                      "error_rate": cand.summary()["error_rate"]},
+        "latency_test": latency_test,
+        "latency_change": latency_changes,
+        "throughput_test": throughput_test,
+        "throughput_change": throughput_change,
+        "latency_regression": latency_regression,
+        "throughput_regression": throughput_regression,
+        "regression": latency_regression or throughput_regression,
+    }
+
+_store: Optional[BenchmarkStore] = None
+_store_lock = threading.Lock()
+
+def get_benchmark_store() -> BenchmarkStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BenchmarkStore()
+        return _store
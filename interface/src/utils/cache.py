@@ -0,0 +1,84 @@
+# utils/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_TTL = 1.0
+DEFAULT_MAX_ENTRIES = 1024
+
+class TTLCache:
+    """Thread-safe TTL cache with LRU eviction and coalescing of concurrent loads.
+
+    When several threads ask for the same missing key at once, only the first
+    one runs the loader; the others wait for its result.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, loading it at most once per TTL."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                future = self._in_flight[key] = Future()
+                self.misses += 1
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            self._evict()
+        future.set_result(value)
+        return value
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or everything when no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits,
+                    "misses": self.misses, "coalesced": self.coalesced}
@@ -11,7 +11,7 @@ import streamlit as st
 import yaml
 
 # Local imports
-from utils.dockermanager import DockerManager
+from utils.dockermanager import get_docker_manager
 
 # Global constants
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -28,7 +28,7 @@ config_extensions = {
     'cadvisor': {'ext':'json','name':'cadvisor', 'isEnv':False}
 }
 
-docker_manager = DockerManager()
+docker_manager = get_docker_manager()
 
 def get_email_settings() -> Dict[str, Any]:
     """Get email settings from alertmanager configuration."""
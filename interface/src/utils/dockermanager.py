@@ -1,41 +1,278 @@
 # utils/dockermanager.py
 
 import docker
-from typing import List, Dict, Any, Optional
+import queue
+import requests
+import urllib3
+import threading
+from collections import Counter, deque
+import time
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional, Union
 import datetime
+from utils.registry import ContainerRegistry
+
+DEFAULT_MAX_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 60
+# Seconds between pings of the daemon before the shared client is handed out again.
+HEALTH_CHECK_INTERVAL = 30.0
+
+_client_settings = {"max_pool_size": DEFAULT_MAX_POOL_SIZE, "timeout": DEFAULT_TIMEOUT}
+_client: Optional[docker.DockerClient] = None
+_client_checked_at = 0.0
+_registry: Optional[ContainerRegistry] = None
+_client_lock = threading.RLock()
+
+def configure_docker_client(max_pool_size: int = DEFAULT_MAX_POOL_SIZE, timeout: int = DEFAULT_TIMEOUT) -> None:
+    """Set the pool size and timeout of the shared client; it is rebuilt on next use."""
+    with _client_lock:
+        _client_settings.update(max_pool_size=max_pool_size, timeout=timeout)
+        _reset_client()
+
+def _reset_client() -> None:
+    global _client, _registry
+    if _registry is not None:
+        _registry.stop()
+        _registry = None
+    if _client is not None:
+        try:
+            _client.close()
+        except Exception:
+            pass
+        _client = None
+
+def get_docker_client() -> docker.DockerClient:
+    """Return the process-wide Docker client, connecting on first use and after the daemon restarts."""
+    global _client, _client_checked_at
+    with _client_lock:
+        now = time.monotonic()
+        if _client is not None and now - _client_checked_at > HEALTH_CHECK_INTERVAL:
+            try:
+                _client.ping()
+            except Exception:
+                _reset_client()
+            _client_checked_at = now
+        if _client is None:
+            _client = docker.from_env(**_client_settings)
+            _client_checked_at = now
+        return _client
+
+def get_container_registry() -> ContainerRegistry:
+    """Return the registry that follows the shared client, seeding it on first use."""
+    global _registry
+    with _client_lock:
+        client = get_docker_client()
+        if _registry is None or _registry.client is not client:
+            if _registry is not None:
+                _registry.stop()
+            _registry = ContainerRegistry(client)
+        return _registry.start()
+
+# Parsed lines held for a slow consumer before the reader stops pulling from Docker.
+DEFAULT_LOG_BACKLOG = 10000
+LOG_RECONNECT_DELAY = 1.0
+LOG_MAX_RECONNECT_DELAY = 30.0
+# Failures worth reconnecting after: the daemon or the connection, not the request.
+_TRANSIENT_ERRORS = (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, OSError)
+# Delivered lines remembered to recognise Docker's replay after a reconnect.
+LOG_REPLAY_WINDOW = 1000
+
+class LogLine(NamedTuple):
+    timestamp: datetime.datetime
+    message: str
+    source: str = ""
+
+    def __str__(self) -> str:
+        prefix = f"[{self.source}] " if self.source else ""
+        return f"{self.timestamp.isoformat(timespec='milliseconds')} {prefix}{self.message}"
+
+def parse_log_line(line: str, default: Optional[datetime.datetime] = None) -> LogLine:
+    """Split a line produced with timestamps=True into its UTC timestamp and message.
+
+    A line without a readable timestamp is stamped with default (the previous
+    line's time, to keep ordering), or with the current time when there is none.
+    """
+    stamp, _, message = line.partition(" ")
+    try:
+        # Docker writes RFC3339 with nanoseconds; datetime only keeps microseconds.
+        date, _, fraction = stamp.rstrip("Z").partition(".")
+        timestamp = datetime.datetime.fromisoformat(f"{date}.{(fraction + '000000')[:6]}+00:00")
+    except ValueError:
+        return LogLine(default or datetime.datetime.now(datetime.timezone.utc), line)
+    return LogLine(timestamp, message)
+
+class LogStream:
+    """Follows a container's logs over one long-lived connection.
+
+    A background thread reads `logs(stream=True, follow=True, timestamps=True)`,
+    reassembles lines across chunks and queues them parsed. When the consumer
+    falls behind by `backlog` lines the reader blocks, which leaves the rest in
+    Docker rather than in memory. A dropped connection is resumed from the last
+    timestamp seen; replayed lines that match recently delivered ones are
+    skipped up to the last one delivered, so lines sharing a timestamp or
+    arriving slightly out of order are all kept. Reconnects back off while
+    nothing arrives. A missing container or a rejected request stops the
+    stream and leaves the reason in `error`.
+    """
+
+    def __init__(self, manager: "DockerManager", container_id: str,
+                 since: Optional[Union[datetime.datetime, float]] = None, tail: Union[str, int] = "all",
+                 backlog: int = DEFAULT_LOG_BACKLOG):
+        self.manager = manager
+        self.container_id = container_id
+        self.since = since.timestamp() if isinstance(since, datetime.datetime) else since
+        self.tail = tail
+        self.reconnects = 0
+        self.error: Optional[str] = None
+        self._queue: "queue.Queue[LogLine]" = queue.Queue(maxsize=backlog)
+        self._closed = threading.Event()
+        self._last: Optional[LogLine] = None
+        self._recent: "deque[LogLine]" = deque(maxlen=LOG_REPLAY_WINDOW)
+        self._stream = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"logs-{container_id}", daemon=True)
+
+    def start(self) -> "LogStream":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            self._close_stream()
+
+    def _close_stream(self) -> None:
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def read(self, max_lines: int = 1000, timeout: float = 0.0) -> List[LogLine]:
+        """Return up to max_lines queued lines, waiting up to timeout for the first one."""
+        lines = []
+        try:
+            lines.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            while len(lines) < max_lines:
+                lines.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return lines
+
+    def __iter__(self) -> Iterator[LogLine]:
+        while not self.closed:
+            yield from self.read(timeout=0.5)
+
+    def _open(self):
+        if self._last is not None:
+            since, tail = self._last.timestamp.timestamp(), "all"
+        else:
+            since, tail = self.since, self.tail
+        return self.manager.client.containers.get(self.container_id).logs(
+            stream=True, follow=True, timestamps=True, since=since, tail=tail)
+
+    def _put(self, line: LogLine) -> None:
+        while not self.closed:
+            try:
+                self._queue.put(line, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _fail(self, error: str) -> None:
+        self.error = error
+        self.close()
+
+    def _run(self) -> None:
+        failures = 0
+        while not self.closed:
+            pending = b""
+            # After a reconnect Docker replays from the last timestamp seen; skip up to the last line delivered.
+            replaying = Counter(self._recent) if self._last is not None else None
+            previous = self._last.timestamp if self._last is not None else None
+            try:
+                stream = self._open()
+                with self._lock:
+                    self._stream = stream
+                    if self.closed:
+                        # close() ran while the connection was being opened.
+                        self._close_stream()
+                        return
+                for chunk in stream:
+                    pending += chunk
+                    *complete, pending = pending.split(b"\n")
+                    for raw in complete:
+                        text = raw.decode("utf-8", errors="replace").rstrip("\r")
+                        if not text.strip():
+                            continue
+                        line = parse_log_line(text, default=previous)
+                        previous = line.timestamp
+                        if replaying and replaying[line] > 0:
+                            replaying[line] -= 1
+                            if line == self._last:
+                                replaying = None
+                            continue
+                        self._last = line
+                        self._recent.append(line)
+                        self._put(line)
+                        failures = 0
+                    if self.closed:
+                        return
+            except docker.errors.NotFound:
+                self._fail(f"Container {self.container_id} does not exist")
+                return
+            except docker.errors.APIError as e:
+                if e.is_client_error():
+                    self._fail(f"Docker rejected the log request: {e.explanation or e}")
+                    return
+            except _TRANSIENT_ERRORS:
+                pass
+            except Exception as e:
+                self._fail(f"{type(e).__name__}: {e}")
+                return
+            if self.closed:
+                return
+            # The stream also ends when the container stops; back off until lines flow again.
+            self.reconnects += 1
+            failures += 1
+            self._closed.wait(min(LOG_RECONNECT_DELAY * 2 ** (failures - 1), LOG_MAX_RECONNECT_DELAY))
+
 class DockerManager:
-    def __init__(self):
-        self.client = docker.from_env()
+    """Docker operations over the shared client; cheap to construct, connects on first use."""
+
+    @property
+    def client(self) -> docker.DockerClient:
+        return get_docker_client()
 
+    @property
+    def registry(self) -> ContainerRegistry:
+        """Event-driven container index, seeded on first use."""
+        return get_container_registry()
 
     # Container Operations
     def list_containers(self, all: bool = False, networks: Optional[List[str]] = None) -> List[Dict[str, Any]]:
-        container_list = self.client.containers.list(all=all)
-
-        if networks:
-            container_list = [c for c in container_list if any(n in c.attrs['NetworkSettings']['Networks'] for n in networks)]
+        return self.registry.list(all=all, networks=networks)
 
-        def get_ports(container):
-            ports = container.attrs['NetworkSettings']['Ports']
-            if ports:
-                return [f"{host_config[0]['HostPort']}:{container_port.split('/')[0]}" 
-                        for container_port, host_config in ports.items() 
-                        if host_config]
-            return []
-
-        return [{'id': c.id, 
-                'name': c.name, 
-                'status': c.status, 
-                'ports': get_ports(c)} for c in container_list]
+    def wait_for_container_change(self, since: int, timeout: Optional[float] = None) -> int:
+        """Block until the container list moves past version since (or timeout) and return the version."""
+        return self.registry.wait_for_change(since, timeout=timeout)
 
     def get_container(self, container_id: str) -> Dict[str, Any]:
         container = self.client.containers.get(container_id)
-        return {'id': container.id, 'name': container.name, 'status': container.status}
+        return {'id': container.id, 'name': container.name, 'status': container.status,
+                'image': container.attrs.get('Config', {}).get('Image'), 'image_id': container.attrs.get('Image')}
 
     def run_container(self, image: str, **kwargs) -> Dict[str, Any]:
         container = self.client.containers.run(image, **kwargs)
         return {'id': container.id, 'name': container.name}
 
+    def start_container(self, container_id: str) -> None:
+        self.client.containers.get(container_id).start()
+
     def stop_container(self, container_id: str) -> None:
         self.client.containers.get(container_id).stop()
 
@@ -51,6 +288,58 @@ class DockerManager:
     def restart_container(self, container_id: str) -> None:
         self.client.containers.get(container_id).restart()
 
+    def get_container_resources(self, container_id: str) -> Dict[str, Any]:
+        """Current CPU and memory limits from the container's HostConfig (0 means unlimited)."""
+        host_config = self.client.api.inspect_container(container_id).get('HostConfig') or {}
+        return {
+            'cpu_quota': host_config.get('CpuQuota') or 0,
+            'cpu_period': host_config.get('CpuPeriod') or 0,
+            'nano_cpus': host_config.get('NanoCpus') or 0,
+            'mem_limit': host_config.get('Memory') or 0,
+            'memswap_limit': host_config.get('MemorySwap') or 0,
+        }
+
+    def update_container_resources(self, container_id: str, cpu_quota: Optional[int] = None,
+                                   cpu_period: Optional[int] = None, mem_limit: Optional[int] = None,
+                                   memswap_limit: Optional[int] = None) -> None:
+        """Change CPU and memory limits of a running container (docker update); None leaves a limit as is."""
+        self.client.api.update_container(container_id, cpu_quota=cpu_quota, cpu_period=cpu_period,
+                                         mem_limit=mem_limit, memswap_limit=memswap_limit)
+
+    def get_container_events(self, container_id: str, since: float, until: float,
+                             actions: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Container events recorded by the daemon between two timestamps, e.g. actions=['oom', 'die']."""
+        filters = {'container': container_id, 'type': 'container'}
+        if actions:
+            filters['event'] = actions
+        # until must not lie in the future, or the call blocks until it passes.
+        until = min(int(until) + 1, int(time.time()))
+        return list(self.client.api.events(since=int(since), until=until, filters=filters, decode=True))
+
+    def get_container_stats(self, container_id: str) -> Dict[str, Any]:
+        """Read one raw stats sample right away (no precpu_stats; diff consecutive samples for CPU)."""
+        return self.client.api.stats(container_id, stream=False, one_shot=True)
+
+    def stream_container_stats(self, container_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield raw stats samples (about one per second) from the Docker stats stream.
+
+        Closing the generator closes the streaming response; docker-py's own
+        stats() generator leaves it open. Raises docker.errors.NotFound on the
+        first sample if the container does not exist.
+        """
+        # APIClient.stats(stream=True) returns _stream_helper(response) without keeping the response, and
+        # closing that generator leaves the connection open until the response is garbage collected. So the
+        # request is made here with the same private helpers (_get, _url, _raise_for_status, _stream_helper)
+        # to hold on to the response. They are internals of the docker-py pinned in requirements.txt
+        # (7.1.0, unchanged in 7.2.0); check this method when upgrading it.
+        api = self.client.api
+        response = api._get(api._url("/containers/{0}/stats", container_id), params={'stream': True}, stream=True)
+        try:
+            api._raise_for_status(response)
+            yield from api._stream_helper(response, decode=True)
+        finally:
+            response.close()
+
     def get_container_logs(self, container_id: str, since: datetime = None, until: datetime = None) -> str:
         logs = self.client.containers.get(container_id).logs(
             timestamps=True,
@@ -59,9 +348,10 @@ class DockerManager:
         )
         return logs
     
-    def restart_container(self, container_id: str) -> None:
-        self.client.containers.get(container_id).restart()
-
+    def stream_container_logs(self, container_id: str, since: Optional[Union[datetime.datetime, float]] = None,
+                              tail: Union[str, int] = "all", backlog: int = DEFAULT_LOG_BACKLOG) -> LogStream:
+        """Start following a container's logs; read parsed lines from the returned stream and close it when done."""
+        return LogStream(self, container_id, since=since, tail=tail, backlog=backlog).start()
 
     def exec_run(self, container_id: str, cmd: str) -> tuple:
         return self.client.containers.get(container_id).exec_run(cmd)
@@ -92,17 +382,16 @@ class DockerManager:
 
     # Utility methods
     def restart_container_by_name(self, container_name: str) -> None:
-        containers = self.list_containers(all=True)
-        for container in containers:
-            if container['name'] == container_name:
-                self.restart_container(container['id'])
-                return
-        raise ValueError(f"Container with name {container_name} not found")
+        container = self.registry.get_by_name(container_name)
+        if container is None:
+            raise ValueError(f"Container with name {container_name} not found")
+        self.restart_container(container['id'])
 
     def get_container_id_by_name(self, container_name: str) -> Optional[str]:
-        containers = self.list_containers(all=True)
-        for container in containers:
-            if container['name'] == container_name:
-                return container['id']
-        return None
+        container = self.registry.get_by_name(container_name)
+        return container['id'] if container is not None else None
+
+_docker_manager = DockerManager()
 
+def get_docker_manager() -> DockerManager:
+    return _docker_manager
@@ -0,0 +1,129 @@
+# utils/history.py
+
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Points per series handed to Plotly after downsampling.
+DEFAULT_RENDER_POINTS = 400
+
+class RingBuffer:
+    """Preallocated circular buffer of (timestamp, value) samples in ascending time order."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self._values = np.empty(capacity, dtype=np.float64)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def extend(self, timestamps: Sequence[float], values: Sequence[float]) -> None:
+        """Append samples, overwriting the oldest ones once the buffer is full."""
+        timestamps = np.asarray(timestamps, dtype=np.float64)[-self.capacity:]
+        values = np.asarray(values, dtype=np.float64)[-self.capacity:]
+        count = len(timestamps)
+        if count == 0:
+            return
+
+        end = (self._start + self._size) % self.capacity
+        positions = (end + np.arange(count)) % self.capacity
+        self._timestamps[positions] = timestamps
+        self._values[positions] = values
+
+        overflow = max(0, self._size + count - self.capacity)
+        self._start = (self._start + overflow) % self.capacity
+        self._size = min(self.capacity, self._size + count)
+
+    def append(self, timestamp: float, value: float) -> None:
+        self.extend([timestamp], [value])
+
+    def _order(self) -> np.ndarray:
+        return (self._start + np.arange(self._size)) % self.capacity
+
+    def arrays(self, since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return copies of the timestamps and values, oldest first, optionally from since onwards."""
+        order = self._order()
+        timestamps, values = self._timestamps[order], self._values[order]
+        if since is not None:
+            first = np.searchsorted(timestamps, since, side="left")
+            timestamps, values = timestamps[first:], values[first:]
+        return timestamps, values
+
+    def drop_before(self, cutoff: float) -> None:
+        """Forget every sample older than cutoff."""
+        timestamps, _ = self.arrays()
+        dropped = int(np.searchsorted(timestamps, cutoff, side="left"))
+        self._start = (self._start + dropped) % self.capacity
+        self._size -= dropped
+
+    def last_timestamp(self) -> Optional[float]:
+        if not self._size:
+            return None
+        return float(self._timestamps[(self._start + self._size - 1) % self.capacity])
+
+    def _reduce(self, reducer, since: Optional[float]) -> Optional[float]:
+        _, values = self.arrays(since)
+        values = values[~np.isnan(values)]
+        return float(reducer(values)) if len(values) else None
+
+    def min(self, since: Optional[float] = None) -> Optional[float]:
+        return self._reduce(np.min, since)
+
+    def max(self, since: Optional[float] = None) -> Optional[float]:
+        return self._reduce(np.max, since)
+
+    def mean(self, since: Optional[float] = None) -> Optional[float]:
+        return self._reduce(np.mean, since)
+
+def lttb(timestamps: np.ndarray, values: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Downsample a series to threshold points with Largest-Triangle-Three-Buckets."""
+    size = len(timestamps)
+    if threshold >= size or threshold < 3:
+        return timestamps, values
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else size
+        next_end = max(next_end, next_start + 1)
+        avg_t = timestamps[next_start:next_end].mean()
+        avg_v = values[next_start:next_end].mean()
+
+        bucket_t, bucket_v = timestamps[start:end], values[start:end]
+        areas = np.abs((timestamps[previous] - avg_t) * (bucket_v - values[previous])
+                       - (timestamps[previous] - bucket_t) * (avg_v - values[previous]))
+        previous = start + int(np.nanargmax(areas)) if not np.all(np.isnan(areas)) else start
+        selected[i + 1] = previous
+
+    return timestamps[selected], values[selected]
+
+class MetricHistory:
+    """One ring buffer per metric, sized for a fixed number of samples."""
+
+    def __init__(self, keys: Iterable[str], capacity: int):
+        self.capacity = capacity
+        self.buffers: Dict[str, RingBuffer] = {key: RingBuffer(capacity) for key in keys}
+
+    def extend(self, key: str, samples: List[Tuple[float, float]]) -> None:
+        if samples:
+            timestamps, values = zip(*samples)
+            self.buffers[key].extend(timestamps, values)
+
+    def drop_before(self, cutoff: float) -> None:
+        for buffer in self.buffers.values():
+            buffer.drop_before(cutoff)
+
+    def last_timestamp(self) -> Optional[float]:
+        timestamps = [ts for ts in (b.last_timestamp() for b in self.buffers.values()) if ts is not None]
+        return max(timestamps) if timestamps else None
+
+    def downsampled(self, key: str, points: int = DEFAULT_RENDER_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+        """Return a series reduced to at most points samples for rendering."""
+        timestamps, values = self.buffers[key].arrays()
+        return lttb(timestamps, values, points)
@@ -0,0 +1,405 @@
+# utils/loadgen.py
+
+import asyncio
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+
+import aiohttp
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_CONCURRENCY = 10
+# Requests allowed in flight in fixed-rate mode before new arrivals count as dropped.
+DEFAULT_MAX_IN_FLIGHT = 1000
+# Seconds spawned workers wait for each other at the start barrier.
+WORKER_START_TIMEOUT = 60.0
+PERCENTILES = (50, 90, 99, 99.9)
+# A load worker busier than this share of one core is probably limiting the measured throughput.
+CLIENT_SATURATION_PERCENT = 85.0
+
+# (method, url, keyword arguments for aiohttp's request)
+RequestSpec = Tuple[str, str, Dict[str, Any]]
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram: about 1% relative error, mergeable without loss."""
+
+    RATIO = 1.01
+    _LOG_RATIO = math.log(RATIO)
+    # Smallest latency told apart (1 µs); everything below lands in bucket 0.
+    RESOLUTION = 1e-6
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _bucket(self, seconds: float) -> int:
+        return max(0, int(math.log(max(seconds, self.RESOLUTION) / self.RESOLUTION) / self._LOG_RATIO))
+
+    def record(self, seconds: float) -> None:
+        bucket = self._bucket(seconds)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Latency in seconds below which percent of the samples fall (bucket upper bound)."""
+        if not self.total:
+            return None
+        rank = math.ceil(self.total * percent / 100)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.max, self.RESOLUTION * self.RATIO ** (bucket + 1))
+        return self.max
+
+    def mean(self) -> Optional[float]:
+        return self.sum / self.total if self.total else None
+
+    def buckets(self) -> Iterable[Tuple[float, int]]:
+        """(upper bound in seconds, count) pairs in ascending order."""
+        for bucket in sorted(self.counts):
+            yield self.RESOLUTION * self.RATIO ** (bucket + 1), self.counts[bucket]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Mean, min, max and percentiles in milliseconds."""
+        def ms(value):
+            return round(value * 1000, 3) if value is not None and value != math.inf else None
+
+        summary = {"mean_ms": ms(self.mean()), "min_ms": ms(self.min if self.total else None), "max_ms": ms(self.max if self.total else None)}
+        for percent in PERCENTILES:
+            summary[f"p{percent:g}_ms".replace(".", "_")] = ms(self.percentile(percent))
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"counts": {str(k): v for k, v in self.counts.items()}, "total": self.total,
+                "sum": self.sum, "min": self.min if self.total else None, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.counts = {int(k): v for k, v in data["counts"].items()}
+        histogram.total = data["total"]
+        histogram.sum = data["sum"]
+        histogram.min = data["min"] if data["min"] is not None else math.inf
+        histogram.max = data["max"]
+        return histogram
+
+class LoadResult:
+    """Counters, latency histogram, error breakdown and a per-second timeline of one load run."""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.requests = 0
+        self.successes = 0
+        self.errors: Dict[str, int] = {}
+        self.bytes_received = 0
+        self.dropped = 0
+        self.duration = 0.0
+        # Wall-clock time at which measurement (and the timeline) started.
+        self.started_at: Optional[float] = None
+        # CPU seconds spent by each load generating process (one entry per worker).
+        self.client_cpu: list = []
+        # Second since the start of measurement -> [requests, errors, latency sum].
+        self.timeline: Dict[int, list] = {}
+
+    def record(self, offset: float, latency: float, error: Optional[str], nbytes: int = 0) -> None:
+        self.requests += 1
+        self.bytes_received += nbytes
+        self.histogram.record(latency)
+        second = self.timeline.setdefault(int(offset), [0, 0, 0.0])
+        second[0] += 1
+        second[2] += latency
+        if error is None:
+            self.successes += 1
+        else:
+            self.errors[error] = self.errors.get(error, 0) + 1
+            second[1] += 1
+
+    def merge(self, other: "LoadResult", offset: int = 0) -> "LoadResult":
+        """Add another result in; offset shifts its timeline, e.g. for a stage run after this one."""
+        self.histogram.merge(other.histogram)
+        self.requests += other.requests
+        self.successes += other.successes
+        self.bytes_received += other.bytes_received
+        self.dropped += other.dropped
+        self.duration = max(self.duration, other.duration)
+        if other.started_at is not None:
+            self.started_at = min(self.started_at or other.started_at, other.started_at)
+        self.client_cpu.extend(other.client_cpu)
+        for error, count in other.errors.items():
+            self.errors[error] = self.errors.get(error, 0) + count
+        for second, (requests, errors, latency) in other.timeline.items():
+            entry = self.timeline.setdefault(second + offset, [0, 0, 0.0])
+            entry[0] += requests
+            entry[1] += errors
+            entry[2] += latency
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        duration = self.duration or 1e-9
+        return {
+            "total_requests": self.requests,
+            "successful_requests": self.successes,
+            "failed_requests": self.requests - self.successes,
+            "dropped_requests": self.dropped,
+            "error_rate": (self.requests - self.successes) / self.requests if self.requests else 0.0,
+            "total_time": round(self.duration, 3),
+            "requests_per_second": round(self.requests / duration, 2),
+            "successful_requests_per_second": round(self.successes / duration, 2),
+            "bytes_received": self.bytes_received,
+            "latency": self.histogram.summary(),
+            "errors": dict(sorted(self.errors.items(), key=lambda e: -e[1])),
+            "client_cpu": self.client_cpu_summary(),
+        }
+
+    def client_cpu_summary(self) -> Dict[str, Any]:
+        """CPU used by the load generator itself, as percent of one core."""
+        duration = self.duration or 1e-9
+        per_worker = [seconds / duration * 100 for seconds in self.client_cpu]
+        busiest = max(per_worker, default=0.0)
+        return {
+            "workers": len(self.client_cpu),
+            "cpu_seconds": round(sum(self.client_cpu), 3),
+            "total_percent": round(sum(per_worker), 1),
+            "max_worker_percent": round(busiest, 1),
+            "saturated": busiest >= CLIENT_SATURATION_PERCENT,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"histogram": self.histogram.to_dict(), "requests": self.requests, "successes": self.successes,
+                "errors": self.errors, "bytes_received": self.bytes_received, "dropped": self.dropped,
+                "duration": self.duration, "started_at": self.started_at, "client_cpu": self.client_cpu,
+                "timeline": {str(k): v for k, v in self.timeline.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LoadResult":
+        result = cls()
+        result.histogram = LatencyHistogram.from_dict(data["histogram"])
+        result.requests = data["requests"]
+        result.successes = data["successes"]
+        result.errors = dict(data["errors"])
+        result.bytes_received = data["bytes_received"]
+        result.dropped = data["dropped"]
+        result.duration = data["duration"]
+        result.started_at = data.get("started_at")
+        result.client_cpu = list(data.get("client_cpu", []))
+        result.timeline = {int(k): list(v) for k, v in data["timeline"].items()}
+        return result
+
+def _error_key(exc: BaseException) -> str:
+    if isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+    return type(exc).__name__
+
+async def _send(session: aiohttp.ClientSession, spec: RequestSpec) -> Tuple[Optional[str], int]:
+    method, url, kwargs = spec
+    try:
+        async with session.request(method, url, **kwargs) as response:
+            # Drain the body so the connection goes back to the pool and the server's full work is timed.
+            body = await response.read()
+            return (None if response.status < 400 else f"HTTP {response.status}"), len(body)
+    except Exception as e:
+        return _error_key(e), 0
+
+def _as_factory(target: Union[str, Callable[[], RequestSpec]]) -> Callable[[], RequestSpec]:
+    if callable(target):
+        return target
+    return lambda: ("GET", target, {})
+
+async def run_load(target: Union[str, Callable[[], RequestSpec]], concurrency: Optional[int] = DEFAULT_CONCURRENCY,
+                   rate: Optional[Union[float, Callable[[float], float]]] = None, duration: Optional[float] = None,
+                   num_requests: Optional[int] = None, warmup: float = 0.0, timeout: float = DEFAULT_TIMEOUT,
+                   max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                   on_tick: Optional[Callable[[float], None]] = None) -> LoadResult:
+    """Generate HTTP load against a URL or a request factory and measure it.
+
+    With rate unset, `concurrency` workers send requests back to back (closed
+    model). With rate set (requests per second, or a function of seconds since
+    the start giving the rate), requests are started on schedule regardless of
+    how fast responses come back (open model); latency is measured from the
+    scheduled start, so a stalled server is not hidden by a stalled client.
+    The run ends after `duration` seconds or `num_requests` requests, whichever
+    is set; requests during the first `warmup` seconds are not recorded.
+    """
+    if duration is None and num_requests is None:
+        raise ValueError("Either duration or num_requests is required")
+
+    factory = _as_factory(target)
+    result = LoadResult()
+    connector = aiohttp.TCPConnector(limit=0 if rate is not None else concurrency, force_close=False)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    loop = asyncio.get_running_loop()
+    # The event loop runs on this thread only, so its CPU time is the client's cost.
+    cpu_started = time.thread_time()
+    started = loop.time()
+    measure_from = started + warmup
+    result.started_at = time.time() + warmup
+    deadline = measure_from + duration if duration is not None else math.inf
+    # Requests started after the warmup; only these count towards num_requests.
+    issued = 0
+
+    def should_issue(now: float) -> bool:
+        return now < deadline and (num_requests is None or issued < num_requests)
+
+    async def one(scheduled: float) -> None:
+        error, nbytes = await _send(session, factory())
+        finished = loop.time()
+        if scheduled >= measure_from:
+            result.record(scheduled - measure_from, finished - scheduled, error, nbytes)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+        if rate is None:
+            async def worker() -> None:
+                nonlocal issued
+                while should_issue(loop.time()):
+                    scheduled = loop.time()
+                    issued += int(scheduled >= measure_from)
+                    await one(scheduled)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency or DEFAULT_CONCURRENCY)))
+        else:
+            rate_at = rate if callable(rate) else (lambda _: rate)
+            in_flight = set()
+            next_at = started
+            while should_issue(next_at):
+                delay = next_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if on_tick is not None:
+                    on_tick(next_at - started)
+                if len(in_flight) >= max_in_flight:
+                    if next_at >= measure_from:
+                        result.dropped += 1
+                else:
+                    task = asyncio.ensure_future(one(next_at))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                issued += int(next_at >= measure_from)
+                current_rate = rate_at(next_at - started)
+                next_at += 1.0 / current_rate if current_rate > 0 else 0.1
+            if in_flight:
+                await asyncio.gather(*in_flight)
+
+    result.duration = max(0.0, loop.time() - max(measure_from, started))
+    result.client_cpu.append(time.thread_time() - cpu_started)
+    return result
+
+class ScaledRate:
+    """A rate schedule scaled by a constant factor, picklable as long as the schedule is."""
+
+    def __init__(self, schedule: Callable[[float], float], factor: float):
+        self.schedule = schedule
+        self.factor = factor
+
+    def __call__(self, elapsed: float) -> float:
+        return self.schedule(elapsed) * self.factor
+
+def _split(total, parts: int, integer: bool = True) -> list:
+    """Split a total across workers; integer totals differ by at most one between workers."""
+    if total is None:
+        return [None] * parts
+    if callable(total):
+        return [ScaledRate(total, 1 / parts)] * parts
+    if not integer:
+        return [total / parts] * parts
+    base, extra = divmod(int(total), parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+def _process_worker(index: int, barrier, results, target, options: Dict[str, Any]) -> None:
+    try:
+        barrier.wait(timeout=WORKER_START_TIMEOUT)
+    except threading.BrokenBarrierError:
+        results.put((index, "error", "another worker failed to start"))
+        return
+    try:
+        results.put((index, "ok", asyncio.run(run_load(target, **options)).to_dict()))
+    except Exception as e:
+        results.put((index, "error", f"{type(e).__name__}: {e}"))
+
+def run_load_processes(target: Union[str, Callable[[], RequestSpec]], processes: Optional[int] = None,
+                       concurrency: Optional[int] = DEFAULT_CONCURRENCY,
+                       rate: Optional[Union[float, Callable[[float], float]]] = None,
+                       duration: Optional[float] = None, num_requests: Optional[int] = None,
+                       warmup: float = 0.0, timeout: float = DEFAULT_TIMEOUT,
+                       max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> LoadResult:
+    """Run the load from several processes and merge their results.
+
+    Concurrency, rate, request count and in-flight limit are totals divided
+    between the workers. Workers start together behind a barrier so their
+    timelines line up. The target and any rate schedule must be picklable (a
+    URL, or an instance of a module-level class), since workers are spawned
+    fresh rather than forked from a process that has threads running. If a
+    worker dies before reporting, the barrier is aborted so the rest give up
+    instead of waiting for it.
+    """
+    processes = processes or os.cpu_count() or 1
+    if concurrency is not None and rate is None:
+        processes = min(processes, concurrency)
+    if num_requests is not None:
+        processes = max(1, min(processes, num_requests))
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(processes)
+    results = context.Queue()
+    workers = []
+    shares = zip(_split(concurrency, processes), _split(rate, processes, integer=False),
+                 _split(num_requests, processes), _split(max_in_flight, processes))
+    for index, (worker_concurrency, worker_rate, worker_requests, worker_in_flight) in enumerate(shares):
+        options = {"concurrency": worker_concurrency, "rate": worker_rate, "duration": duration,
+                   "num_requests": worker_requests, "warmup": warmup, "timeout": timeout,
+                   "max_in_flight": max(1, worker_in_flight)}
+        worker = context.Process(target=_process_worker, args=(index, barrier, results, target, options),
+                                 daemon=True)
+        worker.start()
+        workers.append(worker)
+
+    merged = LoadResult()
+    failures = []
+    pending = set(range(len(workers)))
+    try:
+        while pending:
+            try:
+                index, status, payload = results.get(timeout=1.0)
+            except queue.Empty:
+                # A worker that died without reporting would leave the others stuck at the barrier.
+                for index in list(pending):
+                    if not workers[index].is_alive() and results.empty():
+                        pending.discard(index)
+                        failures.append(f"worker exited with code {workers[index].exitcode} without a result")
+                        barrier.abort()
+                continue
+            pending.discard(index)
+            if status == "ok":
+                merged.merge(LoadResult.from_dict(payload))
+            else:
+                failures.append(payload)
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+    if failures and not merged.client_cpu:
+        raise RuntimeError(f"All load workers failed: {failures[0]}")
+    for failure in failures:
+        merged.errors[f"worker failed: {failure}"] = merged.errors.get(f"worker failed: {failure}", 0) + 1
+    return merged
@@ -0,0 +1,330 @@
+# utils/logarchive.py
+
+import atexit
+import datetime
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_left
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from utils.dockermanager import LogLine
+from utils.helpers import get_project_root
+
+DEFAULT_ARCHIVE_DIR = os.path.join(get_project_root(), "..", "..", "archive")
+# Uncompressed bytes per block; a seek decompresses at most one block it does not need.
+DEFAULT_BLOCK_BYTES = 64 * 1024
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_SEGMENT_SECONDS = 3600
+DEFAULT_FLUSH_SECONDS = 5.0
+DEFAULT_RETENTION_BYTES = 2 * 1024 * 1024 * 1024
+COMPRESSION_LEVEL = 6
+# How far behind the newest archived line a line may arrive and still be archived (stdout/stderr skew).
+LATE_LINE_NS = 5 * 10 ** 9
+
+# Index entry per block: first timestamp, last timestamp (ns) and offset in the segment.
+INDEX_ENTRY = struct.Struct(">QQQ")
+BLOCK_HEADER = struct.Struct(">I")
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+_ESCAPED = re.compile(r"\\(.)")
+
+def _ns(timestamp: datetime.datetime) -> int:
+    return int(timestamp.timestamp() * 1e9)
+
+def _encode(line: LogLine) -> bytes:
+    message = line.message.replace("\\", "\\\\").replace("\n", "\\n")
+    return f"{_ns(line.timestamp)}\t{line.source}\t{message}\n".encode("utf-8")
+
+def _decode(record: bytes) -> Tuple[int, LogLine]:
+    ts, source, message = record.decode("utf-8", errors="replace").split("\t", 2)
+    message = _ESCAPED.sub(lambda m: "\n" if m.group(1) == "n" else m.group(1), message)
+    ts_ns = int(ts)
+    return ts_ns, LogLine(datetime.datetime.fromtimestamp(ts_ns / 1e9, tz=datetime.timezone.utc), message, source)
+
+class _Boundary:
+    """Records archived in the last LATE_LINE_NS of a container, so repeats are dropped but not late lines."""
+
+    def __init__(self, newest: Optional[int] = None, records: Iterable[Tuple[int, bytes]] = ()):
+        self.newest = newest
+        self._records: Deque[Tuple[int, bytes]] = deque()
+        self._seen: Set[bytes] = set()
+        for ts_ns, record in records:
+            self._records.append((ts_ns, record))
+            self._seen.add(record)
+
+    def admit(self, ts_ns: int, record: bytes) -> bool:
+        if self.newest is not None and (ts_ns < self.newest - LATE_LINE_NS or record in self._seen):
+            return False
+        self._records.append((ts_ns, record))
+        self._seen.add(record)
+        if self.newest is None or ts_ns > self.newest:
+            self.newest = ts_ns
+            while self._records and self._records[0][0] < self.newest - LATE_LINE_NS:
+                self._seen.discard(self._records.popleft()[1])
+        return True
+
+class _SegmentWriter:
+    def __init__(self, directory: str, first_ns: int):
+        self.started = time.monotonic()
+        self.path = os.path.join(directory, f"{first_ns:020d}.seg")
+        self.data = open(self.path, "ab")
+        self.index = open(self.path[:-4] + ".idx", "ab")
+        self.size = self.data.tell()
+
+    def write_block(self, records: List[bytes], first_ns: int, last_ns: int) -> None:
+        payload = zlib.compress(b"".join(records), COMPRESSION_LEVEL)
+        offset = self.size
+        self.data.write(BLOCK_HEADER.pack(len(payload)) + payload)
+        self.data.flush()
+        # The index entry goes last, so a reader never sees an entry for a block that is not on disk.
+        self.index.write(INDEX_ENTRY.pack(first_ns, last_ns, offset))
+        self.index.flush()
+        self.size += BLOCK_HEADER.size + len(payload)
+
+    def close(self) -> None:
+        self.data.close()
+        self.index.close()
+
+class LogArchive:
+    """Compressed, time-indexed on-disk archive of log lines, one directory per container.
+
+    Lines are grouped into independently zlib-compressed blocks appended to
+    segment files that roll over by size or age. Each segment has a sidecar
+    index with the time range and offset of every block. Reads mmap the segment,
+    binary-search the index for the first block that can hold the requested
+    time and decompress block by block from there. Old segments are deleted
+    once the archive grows past its retention budget. Lines are stored in
+    arrival order, which is time order to within LATE_LINE_NS.
+    """
+
+    def __init__(self, root: str = DEFAULT_ARCHIVE_DIR, block_bytes: int = DEFAULT_BLOCK_BYTES,
+                 segment_bytes: int = DEFAULT_SEGMENT_BYTES, segment_seconds: float = DEFAULT_SEGMENT_SECONDS,
+                 flush_seconds: float = DEFAULT_FLUSH_SECONDS, retention_bytes: int = DEFAULT_RETENTION_BYTES):
+        self.root = os.path.abspath(root)
+        self.block_bytes = block_bytes
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.flush_seconds = flush_seconds
+        self.retention_bytes = retention_bytes
+        self._pending: Dict[str, List[bytes]] = {}
+        self._pending_range: Dict[str, Tuple[int, int]] = {}
+        self._pending_bytes: Dict[str, int] = {}
+        self._pending_since: Dict[str, float] = {}
+        self._boundaries: Dict[str, _Boundary] = {}
+        self._writers: Dict[str, _SegmentWriter] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    # Lifecycle
+    def start(self) -> "LogArchive":
+        """Flush pending lines every flush_seconds on a daemon thread, so a quiet tail loses nothing."""
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._stopped.clear()
+                self._flusher = threading.Thread(target=self._flush_periodically, name="log-archive", daemon=True)
+                self._flusher.start()
+        return self
+
+    def _flush_periodically(self) -> None:
+        while not self._stopped.wait(self.flush_seconds):
+            try:
+                self._flush_due()
+            except OSError:
+                pass
+
+    def _flush_due(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            for container, records in self._pending.items():
+                if records and now - self._pending_since[container] >= self.flush_seconds:
+                    self._flush(container)
+
+    def _directory(self, container: str) -> str:
+        return os.path.join(self.root, _UNSAFE.sub("_", container))
+
+    def containers(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    # Writing
+    def append(self, container: str, lines: Iterable[LogLine]) -> int:
+        """Queue lines for a container, skipping lines it already holds; returns lines kept.
+
+        A line is a repeat when the same timestamp, source and message were
+        archived within LATE_LINE_NS of the newest line; lines sharing a
+        timestamp or arriving slightly out of order are kept. Lines further
+        behind than that are taken to be a replay and skipped.
+        """
+        kept = 0
+        with self._lock:
+            boundary = self._boundaries.get(container)
+            if boundary is None:
+                boundary = self._boundaries[container] = self._archived_boundary(container)
+            for line in lines:
+                ts_ns = _ns(line.timestamp)
+                record = _encode(line)
+                if not boundary.admit(ts_ns, record):
+                    continue
+                pending = self._pending.setdefault(container, [])
+                if not pending:
+                    self._pending_range[container] = (ts_ns, ts_ns)
+                    self._pending_bytes[container] = 0
+                    self._pending_since[container] = time.monotonic()
+                pending.append(record)
+                first_ns, last_ns = self._pending_range[container]
+                self._pending_range[container] = (min(first_ns, ts_ns), max(last_ns, ts_ns))
+                self._pending_bytes[container] += len(record)
+                kept += 1
+                if self._pending_bytes[container] >= self.block_bytes:
+                    self._flush(container)
+            if self._pending.get(container) and time.monotonic() - self._pending_since[container] >= self.flush_seconds:
+                self._flush(container)
+        return kept
+
+    def flush(self, container: Optional[str] = None) -> None:
+        """Write the pending lines of a container (every container when none given) to disk."""
+        with self._lock:
+            for name in [container] if container is not None else list(self._pending):
+                self._flush(name)
+
+    def close(self) -> None:
+        self._stopped.set()
+        with self._lock:
+            for container in list(self._pending):
+                self._flush(container)
+            for writer in self._writers.values():
+                writer.close()
+            self._writers.clear()
+
+    def _flush(self, container: str) -> None:
+        records = self._pending.get(container)
+        if not records:
+            return
+        first_ns, last_ns = self._pending_range[container]
+        writer = self._writers.get(container)
+        if writer is not None and (writer.size >= self.segment_bytes
+                                   or time.monotonic() - writer.started >= self.segment_seconds):
+            writer.close()
+            writer = None
+        if writer is None:
+            directory = self._directory(container)
+            os.makedirs(directory, exist_ok=True)
+            writer = self._writers[container] = _SegmentWriter(directory, first_ns)
+            self._enforce_retention()
+        writer.write_block(records, first_ns, last_ns)
+        self._pending[container] = []
+
+    def _enforce_retention(self) -> None:
+        segments = []
+        for container in self.containers():
+            for path in self._segments(container):
+                segments.append((os.path.basename(path), path))
+        total = sum(os.path.getsize(p) for _, p in segments)
+        active = {w.path for w in self._writers.values()}
+        for _, path in sorted(segments):
+            if total <= self.retention_bytes:
+                break
+            if path in active:
+                continue
+            total -= os.path.getsize(path)
+            for doomed in (path, path[:-4] + ".idx"):
+                try:
+                    os.remove(doomed)
+                except FileNotFoundError:
+                    pass
+
+    # Reading
+    def _segments(self, container: str) -> List[str]:
+        directory = self._directory(container)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".seg"))
+
+    @staticmethod
+    def _index(segment: str) -> List[Tuple[int, int, int]]:
+        try:
+            with open(segment[:-4] + ".idx", "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        return list(INDEX_ENTRY.iter_unpack(data[:usable]))
+
+    def _archived_boundary(self, container: str) -> _Boundary:
+        """Seed a container's boundary from the newest archived lines, so a restart does not repeat them."""
+        segments = self._segments(container)
+        entries = self._index(segments[-1]) if segments else []
+        if not entries:
+            return _Boundary()
+        newest = max(entry[1] for entry in entries)
+        records = [(ts_ns, _encode(line)) for ts_ns, line in self._read(container, newest - LATE_LINE_NS, newest)]
+        return _Boundary(newest, records)
+
+    def read(self, container: str, since: Optional[datetime.datetime] = None,
+             until: Optional[datetime.datetime] = None) -> Iterator[LogLine]:
+        """Yield archived lines of a container between since and until, oldest first."""
+        if container in self._pending:
+            self.flush()
+        since_ns = _ns(since) if since is not None else 0
+        until_ns = _ns(until) if until is not None else 2 ** 63
+        for _, line in self._read(container, since_ns, until_ns):
+            yield line
+
+    def _read(self, container: str, since_ns: int, until_ns: int) -> Iterator[Tuple[int, LogLine]]:
+        # Late lines let neighbouring blocks overlap by up to LATE_LINE_NS, and lines are only
+        # ordered to within that, so the seek and the early stop both leave that much slack.
+        for segment in self._segments(container):
+            entries = self._index(segment)
+            if not entries or max(e[1] for e in entries) < since_ns or entries[0][0] > until_ns + LATE_LINE_NS:
+                continue
+            # Every block before the one found here ends before since.
+            start = max(0, bisect_left([e[0] for e in entries], since_ns - LATE_LINE_NS) - 1)
+            with open(segment, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for first_ns, last_ns, offset in entries[start:]:
+                    if first_ns > until_ns + LATE_LINE_NS:
+                        return
+                    if last_ns < since_ns:
+                        continue
+                    (length,) = BLOCK_HEADER.unpack_from(data, offset)
+                    body = offset + BLOCK_HEADER.size
+                    decompressor = zlib.decompressobj()
+                    remainder = b""
+                    # Decompress in slices so a large block is never fully expanded at once.
+                    for chunk_start in range(body, body + length, 16 * 1024):
+                        chunk = decompressor.decompress(data[chunk_start:min(chunk_start + 16 * 1024, body + length)])
+                        *records, remainder = (remainder + chunk).split(b"\n")
+                        for record in records:
+                            ts_ns, line = _decode(record)
+                            if since_ns <= ts_ns <= until_ns:
+                                yield ts_ns, line
+
+    def time_range(self, container: str) -> Optional[Tuple[datetime.datetime, datetime.datetime]]:
+        """Oldest and newest archived timestamps of a container."""
+        segments = self._segments(container)
+        first = self._index(segments[0]) if segments else []
+        last = self._index(segments[-1]) if segments else []
+        if not first or not last:
+            return None
+        to_dt = lambda ns: datetime.datetime.fromtimestamp(ns / 1e9, tz=datetime.timezone.utc)
+        return to_dt(min(e[0] for e in first)), to_dt(max(e[1] for e in last))
+
+_archive: Optional[LogArchive] = None
+_archive_lock = threading.Lock()
+
+def get_log_archive() -> LogArchive:
+    """Return the process-wide archive, shared so concurrent sessions never write a line twice."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = LogArchive().start()
+            # Lines still pending at exit would otherwise be lost.
+            atexit.register(_archive.close)
+        return _archive
@@ -0,0 +1,136 @@
+# utils/logbuffer.py
+
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from utils.dockermanager import LogLine
+from utils.logindex import LogIndex, required_literals
+
+DEFAULT_MAX_LINES = 100_000
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# Rough per-line bookkeeping cost counted against max_bytes on top of the message.
+LINE_OVERHEAD = 64
+
+class LogBuffer:
+    """Ring buffer of log lines bounded by line count and by approximate bytes.
+
+    Every line gets a sequence number that keeps increasing across evictions, so
+    readers can ask for what arrived after the last line they saw.
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 index: Optional[LogIndex] = None):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.index = index
+        # A list with a moving head rather than a deque, so lines can be fetched by position in O(1).
+        self._lines: List[Tuple[int, LogLine]] = []
+        self._head = 0
+        self._bytes = 0
+        self.next_seq = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._lines) - self._head
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def first_seq(self) -> int:
+        return self._lines[self._head][0] if len(self) else self.next_seq
+
+    @staticmethod
+    def _size(line: LogLine) -> int:
+        return len(line.message) + LINE_OVERHEAD
+
+    def extend(self, lines: Iterable[LogLine]) -> int:
+        """Append lines, evicting the oldest ones past either bound; returns how many were evicted."""
+        for line in lines:
+            self._lines.append((self.next_seq, line))
+            self._bytes += self._size(line)
+            if self.index is not None:
+                self.index.add(self.next_seq, line)
+            self.next_seq += 1
+
+        evicted = 0
+        while len(self) and (len(self) > self.max_lines or self._bytes > self.max_bytes):
+            _, line = self._lines[self._head]
+            self._bytes -= self._size(line)
+            self._head += 1
+            evicted += 1
+        if self._head > len(self._lines) // 2:
+            # Trimming once half the list is dead keeps eviction amortized O(1).
+            del self._lines[:self._head]
+            self._head = 0
+        self.evicted += evicted
+        if evicted and self.index is not None:
+            self.index.evict_before(self.first_seq)
+        return evicted
+
+    def append(self, line: LogLine) -> int:
+        return self.extend([line])
+
+    def tail(self, count: int) -> List[LogLine]:
+        """Return the newest count lines, oldest first."""
+        count = min(count, len(self))
+        return [line for _, line in self._lines[len(self._lines) - count:]]
+
+    def since(self, seq: int) -> List[LogLine]:
+        """Return the lines with a sequence number of at least seq that are still buffered."""
+        start = self._head + max(0, seq - self.first_seq)
+        return [line for _, line in self._lines[start:]]
+
+    def get(self, seq: int) -> Optional[LogLine]:
+        index = seq - self.first_seq
+        return self._lines[self._head + index][1] if 0 <= index < len(self) else None
+
+    def clear(self) -> None:
+        self._lines.clear()
+        self._head = 0
+        self._bytes = 0
+        if self.index is not None:
+            self.index.evict_before(self.next_seq)
+
+    def search(self, pattern: str, regex: bool = False, ignore_case: bool = True,
+               since: Optional[float] = None, until: Optional[float] = None,
+               limit: Optional[int] = None) -> List[LogLine]:
+        """Return buffered lines matching a substring or regex, oldest first.
+
+        With an index attached, candidates come from the trigram postings of the
+        pattern's required literals and only those are checked; otherwise every
+        line in the time range is scanned. limit keeps the newest matches.
+        """
+        flags = re.IGNORECASE if ignore_case else 0
+        matcher = re.compile(pattern if regex else re.escape(pattern), flags).search
+
+        candidates = None
+        if self.index is not None:
+            seqs = self.index.seq_range(since, until)
+            fragments = required_literals(pattern) if regex else [pattern]
+            candidates = self.index.substring_candidates([f for f in fragments if len(f) >= 3], seqs)
+        else:
+            seqs = range(self.first_seq, self.next_seq)
+
+        if candidates is not None and len(candidates) * 8 < len(self):
+            # Few candidates: jump straight to them.
+            lines = (self.get(seq) for seq in reversed(candidates))
+        else:
+            # Many candidates or none pruned: one pass over the buffer is cheaper than random access.
+            wanted = set(candidates) if candidates is not None else None
+            lines = (line for seq, line in reversed(self._lines[self._head:])
+                     if seq in seqs and (wanted is None or seq in wanted))
+
+        matches = []
+        for line in lines:
+            if line is None or not matcher(line.message):
+                continue
+            ts = line.timestamp.timestamp()
+            if (since is not None and ts < since) or (until is not None and ts > until):
+                continue
+            matches.append(line)
+            if limit is not None and len(matches) >= limit:
+                break
+        matches.reverse()
+        return matches
@@ -0,0 +1,196 @@
+# utils/logindex.py
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Set
+
+from utils.dockermanager import LogLine
+
+# Width of the time buckets used to turn a time range into a range of sequence numbers.
+TIME_BUCKET_SECONDS = 60
+# Fraction of indexed lines that may be evicted before the posting lists are physically trimmed.
+COMPACTION_RATIO = 0.5
+# Only the rarest posting lists are intersected; the final regex check covers the rest.
+MAX_INTERSECTED_LISTS = 3
+
+_REGEX_META = set(".^$*+?{}[]\\|()")
+# Escapes that take arguments, with how many characters follow the letter.
+_ESCAPE_ARGS = {"x": 2, "u": 4, "U": 8}
+_INLINE_FLAGS = re.compile(r"\(\?[aiLmsux-]*x")
+
+def trigrams(text: str) -> Set[str]:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _escape_end(pattern: str, i: int) -> int:
+    """Index just past the escape starting at pattern[i], including any arguments it takes."""
+    escaped = pattern[i + 1]
+    if escaped in _ESCAPE_ARGS:
+        return min(len(pattern), i + 2 + _ESCAPE_ARGS[escaped])
+    if escaped == "N" and pattern.startswith("{", i + 2):
+        closing = pattern.find("}", i + 2)
+        return closing + 1 if closing != -1 else len(pattern)
+    if escaped.isdigit():
+        # Octal escapes and group references: up to three digits in all.
+        end = i + 2
+        while end < min(len(pattern), i + 4) and pattern[end].isdigit():
+            end += 1
+        return end
+    return i + 2
+
+def _class_end(pattern: str, i: int) -> int:
+    """Index of the "]" closing the character class opened at pattern[i], or len(pattern)."""
+    j = i + 1
+    if pattern.startswith("^", j):
+        j += 1
+    if pattern.startswith("]", j):
+        j += 1
+    while j < len(pattern):
+        if pattern[j] == "\\":
+            j += 2
+            continue
+        if pattern[j] == "]":
+            return j
+        j += 1
+    return len(pattern)
+
+def required_literals(pattern: str) -> List[str]:
+    """Literal runs every match of a regex must contain; empty when none can be proven.
+
+    This is deliberately conservative: a pattern with alternation or verbose mode,
+    or whose literals sit inside groups or classes, yields nothing and falls back
+    to a scan. Escapes other than escaped punctuation and quantifier braces break
+    a run rather than adding to it.
+    """
+    if "|" in pattern or _INLINE_FLAGS.search(pattern):
+        return []
+    literals, current, depth, i = [], "", 0, 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            literal = escaped if not escaped.isalnum() else None
+            i = _escape_end(pattern, i)
+        elif char in _REGEX_META:
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif char == "[":
+                i = _class_end(pattern, i)
+            elif char == "{":
+                closing = pattern.find("}", i)
+                i = closing if closing != -1 else len(pattern)
+            literal = None
+            i += 1
+        else:
+            literal = char
+            i += 1
+
+        optional = i < len(pattern) and pattern[i] in "?*{"
+        repeated = i < len(pattern) and pattern[i] == "+"
+        if literal is None or depth > 0 or optional:
+            if len(current) >= 3:
+                literals.append(current)
+            current = ""
+        else:
+            current += literal
+            if repeated:
+                # The character is required, but what follows it is not adjacent to the run.
+                if len(current) >= 3:
+                    literals.append(current)
+                current = ""
+    if len(current) >= 3:
+        literals.append(current)
+    return literals
+
+class LogIndex:
+    """Incremental inverted index over buffered log lines, keyed by sequence number.
+
+    Lowercase trigrams map to posting lists used to prefilter substring and
+    regex search. Time buckets record the first sequence number of every minute.
+    Postings only ever grow at the end and are trimmed from the front once
+    enough of the lines they cover have left the buffer.
+    """
+
+    def __init__(self):
+        self.trigrams: Dict[str, List[int]] = {}
+        self._bucket_keys: List[int] = []
+        self._bucket_seqs: List[int] = []
+        self.first_seq = 0
+        # Lowest and one past the highest sequence number that may still have postings.
+        self._compacted_seq = 0
+        self._next_seq = 0
+
+    @property
+    def postings(self) -> int:
+        return sum(len(values) for values in self.trigrams.values())
+
+    def add(self, seq: int, line: LogLine) -> None:
+        for gram in trigrams(line.message):
+            self.trigrams.setdefault(gram, []).append(seq)
+        self._next_seq = seq + 1
+
+        bucket = int(line.timestamp.timestamp()) // TIME_BUCKET_SECONDS
+        if not self._bucket_keys or bucket > self._bucket_keys[-1]:
+            self._bucket_keys.append(bucket)
+            self._bucket_seqs.append(seq)
+
+    def evict_before(self, seq: int) -> None:
+        """Forget every line with a sequence number below seq."""
+        if seq <= self.first_seq:
+            return
+        self.first_seq = seq
+        keep = max(0, bisect_right(self._bucket_seqs, seq) - 1)
+        del self._bucket_keys[:keep], self._bucket_seqs[:keep]
+        # Stale and indexed lines are counted in the same unit, so postings stay
+        # within a constant factor of what the buffer holds.
+        stale = self.first_seq - self._compacted_seq
+        indexed = max(self._next_seq, self.first_seq) - self._compacted_seq
+        if stale > COMPACTION_RATIO * max(indexed, 1):
+            self._compact()
+
+    def _compact(self) -> None:
+        for gram in list(self.trigrams):
+            values = self.trigrams[gram]
+            cut = bisect_left(values, self.first_seq)
+            if cut == len(values):
+                del self.trigrams[gram]
+            elif cut:
+                del values[:cut]
+        self._compacted_seq = self.first_seq
+
+    def seq_range(self, since: Optional[float] = None, until: Optional[float] = None) -> range:
+        """Sequence numbers that may hold lines between since and until (epoch seconds)."""
+        start = self.first_seq
+        if since is not None and self._bucket_keys:
+            i = bisect_right(self._bucket_keys, int(since) // TIME_BUCKET_SECONDS) - 1
+            start = max(start, self._bucket_seqs[i]) if i >= 0 else start
+        end = None
+        if until is not None and self._bucket_keys:
+            i = bisect_right(self._bucket_keys, int(until) // TIME_BUCKET_SECONDS)
+            end = self._bucket_seqs[i] if i < len(self._bucket_seqs) else None
+        return range(start, end if end is not None else 2 ** 62)
+
+    def _live(self, postings: List[int], seqs: range) -> List[int]:
+        return postings[bisect_left(postings, max(self.first_seq, seqs.start)):bisect_left(postings, seqs.stop)]
+
+    def _intersect(self, lists: List[List[int]], seqs: range) -> Optional[List[int]]:
+        if not lists:
+            return None
+        lists = sorted((self._live(p, seqs) for p in lists), key=len)[:MAX_INTERSECTED_LISTS]
+        result = lists[0]
+        for other in lists[1:]:
+            if not result:
+                break
+            if len(other) > 8 * len(result):
+                result = [seq for seq in result if (i := bisect_left(other, seq)) < len(other) and other[i] == seq]
+            else:
+                members = set(other)
+                result = [seq for seq in result if seq in members]
+        return result
+
+    def substring_candidates(self, fragments: Iterable[str], seqs: range) -> Optional[List[int]]:
+        """Lines that contain every trigram of every fragment, or None when nothing can be pruned."""
+        grams = set().union(*(trigrams(f) for f in fragments)) if fragments else set()
+        return self._intersect([self.trigrams.get(g, []) for g in grams], seqs)
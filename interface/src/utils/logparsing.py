@@ -0,0 +1,237 @@
+# utils/logparsing.py
+
+import datetime
+import json
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from utils.dockermanager import LogLine
+
+METRICS_PORT = 9105
+# Seconds of per-second counts kept for the in-process rates.
+RATE_HISTORY_SECONDS = 300
+# How far behind the newest counted line a line may arrive and still be counted (stdout/stderr skew).
+LATE_LINE_SECONDS = 5.0
+
+# A level written the way loggers write it: an upper-case word ("INFO", "ERROR"), or any
+# case when bracketed or followed by a colon ("[error]", "warn:"). Not "/error-page".
+_LEVELS = r"TRACE|DEBUG|INFO|NOTICE|WARN(?:ING)?|ERROR|ERR|CRIT(?:ICAL)?|FATAL|PANIC|SEVERE"
+LEVEL_PATTERN = re.compile(rf"(?:^|[\s\[(|])(?:({_LEVELS})(?=[\s\]):|]|$)|((?i:{_LEVELS}))(?=[\]:]))")
+KEY_VALUE_LEVEL_PATTERN = re.compile(r"\b(?:level|lvl|severity)=\"?(\w+)", re.IGNORECASE)
+TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?")
+# Fallback for lines without a recognizable level.
+ERROR_WORDS_PATTERN = re.compile(r"exception\b|\btraceback\b|\b(?:error|fatal|panic):", re.IGNORECASE)
+
+JSON_LEVEL_KEYS = ("level", "lvl", "severity", "levelname", "log.level")
+JSON_TIME_KEYS = ("time", "ts", "timestamp", "@timestamp", "datetime")
+JSON_MESSAGE_KEYS = ("msg", "message", "event", "log")
+
+LEVEL_ALIASES = {"warning": "warn", "err": "error", "crit": "critical", "severe": "error", "panic": "fatal"}
+ERROR_LEVELS = {"error", "critical", "fatal"}
+
+class ParsedLine(NamedTuple):
+    timestamp: datetime.datetime
+    message: str
+    source: str = ""
+    level: Optional[str] = None
+    text: str = ""
+    # Decoded JSON object or extracted values; None when the line had none (a NamedTuple default is shared).
+    fields: Optional[Dict[str, Any]] = None
+    is_error: bool = False
+
+    def __str__(self) -> str:
+        prefix = f"[{self.source}] " if self.source else ""
+        return f"{self.timestamp.isoformat(timespec='milliseconds')} {prefix}{self.message}"
+
+def _normalize_level(level: Any) -> Optional[str]:
+    if not isinstance(level, str) or not level:
+        return None
+    level = level.lower()
+    return LEVEL_ALIASES.get(level, level)
+
+def _first(fields: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        if key in fields:
+            return fields[key]
+    return None
+
+def parse_line(line: LogLine, source: Optional[str] = None) -> ParsedLine:
+    """Parse one line as JSON when it looks like an object, otherwise as plain text."""
+    message = line.message
+    stripped = message.strip()
+    fields: Dict[str, Any] = {}
+    level, text = None, stripped
+
+    if stripped.startswith("{") and stripped.endswith("}"):
+        try:
+            decoded = json.loads(stripped)
+            fields = decoded if isinstance(decoded, dict) else {}
+        except ValueError:
+            fields = {}
+
+    if fields:
+        level = _normalize_level(_first(fields, JSON_LEVEL_KEYS))
+        text = str(_first(fields, JSON_MESSAGE_KEYS) or stripped)
+        logged_at = _first(fields, JSON_TIME_KEYS)
+        if logged_at is not None:
+            fields.setdefault("logged_at", logged_at)
+    else:
+        match = KEY_VALUE_LEVEL_PATTERN.search(stripped) or LEVEL_PATTERN.search(stripped[:200])
+        if match:
+            level = _normalize_level(match.group(match.lastindex))
+        stamp = TIMESTAMP_PATTERN.match(stripped)
+        if stamp:
+            fields["logged_at"] = stamp.group(0)
+            text = stripped[stamp.end():].lstrip(" -|:")
+
+    is_error = level in ERROR_LEVELS if level else bool(ERROR_WORDS_PATTERN.search(stripped))
+    return ParsedLine(line.timestamp, message, source or line.source, level, text, fields or None, is_error)
+
+class _Watermark:
+    """Lines of one container already counted, to count each line once however many tails see it."""
+
+    def __init__(self, started: float):
+        self.newest = started - LATE_LINE_SECONDS
+        self._keys: Deque[Tuple[float, str]] = deque()
+        self._seen: Set[Tuple[float, str]] = set()
+
+    def admit(self, timestamp: float, message: str) -> bool:
+        key = (timestamp, message)
+        if timestamp < self.newest - LATE_LINE_SECONDS or key in self._seen:
+            return False
+        self._keys.append(key)
+        self._seen.add(key)
+        if timestamp > self.newest:
+            self.newest = timestamp
+            while self._keys and self._keys[0][0] < self.newest - LATE_LINE_SECONDS:
+                self._seen.discard(self._keys.popleft())
+        return True
+
+class LogMetrics:
+    """Per-container line and error counters with per-second buckets for cheap rates.
+
+    Every tail of a container feeds the same counters, so a line is counted
+    only the first time any of them records it, in the second it was logged.
+    Lines logged before a container was first seen (a backfill) and lines
+    already counted (another tab, a rerun) are ignored, which keeps the
+    exported counters free of duplicates and of bursts of old lines.
+    """
+
+    def __init__(self, history_seconds: int = RATE_HISTORY_SECONDS):
+        self.history_seconds = history_seconds
+        self.lines_total: Dict[str, int] = {}
+        self.errors_total: Dict[str, int] = {}
+        self._buckets: Dict[str, Deque[List[int]]] = {}
+        self._watermarks: Dict[str, _Watermark] = {}
+        self._lock = threading.Lock()
+
+    def record(self, container: str, is_error: bool, timestamp: float, message: str = "",
+               now: Optional[float] = None) -> bool:
+        """Count one line logged at timestamp (epoch seconds); returns False if it was not counted."""
+        with self._lock:
+            watermark = self._watermarks.get(container)
+            if watermark is None:
+                watermark = self._watermarks[container] = _Watermark(now if now is not None else time.time())
+            if not watermark.admit(timestamp, message):
+                return False
+            self.lines_total[container] = self.lines_total.get(container, 0) + 1
+            if is_error:
+                self.errors_total[container] = self.errors_total.get(container, 0) + 1
+
+            second = int(timestamp)
+            buckets = self._buckets.setdefault(container, deque())
+            # Late lines land a few buckets back; walk from the newest end to find theirs.
+            position = len(buckets)
+            while position and buckets[position - 1][0] > second:
+                position -= 1
+            if position and buckets[position - 1][0] == second:
+                bucket = buckets[position - 1]
+            else:
+                bucket = [second, 0, 0]
+                buckets.insert(position, bucket)
+            bucket[1] += 1
+            bucket[2] += int(is_error)
+            while buckets and buckets[0][0] <= buckets[-1][0] - self.history_seconds:
+                buckets.popleft()
+            return True
+
+    def rates(self, container: str, window: int = 60, now: Optional[float] = None) -> Dict[str, float]:
+        """Lines and errors per second for a container over the last window seconds."""
+        cutoff = int(now if now is not None else time.time()) - window
+        with self._lock:
+            recent = [b for b in self._buckets.get(container, ()) if b[0] > cutoff]
+        lines = sum(b[1] for b in recent)
+        errors = sum(b[2] for b in recent)
+        return {
+            "lines_per_second": lines / window,
+            "errors_per_second": errors / window,
+            "error_ratio": errors / lines if lines else 0.0,
+        }
+
+    def render(self) -> str:
+        """Render the counters in the Prometheus text exposition format."""
+        def escape(value: str) -> str:
+            return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+        with self._lock:
+            lines = ["# HELP logwatcher_log_lines_total Log lines parsed by LogWatcher.",
+                     "# TYPE logwatcher_log_lines_total counter"]
+            lines += [f'logwatcher_log_lines_total{{container="{escape(c)}"}} {v}' for c, v in sorted(self.lines_total.items())]
+            lines += ["# HELP logwatcher_log_errors_total Log lines classified as errors by LogWatcher.",
+                      "# TYPE logwatcher_log_errors_total counter"]
+            lines += [f'logwatcher_log_errors_total{{container="{escape(c)}"}} {self.errors_total.get(c, 0)}'
+                      for c in sorted(self.lines_total)]
+        return "\n".join(lines) + "\n"
+
+def parse_lines(lines: Iterable[LogLine], source: Optional[str] = None,
+                metrics: Optional["LogMetrics"] = None) -> Iterator[ParsedLine]:
+    """Parse a stream of lines lazily, counting lines and errors per container as they pass."""
+    metrics = metrics if metrics is not None else _metrics
+    for line in lines:
+        parsed = parse_line(line, source)
+        metrics.record(parsed.source or "unknown", parsed.is_error, parsed.timestamp.timestamp(), parsed.message)
+        yield parsed
+
+_metrics = LogMetrics()
+_metrics_server: Optional[ThreadingHTTPServer] = None
+_metrics_server_lock = threading.Lock()
+
+def get_log_metrics() -> LogMetrics:
+    return _metrics
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = _metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port: int = METRICS_PORT) -> bool:
+    """Serve /metrics for Prometheus on a daemon thread; returns False if the port is taken.
+
+    The counters only cover lines that pass through parse_lines in this
+    process, i.e. containers someone is tailing on the logs page. Nothing
+    is exported for other containers, or while no page is open.
+    """
+    global _metrics_server
+    with _metrics_server_lock:
+        if _metrics_server is not None:
+            return True
+        try:
+            _metrics_server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        except OSError:
+            return False
+        threading.Thread(target=_metrics_server.serve_forever, name="log-metrics", daemon=True).start()
+        return True
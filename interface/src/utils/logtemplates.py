@@ -0,0 +1,162 @@
+# utils/logtemplates.py
+
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+WILDCARD = "<*>"
+DEFAULT_DEPTH = 4
+DEFAULT_SIMILARITY = 0.4
+DEFAULT_MAX_CHILDREN = 100
+DEFAULT_MAX_CLUSTERS = 5000
+# Distinct example values remembered per wildcard position.
+MAX_EXAMPLES = 5
+
+# Tokens that are variables in almost every log format; masked before the tree is searched.
+_MASKS = [
+    re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE),
+    re.compile(r"^\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?$"),
+    re.compile(r"^(?:0x)?[0-9a-f]{12,}$", re.IGNORECASE),
+    re.compile(r"^[-+]?\d+(?:[.,:]\d+)*(?:ms|s|us|µs|ns|kb|mb|gb|b|%)?$", re.IGNORECASE),
+]
+
+def _mask(token: str) -> str:
+    return WILDCARD if any(mask.match(token) for mask in _MASKS) else token
+
+class LogCluster:
+    """A template and what has been seen in its variable positions."""
+
+    def __init__(self, cluster_id: int, tokens: List[str], leaf: List[int]):
+        self.cluster_id = cluster_id
+        self.tokens = tokens
+        self.leaf = leaf
+        self.count = 0
+        self.errors = 0
+        self.examples: Dict[int, List[str]] = {}
+        self.last_line: Optional[Any] = None
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def similarity(self, tokens: List[str]) -> Tuple[float, int]:
+        """Drain's seqDist: the share of tokens equal to a constant of the template, and its wildcard count.
+
+        Wildcards do not count as similar; among equally similar templates the
+        one with more wildcards (the more general one) wins.
+        """
+        same = parameters = 0
+        for current, token in zip(self.tokens, tokens):
+            if current == WILDCARD:
+                parameters += 1
+            elif current == token:
+                same += 1
+        return (same / len(tokens) if tokens else 1.0), parameters
+
+    def absorb(self, tokens: List[str], raw: List[str], line: Any, is_error: bool) -> None:
+        for position, (current, token) in enumerate(zip(self.tokens, tokens)):
+            if current != token:
+                if current != WILDCARD:
+                    # Keep the constant this position held until now as its first example.
+                    self.examples[position] = [current]
+                self.tokens[position] = WILDCARD
+        for position, token in enumerate(self.tokens):
+            if token == WILDCARD:
+                examples = self.examples.setdefault(position, [])
+                if raw[position] not in examples and len(examples) < MAX_EXAMPLES:
+                    examples.append(raw[position])
+        self.count += 1
+        self.errors += int(is_error)
+        self.last_line = line
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.cluster_id,
+            "template": self.template,
+            "count": self.count,
+            "errors": self.errors,
+            "examples": {position: list(values) for position, values in sorted(self.examples.items())},
+            "last": str(self.last_line) if self.last_line is not None else "",
+        }
+
+class TemplateMiner:
+    """Online Drain-style log template miner.
+
+    Lines are split on whitespace and routed through a fixed-depth prefix tree:
+    first by token count, then by their leading tokens (numeric-looking tokens
+    go down a wildcard branch). The leaf holds candidate clusters; a line joins
+    the most similar one above the similarity threshold (ties go to the one with
+    more wildcards), turning the positions that differ into wildcards, or starts
+    a new cluster.
+    """
+
+    def __init__(self, depth: int = DEFAULT_DEPTH, similarity: float = DEFAULT_SIMILARITY,
+                 max_children: int = DEFAULT_MAX_CHILDREN, max_clusters: int = DEFAULT_MAX_CLUSTERS):
+        self.depth = max(depth - 2, 1)
+        self.similarity_threshold = similarity
+        self.max_children = max_children
+        self.max_clusters = max_clusters
+        self.root: Dict[Any, Any] = {}
+        self.clusters: "OrderedDict[int, LogCluster]" = OrderedDict()
+        self._next_id = 1
+        self.lines = 0
+
+    def _leaf(self, tokens: List[str]) -> List[int]:
+        node = self.root.setdefault(len(tokens), {})
+        for token in tokens[:self.depth]:
+            if any(c.isdigit() for c in token):
+                token = WILDCARD
+            if token not in node:
+                if len(node) >= self.max_children:
+                    token = WILDCARD
+                node = node.setdefault(token, {})
+            else:
+                node = node[token]
+        return node.setdefault(None, [])
+
+    def add(self, line: Any) -> LogCluster:
+        """Assign a line (a string or anything with .message) to a cluster and return it."""
+        message = getattr(line, "message", line)
+        raw = message.split()
+        tokens = [_mask(token) for token in raw]
+        leaf = self._leaf(tokens)
+
+        best, best_score = None, (-1.0, -1)
+        for cluster_id in leaf:
+            cluster = self.clusters[cluster_id]
+            score = cluster.similarity(tokens)
+            if score > best_score:
+                best, best_score = cluster, score
+
+        if best is None or best_score[0] < self.similarity_threshold:
+            best = LogCluster(self._next_id, list(tokens), leaf)
+            self._next_id += 1
+            self.clusters[best.cluster_id] = best
+            leaf.append(best.cluster_id)
+            self._evict()
+
+        best.absorb(tokens, raw, line, bool(getattr(line, "is_error", False)))
+        self.clusters.move_to_end(best.cluster_id)
+        self.lines += 1
+        return best
+
+    def _evict(self) -> None:
+        # Least recently matched clusters go first, and leave their leaf with them.
+        while len(self.clusters) > self.max_clusters:
+            _, cluster = self.clusters.popitem(last=False)
+            cluster.leaf.remove(cluster.cluster_id)
+
+    def extend(self, lines) -> None:
+        for line in lines:
+            self.add(line)
+
+    def templates(self, order: str = "count", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return clusters as dicts, ordered by "count", "rare" (fewest first) or "recent"."""
+        clusters = list(self.clusters.values())
+        if order == "count":
+            clusters.sort(key=lambda c: c.count, reverse=True)
+        elif order == "rare":
+            clusters.sort(key=lambda c: (c.errors == 0, c.count))
+        else:
+            clusters.reverse()
+        return [cluster.to_dict() for cluster in clusters[:limit]]
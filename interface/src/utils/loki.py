@@ -0,0 +1,303 @@
+# utils/loki.py
+
+import datetime
+import heapq
+import json
+import re
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import websocket
+
+from utils.dockermanager import LogLine
+from utils.transport import HTTPTransport, get_transport
+
+DEFAULT_BATCH_SIZE = 1000
+# Loki label promtail puts the container name in (see config/promtail/promtail.yaml).
+CONTAINER_LABEL = "container"
+
+# LogQL line filter operators: contains, does not contain, matches regex, does not match regex.
+LINE_FILTER_OPERATORS = ("|=", "!=", "|~", "!~")
+
+LabelMatchers = Dict[str, Union[str, Sequence[str]]]
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def label_selector(labels: LabelMatchers) -> str:
+    """Build a stream selector; a list of values matches any of them exactly."""
+    matchers = []
+    for name, value in labels.items():
+        if isinstance(value, str):
+            matchers.append(f"{name}={_quote(value)}")
+        elif len(value) == 1:
+            matchers.append(f"{name}={_quote(value[0])}")
+        else:
+            matchers.append(f"{name}=~{_quote('|'.join(re.escape(v) for v in value))}")
+    return "{" + ", ".join(matchers) + "}"
+
+def build_logql(labels: LabelMatchers, line_filters: Iterable[Tuple[str, str]] = ()) -> str:
+    """Build a LogQL log query from label matchers and (operator, pattern) line filters."""
+    query = label_selector(labels)
+    for operator, pattern in line_filters:
+        if operator not in LINE_FILTER_OPERATORS:
+            raise ValueError(f"Unsupported line filter operator: {operator}")
+        query += f" {operator} {_quote(pattern)}"
+    return query
+
+def _to_ns(value: Union[datetime.datetime, float, int]) -> int:
+    if isinstance(value, datetime.datetime):
+        return int(value.timestamp() * 1e9)
+    return int(value * 1e9) if isinstance(value, float) else int(value)
+
+def _to_datetime(ns: int) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(ns / 1e9, tz=datetime.timezone.utc)
+
+def _source(labels: Dict[str, str]) -> str:
+    return labels.get(CONTAINER_LABEL) or labels.get("job") or ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+
+class LokiClient:
+    def __init__(self, loki_url: str = "http://localhost:3100", transport: Optional[HTTPTransport] = None):
+        self.loki_url = loki_url
+        self._transport = transport
+
+    @property
+    def transport(self) -> HTTPTransport:
+        return self._transport or get_transport()
+
+    def query_range(self, query: str, start: Union[datetime.datetime, float, int], end: Union[datetime.datetime, float, int],
+                    limit: int = DEFAULT_BATCH_SIZE, direction: str = "backward") -> Dict[str, Any]:
+        """Execute a LogQL range query and return the result; times are datetimes, epoch seconds (float) or ns (int)."""
+        response = self.transport.get(f"{self.loki_url}/loki/api/v1/query_range", params={
+            "query": query, "start": _to_ns(start), "end": _to_ns(end), "limit": limit, "direction": direction,
+        })
+        response.raise_for_status()
+        return response.json()
+
+    def label_values(self, label: str) -> List[str]:
+        """List the known values of a label."""
+        response = self.transport.get(f"{self.loki_url}/loki/api/v1/label/{label}/values")
+        response.raise_for_status()
+        return response.json().get("data", [])
+
+    def _entries(self, result: Dict[str, Any]) -> List[Tuple[int, Dict[str, str], str]]:
+        if result.get("status") != "success":
+            return []
+        return [(int(ts), stream["stream"], line)
+                for stream in result["data"]["result"] for ts, line in stream["values"]]
+
+    def stream(self, query: str, start: Union[datetime.datetime, float, int], end: Union[datetime.datetime, float, int],
+               direction: str = "backward", batch_size: int = DEFAULT_BATCH_SIZE,
+               max_lines: Optional[int] = None) -> Iterator[LogLine]:
+        """Yield every line matching query between start and end, one page of batch_size at a time.
+
+        Lines come out newest first for direction="backward" and oldest first for
+        "forward". Each page resumes at the timestamp of the last line of the
+        previous one; lines at that boundary that were already yielded are skipped.
+        """
+        start_ns, end_ns = _to_ns(start), _to_ns(end)
+        boundary, seen = None, set()
+        yielded = 0
+
+        while start_ns < end_ns:
+            # Ask for enough extra lines to cover the boundary duplicates that will be skipped.
+            limit = (batch_size if max_lines is None else min(batch_size, max_lines - yielded)) + len(seen)
+            entries = self._entries(self.query_range(query, start_ns, end_ns, limit=limit, direction=direction))
+            entries.sort(key=lambda e: e[0], reverse=direction == "backward")
+
+            fresh = 0
+            for ts, labels, line in entries:
+                if max_lines is not None and yielded >= max_lines:
+                    return
+                key = (tuple(sorted(labels.items())), line)
+                if ts == boundary and key in seen:
+                    continue
+                if ts != boundary:
+                    boundary, seen = ts, set()
+                seen.add(key)
+                fresh += 1
+                yielded += 1
+                yield LogLine(_to_datetime(ts), line, _source(labels))
+
+            if len(entries) < limit or fresh == 0:
+                return
+            if direction == "backward":
+                end_ns = boundary + 1
+            else:
+                start_ns = boundary
+
+_loki: Optional[LokiClient] = None
+
+def get_loki_client() -> LokiClient:
+    """Return the shared LokiClient."""
+    global _loki
+    if _loki is None:
+        _loki = LokiClient()
+    return _loki
+
+# Colors assigned to tailed sources in order of first appearance.
+TAIL_PALETTE = ("#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f",
+                "#edc948", "#b07aa1", "#ff9da7", "#9c755f", "#bab0ac")
+DEFAULT_TAIL_RATE = 500.0
+# Seconds an entry is held back so lines from different connections can be put in order.
+DEFAULT_REORDER_WINDOW = 0.5
+TAIL_RECONNECT_DELAY = 1.0
+TAIL_CONNECT_TIMEOUT = 10.0
+# Seconds without traffic before a quiet tail is pinged; a missing pong by the next one means the connection is dead.
+TAIL_PING_INTERVAL = 30.0
+
+class LokiTail:
+    """Live tail of many containers or selectors over Loki's /tail websocket.
+
+    Containers are folded into one selector, so a whole compose stack costs one
+    connection; each extra query gets its own. Entries from every connection
+    are merged into a single time-ordered stream after a short reorder window,
+    capped at max_rate lines per second. Lines dropped by that cap and those
+    Loki reports as dropped are counted per source.
+    """
+
+    def __init__(self, queries: Sequence[str], client: Optional[LokiClient] = None,
+                 max_rate: float = DEFAULT_TAIL_RATE, reorder_window: float = DEFAULT_REORDER_WINDOW):
+        self.queries = list(queries)
+        self.client = client or get_loki_client()
+        self.max_rate = max_rate
+        self.reorder_window = reorder_window
+        self.colors: Dict[str, str] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self._heap: List[Tuple[int, int, float, LogLine]] = []
+        self._sequence = 0
+        self._newest = 0
+        self._tokens = max_rate
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._sockets: Dict[str, Any] = {}
+        self._threads = [threading.Thread(target=self._run, args=(query,), name="loki-tail", daemon=True)
+                         for query in self.queries]
+
+    @classmethod
+    def for_containers(cls, container_names: Sequence[str], line_filters: Iterable[Tuple[str, str]] = (),
+                       extra_queries: Sequence[str] = (), **kwargs) -> "LokiTail":
+        queries = [build_logql({CONTAINER_LABEL: list(container_names)}, line_filters)] if container_names else []
+        return cls(queries + list(extra_queries), **kwargs)
+
+    def start(self) -> "LokiTail":
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def close(self) -> None:
+        self._closed.set()
+        for ws in list(self._sockets.values()):
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def color(self, source: str) -> str:
+        with self._lock:
+            return self._color(source)
+
+    def _color(self, source: str) -> str:
+        if source not in self.colors:
+            self.colors[source] = TAIL_PALETTE[len(self.colors) % len(TAIL_PALETTE)]
+        return self.colors[source]
+
+    def _counter(self, source: str) -> Dict[str, int]:
+        self._color(source)
+        return self.counters.setdefault(source, {"lines": 0, "rate_limited": 0, "server_dropped": 0})
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {source: dict(counter) for source, counter in self.counters.items()}
+
+    def _tail_url(self, query: str, start_ns: int) -> str:
+        base = self.client.loki_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+        params = {"query": query, "delay_for": 0, "limit": DEFAULT_BATCH_SIZE, "start": start_ns}
+        return f"{base}/loki/api/v1/tail?{urllib.parse.urlencode(params)}"
+
+    def _admit(self, source: str) -> bool:
+        """Token bucket shared by every source; called with the lock held."""
+        now = time.monotonic()
+        self._tokens = min(self.max_rate, self._tokens + (now - self._refilled) * self.max_rate)
+        self._refilled = now
+        counter = self._counter(source)
+        if self._tokens < 1:
+            counter["rate_limited"] += 1
+            return False
+        self._tokens -= 1
+        counter["lines"] += 1
+        return True
+
+    def _ingest(self, message: Dict[str, Any]) -> Optional[int]:
+        newest = None
+        arrived = time.monotonic()
+        with self._lock:
+            for stream in message.get("streams") or []:
+                source = _source(stream.get("stream") or {})
+                for ts, line in stream.get("values") or []:
+                    ts = int(ts)
+                    newest = max(newest or ts, ts)
+                    if self._admit(source):
+                        self._sequence += 1
+                        heapq.heappush(self._heap, (ts, self._sequence, arrived, LogLine(_to_datetime(ts), line, source)))
+            for dropped in message.get("dropped_entries") or []:
+                self._counter(_source(dropped.get("labels") or {}))["server_dropped"] += 1
+            if newest is not None:
+                self._newest = max(self._newest, newest)
+        return newest
+
+    def _run(self, query: str) -> None:
+        # Without a start Loki replays its default lookback, so even a reconnect before the
+        # first line resumes from when the tail began.
+        last_ns = time.time_ns() - 1
+        while not self._closed.is_set():
+            try:
+                ws = websocket.create_connection(self._tail_url(query, last_ns + 1), timeout=TAIL_CONNECT_TIMEOUT)
+                ws.settimeout(TAIL_PING_INTERVAL)
+                self._sockets[query] = ws
+                awaiting_pong = False
+                while not self._closed.is_set():
+                    try:
+                        opcode, payload = ws.recv_data(control_frame=True)
+                    except websocket.WebSocketTimeoutException:
+                        if awaiting_pong:
+                            break
+                        ws.ping()
+                        awaiting_pong = True
+                        continue
+                    awaiting_pong = False
+                    if opcode == websocket.ABNF.OPCODE_CLOSE:
+                        break
+                    if opcode not in (websocket.ABNF.OPCODE_TEXT, websocket.ABNF.OPCODE_BINARY):
+                        continue
+                    newest = self._ingest(json.loads(payload))
+                    if newest is not None:
+                        last_ns = max(last_ns, newest)
+            except Exception:
+                pass
+            finally:
+                ws = self._sockets.pop(query, None)
+                if ws is not None:
+                    try:
+                        ws.close()
+                    except Exception:
+                        pass
+            if not self._closed.is_set():
+                time.sleep(TAIL_RECONNECT_DELAY)
+
+    def read(self, max_lines: int = 1000) -> List[LogLine]:
+        """Return entries that are past the reorder window, oldest first."""
+        lines = []
+        window_ns = int(self.reorder_window * 1e9)
+        held_until = time.monotonic() - self.reorder_window
+        with self._lock:
+            while self._heap and len(lines) < max_lines:
+                ts, _, arrived, line = self._heap[0]
+                if ts > self._newest - window_ns and arrived > held_until:
+                    break
+                heapq.heappop(self._heap)
+                lines.append(line)
+        return lines
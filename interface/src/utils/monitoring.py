@@ -1,13 +1,164 @@
-import requests
-from typing import Dict, Any, Optional
+import contextlib
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from utils.cache import TTLCache, DEFAULT_TTL, DEFAULT_MAX_ENTRIES
+from utils.transport import HTTPTransport, get_transport, DEFAULT_POOL_MAXSIZE
+
+# Upper bound on PromQL queries in flight at once, matched to the transport's pool size.
+MAX_CONCURRENT_QUERIES = DEFAULT_POOL_MAXSIZE
+
+_query_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_QUERIES, thread_name_prefix="promql")
+
+# Query results shared by every Streamlit session in the process. A query is sent to
+# Prometheus at most once per TTL, however many dashboards are polling it.
+_query_cache = TTLCache(ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES)
+
+def get_query_cache() -> TTLCache:
+    return _query_cache
+
+def configure_query_cache(ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES) -> TTLCache:
+    """Change the TTL and size of the shared query cache, dropping what it holds."""
+    _query_cache.ttl = ttl
+    _query_cache.max_entries = max_entries
+    _query_cache.invalidate()
+    return _query_cache
+
+# PromQL templates for every value that makes up a container snapshot. Each one is
+# aggregated by container name so a single query serves one container or the whole fleet.
+CONTAINER_QUERIES = {
+    "cpu_usage": 'sum by (name) (rate(container_cpu_usage_seconds_total{{{selector}}}[5m])) * 100',
+    "memory_usage": 'sum by (name) (container_memory_usage_bytes{{{selector}}})',
+    "memory_limit": 'max by (name) (container_spec_memory_limit_bytes{{{selector}}})',
+    "disk_usage": 'sum by (name) (container_fs_usage_bytes{{{selector}}})',
+    "network_receive": 'sum by (name) (rate(container_network_receive_bytes_total{{{selector}}}[5m]))',
+    "network_transmit": 'sum by (name) (rate(container_network_transmit_bytes_total{{{selector}}}[5m]))',
+    "io_read": 'sum by (name) (rate(container_fs_reads_bytes_total{{{selector}}}[5m]))',
+    "io_write": 'sum by (name) (rate(container_fs_writes_bytes_total{{{selector}}}[5m]))',
+    "processes": 'sum by (name) (container_processes{{{selector}}})',
+    "cpu_periods": 'sum by (name) (container_cpu_cfs_periods_total{{{selector}}})',
+    "cpu_throttled_periods": 'sum by (name) (container_cpu_cfs_throttled_periods_total{{{selector}}})',
+}
+
+# PromQL templates for the charted history, already scaled to the units shown on the dashboard.
+HISTORY_QUERIES = {
+    "cpu_usage": CONTAINER_QUERIES["cpu_usage"],
+    "memory_usage": '100 * sum by (name) (container_memory_usage_bytes{{{selector}}})'
+                    ' / max by (name) (container_spec_memory_limit_bytes{{{selector}}} > 0)',
+    "disk_usage": CONTAINER_QUERIES["disk_usage"] + ' / 1048576',
+    "processes": CONTAINER_QUERIES["processes"],
+    "network_receive": CONTAINER_QUERIES["network_receive"] + ' / 1024',
+    "network_transmit": CONTAINER_QUERIES["network_transmit"] + ' / 1024',
+    "io_read": CONTAINER_QUERIES["io_read"] + ' / 1048576',
+    "io_write": CONTAINER_QUERIES["io_write"] + ' / 1048576',
+}
+
+# Most points kept per series for a history window (3h of 1s samples); the step grows
+# with the window beyond that. Prometheus caps range queries at 11,000 points.
+MAX_HISTORY_POINTS = 10800
+MIN_HISTORY_STEP = 1
+
+def history_step(window_seconds: float) -> int:
+    """Pick a range query step that keeps a window under MAX_HISTORY_POINTS samples."""
+    return max(MIN_HISTORY_STEP, math.ceil(window_seconds / MAX_HISTORY_POINTS))
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+def name_selector(container_names: Optional[Iterable[str]] = None) -> str:
+    """Build a label selector matching exactly the given container names, or every named container."""
+    names = sorted(set(container_names or []))
+    if not names:
+        return 'name!=""'
+    if len(names) == 1:
+        return f'name="{_escape_label_value(names[0])}"'
+    # PromQL regex matchers are fully anchored, so escaped alternatives only match whole names.
+    return f'name=~"{_escape_label_value("|".join(re.escape(name) for name in names))}"'
+
+def container_queries(container_name: str, *keys: str) -> Dict[str, str]:
+    """Render the snapshot queries for a container, optionally limited to the given keys."""
+    return fleet_queries([container_name], *keys)
+
+def fleet_queries(container_names: Optional[Iterable[str]] = None, *keys: str) -> Dict[str, str]:
+    """Render the snapshot queries for several containers (all when none given)."""
+    selector = name_selector(container_names)
+    return {key: CONTAINER_QUERIES[key].format(selector=selector) for key in (keys or CONTAINER_QUERIES)}
+
+def format_cpu_usage(cpu_usage: Optional[float]) -> Optional[float]:
+    return round(cpu_usage, 2) if cpu_usage is not None else None
+
+def format_memory_usage(usage: Optional[float], limit: Optional[float]) -> Dict[str, Optional[float]]:
+    usage_mb = round(usage / (1024 * 1024), 2) if usage is not None else None
+    limit_mb = round(limit / (1024 * 1024), 2) if limit is not None else None
+    percentage = round((usage / limit) * 100, 2) if usage is not None and limit is not None and limit > 0 else None
+
+    return {
+        "usage_mb": usage_mb,
+        "limit_mb": float(0) if limit_mb == float(0) else limit_mb,
+        "percentage": percentage
+    }
+
+def format_disk_usage(disk_usage: Optional[float]) -> Optional[float]:
+    return round(disk_usage / (1024 * 1024), 2) if disk_usage is not None else None
+
+def format_network_traffic(receive: Optional[float], transmit: Optional[float]) -> Dict[str, Optional[float]]:
+    return {
+        "receive": round(receive / 1024, 2) if receive is not None else None,
+        "transmit": round(transmit / 1024, 2) if transmit is not None else None
+    }
+
+def format_io_usage(read: Optional[float], write: Optional[float]) -> Dict[str, Optional[float]]:
+    return {
+        "read": round(read / (1024 * 1024), 2) if read is not None else None,
+        "write": round(write / (1024 * 1024), 2) if write is not None else None
+    }
+
+def format_processes(processes: Optional[float]) -> Optional[int]:
+    return int(processes) if processes is not None else None
+
+def format_cpu_throttling(periods: Optional[float], throttled_periods: Optional[float]) -> Dict[str, Optional[float]]:
+    throttling_ratio = (throttled_periods / periods) * 100 if periods is not None and throttled_periods is not None and periods > 0 else None
+
+    return {
+        "periods": periods,
+        "throttled_periods": throttled_periods,
+        "throttling_ratio": round(throttling_ratio, 2) if throttling_ratio is not None else None
+    }
+
+def format_container_metrics(values: Dict[str, Optional[float]]) -> Dict[str, Any]:
+    """Build the container metrics dict from raw snapshot values keyed like CONTAINER_QUERIES."""
+    return {
+        "cpu_usage": format_cpu_usage(values["cpu_usage"]),
+        "memory_usage": format_memory_usage(values["memory_usage"], values["memory_limit"]),
+        "disk_usage": format_disk_usage(values["disk_usage"]),
+        "network_traffic": format_network_traffic(values["network_receive"], values["network_transmit"]),
+        "io_usage": format_io_usage(values["io_read"], values["io_write"]),
+        "processes": format_processes(values["processes"]),
+        "cpu_throttling": format_cpu_throttling(values["cpu_periods"], values["cpu_throttled_periods"])
+    }
 
 class PrometheusMonitor:
-    def __init__(self, prometheus_url: str = "http://localhost:9090"):
+    def __init__(self, prometheus_url: str = "http://localhost:9090", transport: Optional[HTTPTransport] = None,
+                 cache: Optional[TTLCache] = None):
         self.prometheus_url = prometheus_url
+        self._transport = transport
+        self.cache = cache
+
+    @property
+    def transport(self) -> HTTPTransport:
+        return self._transport or get_transport()
 
     def query(self, query: str) -> Dict[str, Any]:
         """Execute a PromQL query and return the result."""
-        response = requests.get(f"{self.prometheus_url}/api/v1/query", params={"query": query})
+        if self.cache is None:
+            return self._query(query)
+        return self.cache.get_or_load((self.prometheus_url, query), lambda: self._query(query))
+
+    def _query(self, query: str) -> Dict[str, Any]:
+        response = self.transport.get(f"{self.prometheus_url}/api/v1/query", params={"query": query})
         response.raise_for_status()
         return response.json()
 
@@ -18,92 +169,266 @@ class PrometheusMonitor:
             return float(result["data"]["result"][0]["value"][1])
         return None
 
+    def query_range(self, query: str, start: float, end: float, step: float) -> Dict[str, Any]:
+        """Execute a PromQL range query and return the result."""
+        response = self.transport.get(f"{self.prometheus_url}/api/v1/query_range",
+                                      params={"query": query, "start": start, "end": end, "step": step})
+        response.raise_for_status()
+        return response.json()
+
+    def get_range_values(self, query: str, start: float, end: float, step: float) -> List[Tuple[float, float]]:
+        """Get the (timestamp, value) samples of the first series of a range query."""
+        result = self.query_range(query, start, end, step)
+        if result["status"] != "success" or not result["data"]["result"]:
+            return []
+        samples = ((float(ts), float(value)) for ts, value in result["data"]["result"][0]["values"])
+        return [(ts, round(value, 2)) for ts, value in samples if math.isfinite(value)]
+
+    def get_vector(self, query: str) -> Dict[str, float]:
+        """Get the value of every series of a query that is grouped by container name."""
+        result = self.query(query)
+        if result["status"] != "success":
+            return {}
+        return {series["metric"]["name"]: float(series["value"][1])
+                for series in result["data"]["result"] if "name" in series["metric"]}
+
+    def get_metric_values(self, queries: Dict[str, str]) -> Dict[str, Optional[float]]:
+        """Run several queries concurrently and return their values under the same keys."""
+        futures = {key: _query_executor.submit(self.get_metric_value, query) for key, query in queries.items()}
+        return {key: future.result() for key, future in futures.items()}
+
     def get_container_cpu_usage(self, container_name: str) -> Optional[float]:
         """Get the current CPU usage of a specific container as a percentage."""
-        query = f'sum(rate(container_cpu_usage_seconds_total{{name=~".*{container_name}.*"}}[5m])) * 100'
-        cpu_usage = self.get_metric_value(query)
-        return round(cpu_usage, 2) if cpu_usage is not None else None
+        query = container_queries(container_name, "cpu_usage")["cpu_usage"]
+        return format_cpu_usage(self.get_metric_value(query))
 
     def get_container_memory_usage(self, container_name: str) -> Dict[str, Optional[float]]:
         """Get the current memory usage of a specific container."""
-        usage_query = f'container_memory_usage_bytes{{name=~".*{container_name}.*"}}'
-        limit_query = f'container_spec_memory_limit_bytes{{name=~".*{container_name}.*"}}'
-        
-        usage = self.get_metric_value(usage_query)
-        limit = self.get_metric_value(limit_query)
-        
-        usage_mb = round(usage / (1024 * 1024), 2) if usage is not None else None
-        limit_mb = round(limit / (1024 * 1024), 2) if limit is not None else None
-        percentage = round((usage / limit) * 100, 2) if usage is not None and limit is not None and limit > 0 else None
-        
-        return {
-            "usage_mb": usage_mb,
-            "limit_mb": float(0) if limit_mb == float(0) else limit_mb,
-            "percentage": percentage
-        }
+        values = self.get_metric_values(container_queries(container_name, "memory_usage", "memory_limit"))
+        return format_memory_usage(values["memory_usage"], values["memory_limit"])
 
     def get_container_disk_usage(self, container_name: str) -> Optional[float]:
         """Get the current disk usage of a specific container in MB."""
-        query = f'container_fs_usage_bytes{{name=~".*{container_name}.*"}}'
-        disk_usage = self.get_metric_value(query)
-        return round(disk_usage / (1024 * 1024), 2) if disk_usage is not None else None
+        query = container_queries(container_name, "disk_usage")["disk_usage"]
+        return format_disk_usage(self.get_metric_value(query))
 
     def get_container_network_traffic(self, container_name: str) -> Dict[str, Optional[float]]:
         """Get the current network traffic of a specific container in KB/s."""
-        receive_query = f'rate(container_network_receive_bytes_total{{name=~".*{container_name}.*"}}[5m])'
-        transmit_query = f'rate(container_network_transmit_bytes_total{{name=~".*{container_name}.*"}}[5m])'
-        
-        receive = self.get_metric_value(receive_query)
-        transmit = self.get_metric_value(transmit_query)
-        
-        return {
-            "receive": round(receive / 1024, 2) if receive is not None else None,
-            "transmit": round(transmit / 1024, 2) if transmit is not None else None
-        }
+        values = self.get_metric_values(container_queries(container_name, "network_receive", "network_transmit"))
+        return format_network_traffic(values["network_receive"], values["network_transmit"])
 
     def get_container_io_usage(self, container_name: str) -> Dict[str, Optional[float]]:
         """Get the current I/O usage of a specific container in MB/s."""
-        read_query = f'rate(container_fs_reads_bytes_total{{name=~".*{container_name}.*"}}[5m])'
-        write_query = f'rate(container_fs_writes_bytes_total{{name=~".*{container_name}.*"}}[5m])'
-        
-        read = self.get_metric_value(read_query)
-        write = self.get_metric_value(write_query)
-        
-        return {
-            "read": round(read / (1024 * 1024), 2) if read is not None else None,
-            "write": round(write / (1024 * 1024), 2) if write is not None else None
-        }
+        values = self.get_metric_values(container_queries(container_name, "io_read", "io_write"))
+        return format_io_usage(values["io_read"], values["io_write"])
 
     def get_container_processes(self, container_name: str) -> Optional[int]:
         """Get the number of processes running inside the container."""
-        query = f'container_processes{{name=~".*{container_name}.*"}}'
-        return int(self.get_metric_value(query)) if self.get_metric_value(query) is not None else None
+        query = container_queries(container_name, "processes")["processes"]
+        return format_processes(self.get_metric_value(query))
 
     def get_container_cpu_throttling(self, container_name: str) -> Dict[str, Optional[float]]:
         """Get CPU throttling information for the container."""
-        periods_query = f'container_cpu_cfs_periods_total{{name=~".*{container_name}.*"}}'
-        throttled_periods_query = f'container_cpu_cfs_throttled_periods_total{{name=~".*{container_name}.*"}}'
-        
-        periods = self.get_metric_value(periods_query)
-        throttled_periods = self.get_metric_value(throttled_periods_query)
-        
-        throttling_ratio = (throttled_periods / periods) * 100 if periods is not None and throttled_periods is not None and periods > 0 else None
-        
-        return {
-            "periods": periods,
-            "throttled_periods": throttled_periods,
-            "throttling_ratio": round(throttling_ratio, 2) if throttling_ratio is not None else None
-        }
+        values = self.get_metric_values(container_queries(container_name, "cpu_periods", "cpu_throttled_periods"))
+        return format_cpu_throttling(values["cpu_periods"], values["cpu_throttled_periods"])
+
+    def get_container_snapshot(self, container_name: str) -> Dict[str, Optional[float]]:
+        """Fetch every raw value of a container snapshot in a single concurrent round."""
+        return self.get_metric_values(container_queries(container_name))
+
+    def get_container_history(self, container_name: str, start: float, end: float, step: float) -> Dict[str, List[Tuple[float, float]]]:
+        """Fetch the charted history of a container between start and end, one range query per series."""
+        selector = name_selector([container_name])
+        futures = {key: _query_executor.submit(self.get_range_values, template.format(selector=selector), start, end, step)
+                   for key, template in HISTORY_QUERIES.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+    def get_fleet_snapshot(self, container_names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Optional[float]]]:
+        """Fetch raw snapshot values for many containers with one query per metric."""
+        # Read twice below (query building and the result keys), so a generator must be materialized.
+        container_names = list(container_names) if container_names is not None else None
+        queries = fleet_queries(container_names)
+        futures = {key: _query_executor.submit(self.get_vector, query) for key, query in queries.items()}
+        vectors = {key: future.result() for key, future in futures.items()}
+
+        names = set(container_names) if container_names else set().union(*vectors.values())
+        return {name: {key: vectors[key].get(name) for key in queries} for name in sorted(names)}
+
+_monitor: Optional[PrometheusMonitor] = None
+
+def get_monitor() -> PrometheusMonitor:
+    """Return the shared PrometheusMonitor used by the module-level helpers."""
+    global _monitor
+    if _monitor is None:
+        _monitor = PrometheusMonitor(cache=_query_cache)
+    return _monitor
+
+def configure_monitor(prometheus_url: str) -> PrometheusMonitor:
+    """Point the shared monitor at another Prometheus (cached query results are dropped)."""
+    global _monitor
+    _query_cache.invalidate()
+    _monitor = PrometheusMonitor(prometheus_url, cache=_query_cache)
+    return _monitor
 
 def get_container_metrics(container_name: str) -> Dict[str, Any]:
     """Get all container metrics in one call."""
-    monitor = PrometheusMonitor()
+    return format_container_metrics(get_monitor().get_container_snapshot(container_name))
+
+def get_fleet_metrics(container_names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Get all metrics for many containers (every named container when none given), keyed by name."""
+    snapshot = get_monitor().get_fleet_snapshot(container_names)
+    return {name: format_container_metrics(values) for name, values in snapshot.items()}
+
+# Seconds a live stats stream keeps running after its container was last read.
+LIVE_IDLE_TIMEOUT = 30.0
+LIVE_RECONNECT_DELAY = 1.0
+
+def _blkio_bytes(stats: Dict[str, Any], op: str) -> Optional[float]:
+    entries = (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive")
+    if entries is None:
+        return None
+    return float(sum(e.get("value", 0) for e in entries if e.get("op", "").lower() == op))
+
+def _network_bytes(stats: Dict[str, Any], field: str) -> Optional[float]:
+    networks = stats.get("networks")
+    if networks is None:
+        return None
+    return float(sum(n.get(field, 0) for n in networks.values()))
+
+def _rate(current: Optional[float], previous: Optional[float], interval: float) -> Optional[float]:
+    if current is None or previous is None or interval <= 0:
+        return None
+    return max(0.0, (current - previous) / interval)
+
+def live_values(stats: Dict[str, Any], previous: Optional[Dict[str, Any]], interval: float) -> Dict[str, Optional[float]]:
+    """Compute raw snapshot values, keyed like CONTAINER_QUERIES, from Docker stats samples.
+
+    CPU usage comes from the stream's own precpu_stats; network and block I/O rates
+    are deltas against the previous sample taken interval seconds earlier.
+    """
+    cpu, precpu = stats.get("cpu_stats") or {}, stats.get("precpu_stats") or {}
+    cpu_delta = cpu.get("cpu_usage", {}).get("total_usage", 0) - precpu.get("cpu_usage", {}).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    online_cpus = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+    cpu_usage = (cpu_delta / system_delta) * online_cpus * 100 if system_delta > 0 and cpu_delta >= 0 else None
+
+    memory = stats.get("memory_stats") or {}
+    usage = memory.get("usage")
+    if usage is not None:
+        # Same accounting as `docker stats`: page cache that can be reclaimed is not usage.
+        details = memory.get("stats") or {}
+        usage -= details.get("total_inactive_file", details.get("inactive_file", 0))
+
+    throttling = cpu.get("throttling_data") or {}
+    previous = previous or {}
+
     return {
-        "cpu_usage": monitor.get_container_cpu_usage(container_name),
-        "memory_usage": monitor.get_container_memory_usage(container_name),
-        "disk_usage": monitor.get_container_disk_usage(container_name),
-        "network_traffic": monitor.get_container_network_traffic(container_name),
-        "io_usage": monitor.get_container_io_usage(container_name),
-        "processes": monitor.get_container_processes(container_name),
-        "cpu_throttling": monitor.get_container_cpu_throttling(container_name)
-    }
\ No newline at end of file
+        "cpu_usage": cpu_usage,
+        "memory_usage": usage,
+        "memory_limit": memory.get("limit"),
+        "disk_usage": None,
+        "network_receive": _rate(_network_bytes(stats, "rx_bytes"), _network_bytes(previous, "rx_bytes"), interval),
+        "network_transmit": _rate(_network_bytes(stats, "tx_bytes"), _network_bytes(previous, "tx_bytes"), interval),
+        "io_read": _rate(_blkio_bytes(stats, "read"), _blkio_bytes(previous, "read"), interval),
+        "io_write": _rate(_blkio_bytes(stats, "write"), _blkio_bytes(previous, "write"), interval),
+        "processes": (stats.get("pids_stats") or {}).get("current"),
+        "cpu_periods": throttling.get("periods"),
+        "cpu_throttled_periods": throttling.get("throttled_periods"),
+    }
+
+class LiveStatsCollector:
+    """Background readers of the Docker stats stream, one thread per watched container.
+
+    Numbers are at most about a second old and do not depend on Prometheus. A
+    reader stops on its own once nobody has asked for its container for
+    idle_timeout seconds, or at once if the container does not exist.
+    """
+
+    def __init__(self, docker_manager=None, idle_timeout: float = LIVE_IDLE_TIMEOUT):
+        self._docker_manager = docker_manager
+        self.idle_timeout = idle_timeout
+        self._latest: Dict[str, Tuple[float, Dict[str, Optional[float]]]] = {}
+        self._last_read: Dict[str, float] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def docker_manager(self):
+        if self._docker_manager is None:
+            from utils.dockermanager import get_docker_manager
+            self._docker_manager = get_docker_manager()
+        return self._docker_manager
+
+    def watch(self, container_name: str) -> None:
+        """Start streaming stats for a container unless it is already streaming."""
+        with self._lock:
+            self._last_read[container_name] = time.monotonic()
+            thread = self._threads.get(container_name)
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target=self._run, args=(container_name,),
+                                          name=f"live-stats-{container_name}", daemon=True)
+                self._threads[container_name] = thread
+                thread.start()
+
+    def get_values(self, container_name: str) -> Optional[Tuple[float, Dict[str, Optional[float]]]]:
+        """Return the (timestamp, raw values) of the latest sample, or None before the first one."""
+        self.watch(container_name)
+        with self._lock:
+            return self._latest.get(container_name)
+
+    def pop_error(self, container_name: str) -> Optional[str]:
+        """Why the reader of a container gave up, if it did; cleared so the next watch tries again."""
+        with self._lock:
+            return self._errors.pop(container_name, None)
+
+    def _idle(self, container_name: str) -> bool:
+        with self._lock:
+            return time.monotonic() - self._last_read.get(container_name, 0) > self.idle_timeout
+
+    def _run(self, container_name: str) -> None:
+        from docker.errors import NotFound
+
+        while not self._idle(container_name):
+            previous, previous_time = None, None
+            try:
+                with contextlib.closing(self.docker_manager.stream_container_stats(container_name)) as stream:
+                    for stats in stream:
+                        now = time.time()
+                        interval = now - previous_time if previous_time is not None else 0
+                        values = live_values(stats, previous, interval)
+                        previous, previous_time = stats, now
+                        with self._lock:
+                            self._latest[container_name] = (now, values)
+                        if self._idle(container_name):
+                            break
+                    else:
+                        # The stream ended, usually because the container stopped.
+                        time.sleep(LIVE_RECONNECT_DELAY)
+            except NotFound:
+                with self._lock:
+                    self._errors[container_name] = f"Container {container_name} does not exist"
+                break
+            except Exception:
+                time.sleep(LIVE_RECONNECT_DELAY)
+
+        with self._lock:
+            self._latest.pop(container_name, None)
+            if self._threads.get(container_name) is threading.current_thread():
+                del self._threads[container_name]
+
+_live_collector = LiveStatsCollector()
+
+def get_live_collector() -> LiveStatsCollector:
+    return _live_collector
+
+def get_live_container_metrics(container_name: str) -> Optional[Dict[str, Any]]:
+    """Get container metrics straight from the Docker stats stream, or None until the first sample arrives.
+
+    Raises LookupError if the container does not exist.
+    """
+    error = _live_collector.pop_error(container_name)
+    if error is not None:
+        raise LookupError(error)
+    sample = _live_collector.get_values(container_name)
+    return format_container_metrics(sample[1]) if sample is not None else None
@@ -0,0 +1,189 @@
+# utils/registry.py
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import docker
+
+# Container events that cannot change what the registry holds.
+IGNORED_ACTIONS = ("exec_create", "exec_start", "exec_die", "exec_detach", "top", "resize", "attach", "archive-path")
+RECONNECT_DELAY = 1.0
+# States listed without all=True, as `docker ps` does: the daemon counts paused and restarting containers as running.
+ACTIVE_STATES = ("running", "paused", "restarting")
+
+def _summarize(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn an entry of the container list API into the registry's record."""
+    ports = []
+    for port in raw.get("Ports") or []:
+        mapping = f"{port['PublicPort']}:{port['PrivatePort']}" if port.get("PublicPort") else None
+        if mapping and mapping not in ports:
+            ports.append(mapping)
+    networks = (raw.get("NetworkSettings") or {}).get("Networks") or {}
+    return {
+        "id": raw["Id"],
+        "name": (raw.get("Names") or ["/"])[0].lstrip("/"),
+        "status": raw.get("State"),
+        "ports": ports,
+        "networks": set(networks),
+    }
+
+def _public(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": record["id"], "name": record["name"], "status": record["status"], "ports": list(record["ports"])}
+
+class ContainerRegistry:
+    """In-memory view of every container on the host, kept current from the Docker event stream.
+
+    The registry is seeded with a single list call and then only touches the
+    API when an event names a container, so lookups by name, id or network
+    cost no API calls at all. Every change bumps `version`, which the UI
+    waits on to redraw only when something changed.
+    """
+
+    def __init__(self, client: docker.DockerClient):
+        self.client = client
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_name: Dict[str, str] = {}
+        self._by_network: Dict[str, Set[str]] = {}
+        self.version = 0
+        self._condition = threading.Condition()
+        # Serializes start() without holding the condition, so readers never wait on its API calls.
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._events = None
+
+    # Lifecycle
+    def start(self) -> "ContainerRegistry":
+        """Seed the registry and start following events; a no-op when already running."""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._events = self._open_events()
+            self._seed()
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._follow, name="container-registry", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._events is not None:
+            try:
+                self._events.close()
+            except Exception:
+                pass
+
+    def _open_events(self):
+        # Subscribe before listing so nothing that happens in between is missed.
+        return self.client.events(decode=True, filters={"type": ["container", "network"]})
+
+    def _seed(self) -> None:
+        records = [_summarize(raw) for raw in self.client.api.containers(all=True)]
+        with self._condition:
+            seen = {record["id"] for record in records}
+            for container_id in list(self._by_id):
+                if container_id not in seen:
+                    self._remove(container_id)
+            for record in records:
+                self._put(record)
+            self._condition.notify_all()
+
+    def _follow(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                for event in self._events:
+                    if self._stopped.is_set():
+                        break
+                    self._handle(event)
+            except Exception:
+                pass
+            if self._stopped.is_set():
+                break
+            time.sleep(RECONNECT_DELAY)
+            try:
+                self._events = self._open_events()
+                self._seed()
+            except Exception:
+                continue
+
+    def _handle(self, event: Dict[str, Any]) -> None:
+        action = (event.get("Action") or event.get("status") or "").split(":")[0]
+        attributes = (event.get("Actor") or {}).get("Attributes") or {}
+        if event.get("Type") == "network":
+            container_id = attributes.get("container")
+        else:
+            container_id = (event.get("Actor") or {}).get("ID") or event.get("id")
+        if not container_id or action in IGNORED_ACTIONS:
+            return
+
+        if action == "destroy":
+            with self._condition:
+                self._remove(container_id)
+                self._condition.notify_all()
+            return
+
+        raw = self.client.api.containers(all=True, filters={"id": container_id})
+        with self._condition:
+            if raw:
+                self._put(_summarize(raw[0]))
+            else:
+                self._remove(container_id)
+            self._condition.notify_all()
+
+    # Index maintenance, called with the lock held
+    def _put(self, record: Dict[str, Any]) -> None:
+        previous = self._by_id.get(record["id"])
+        if previous == record:
+            return
+        if previous is not None:
+            self._unindex(previous)
+        self._by_id[record["id"]] = record
+        self._by_name[record["name"]] = record["id"]
+        for network in record["networks"]:
+            self._by_network.setdefault(network, set()).add(record["id"])
+        self.version += 1
+
+    def _remove(self, container_id: str) -> None:
+        record = self._by_id.pop(container_id, None)
+        if record is not None:
+            self._unindex(record)
+            self.version += 1
+
+    def _unindex(self, record: Dict[str, Any]) -> None:
+        if self._by_name.get(record["name"]) == record["id"]:
+            del self._by_name[record["name"]]
+        for network in record["networks"]:
+            members = self._by_network.get(network)
+            if members is not None:
+                members.discard(record["id"])
+                if not members:
+                    del self._by_network[network]
+
+    # Lookups
+    def get_by_id(self, container_id: str) -> Optional[Dict[str, Any]]:
+        with self._condition:
+            record = self._by_id.get(container_id)
+            return _public(record) if record is not None else None
+
+    def get_by_name(self, container_name: str) -> Optional[Dict[str, Any]]:
+        with self._condition:
+            container_id = self._by_name.get(container_name)
+            return _public(self._by_id[container_id]) if container_id is not None else None
+
+    def list(self, all: bool = False, networks: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """List containers like DockerManager.list_containers, without calling the API."""
+        with self._condition:
+            if networks:
+                ids = set().union(*(self._by_network.get(n, set()) for n in networks))
+                records = [self._by_id[i] for i in ids]
+            else:
+                records = list(self._by_id.values())
+            return [_public(r) for r in sorted(records, key=lambda r: r["name"])
+                    if all or r["status"] in ACTIVE_STATES]
+
+    def wait_for_change(self, since: int, timeout: Optional[float] = None) -> int:
+        """Block until the registry moves past version since (or timeout) and return the version."""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version > since, timeout=timeout)
+            return self.version
@@ -0,0 +1,185 @@
+# utils/scenario.py
+
+import bisect
+import os
+import random
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urljoin
+
+import yaml
+
+from utils.helpers import get_project_root
+from utils.loadgen import DEFAULT_TIMEOUT, RequestSpec
+
+SCENARIO_DIR = os.path.join(get_project_root(), "..", "..", "config", "benchmarks")
+
+# SLO keys a stage may set: latency limits come from the stage's latency summary.
+LATENCY_SLOS = ("mean_ms", "p50_ms", "p90_ms", "p99_ms", "p99_9_ms", "max_ms")
+SLO_KEYS = LATENCY_SLOS + ("error_rate", "min_rps")
+REQUEST_OPTIONS = ("headers", "params", "json", "data", "cookies")
+
+class ScenarioError(ValueError):
+    """A scenario file that cannot be run as written."""
+
+def _positive(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+
+class RequestMix:
+    """Picks requests by weight; a picklable request factory for the load generator."""
+
+    def __init__(self, requests: List[Dict[str, Any]], base_url: str):
+        self.requests = requests
+        self.base_url = base_url
+        self.specs = []
+        self.cumulative = []
+        total = 0.0
+        for request in requests:
+            total += request.get("weight", 1)
+            self.cumulative.append(total)
+            kwargs = {option: request[option] for option in REQUEST_OPTIONS if option in request}
+            if "body" in request:
+                kwargs["data"] = request["body"]
+            self.specs.append((request.get("method", "GET").upper(), urljoin(base_url, request.get("path", "")), kwargs))
+        self.total = total
+
+    def __call__(self) -> RequestSpec:
+        return self.specs[bisect.bisect_right(self.cumulative, random.random() * self.total)]
+
+class Ramp:
+    """Arrival rate moving linearly from start to end over a stage."""
+
+    def __init__(self, start: float, end: float, duration: float):
+        self.start = start
+        self.end = end
+        self.duration = duration
+
+    def __call__(self, elapsed: float) -> float:
+        progress = min(1.0, elapsed / self.duration) if self.duration > 0 else 1.0
+        return self.start + (self.end - self.start) * progress
+
+class Stage:
+    """One phase of a scenario: open-model rate (constant or ramped) or closed-model concurrency."""
+
+    def __init__(self, name: str, duration: float, rate: Union[None, float, Ramp] = None,
+                 concurrency: Optional[int] = None, slo: Optional[Dict[str, float]] = None):
+        self.name = name
+        self.duration = duration
+        self.rate = rate
+        self.concurrency = concurrency
+        self.slo = slo or {}
+
+    def describe(self) -> str:
+        if isinstance(self.rate, Ramp):
+            return f"{self.rate.start:g} → {self.rate.end:g} req/s for {self.duration:g}s"
+        if self.rate is not None:
+            return f"{self.rate:g} req/s for {self.duration:g}s"
+        return f"{self.concurrency} connections for {self.duration:g}s"
+
+    def check_slo(self, summary: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Compare a stage's load summary with its SLO thresholds."""
+        checks = {}
+        for key, limit in self.slo.items():
+            if key in LATENCY_SLOS:
+                actual = summary["latency"].get(key)
+                passed = actual is not None and actual <= limit
+            elif key == "error_rate":
+                actual = summary["error_rate"]
+                passed = actual <= limit
+            else:
+                actual = summary["requests_per_second"]
+                passed = actual >= limit
+            checks[key] = {"limit": limit, "actual": actual, "passed": passed}
+        return checks
+
+class Scenario:
+    """A named request mix played through a sequence of load stages."""
+
+    def __init__(self, name: str, base_url: str, requests: List[Dict[str, Any]], stages: List[Stage],
+                 timeout: float = DEFAULT_TIMEOUT, source: str = ""):
+        self.name = name
+        self.base_url = base_url
+        self.requests = requests
+        self.stages = stages
+        self.timeout = timeout
+        self.source = source
+
+    @property
+    def duration(self) -> float:
+        return sum(stage.duration for stage in self.stages)
+
+    def request_mix(self, base_url: Optional[str] = None) -> RequestMix:
+        return RequestMix(self.requests, base_url or self.base_url)
+
+    def params(self) -> Dict[str, Any]:
+        """Parameters identifying this scenario in the benchmark history."""
+        return {"scenario": self.name, "base_url": self.base_url, "timeout": self.timeout,
+                "requests": self.requests,
+                "stages": [{"name": s.name, "load": s.describe(), "slo": s.slo} for s in self.stages]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source: str = "") -> "Scenario":
+        if not isinstance(data, dict):
+            raise ScenarioError("A scenario must be a mapping")
+        defaults = data.get("defaults") or {}
+        requests = []
+        for index, request in enumerate(data.get("requests") or [{"path": ""}]):
+            if not isinstance(request, dict):
+                raise ScenarioError(f"Request {index + 1} must be a mapping")
+            merged = {**defaults, **request}
+            if "headers" in defaults and "headers" in request:
+                merged["headers"] = {**defaults["headers"], **request["headers"]}
+            if not _positive(merged.get("weight", 1)):
+                raise ScenarioError(f"Request {merged.get('name', index + 1)}: weight must be positive")
+            merged.setdefault("name", f"{merged.get('method', 'GET').upper()} {merged.get('path', '/')}")
+            requests.append(merged)
+
+        stages = []
+        for index, stage in enumerate(data.get("stages") or []):
+            if not isinstance(stage, dict):
+                raise ScenarioError(f"Stage {index + 1} must be a mapping")
+            name = stage.get("name", f"stage {index + 1}")
+            duration = stage.get("duration")
+            if not _positive(duration):
+                raise ScenarioError(f"Stage {name}: duration must be a positive number of seconds")
+            rate, concurrency = stage.get("rate"), stage.get("concurrency")
+            if (rate is None) == (concurrency is None):
+                raise ScenarioError(f"Stage {name}: set exactly one of rate or concurrency")
+            if isinstance(rate, list):
+                if len(rate) != 2:
+                    raise ScenarioError(f"Stage {name}: a ramp is [start rate, end rate]")
+                if not all(_positive(r) or (r == 0 and not isinstance(r, bool)) for r in rate):
+                    raise ScenarioError(f"Stage {name}: ramp rates must be non-negative numbers of requests per second")
+                rate = Ramp(float(rate[0]), float(rate[1]), duration)
+            elif rate is not None:
+                if not _positive(rate):
+                    raise ScenarioError(f"Stage {name}: rate must be a positive number of requests per second")
+                rate = float(rate)
+            elif not isinstance(concurrency, int) or isinstance(concurrency, bool) or concurrency <= 0:
+                raise ScenarioError(f"Stage {name}: concurrency must be a positive integer")
+            unknown = set(stage.get("slo") or {}) - set(SLO_KEYS)
+            if unknown:
+                raise ScenarioError(f"Stage {name}: unknown SLO keys {sorted(unknown)}; use {list(SLO_KEYS)}")
+            stages.append(Stage(name, float(duration), rate, concurrency, stage.get("slo")))
+        if not stages:
+            raise ScenarioError("A scenario needs at least one stage")
+
+        return cls(data.get("name", "scenario"), data.get("base_url", "http://localhost:8080"), requests, stages,
+                   timeout=data.get("timeout", DEFAULT_TIMEOUT), source=source)
+
+    @classmethod
+    def from_yaml(cls, text: str) -> "Scenario":
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ScenarioError(f"Invalid YAML: {e}")
+        return cls.from_dict(data, source=text)
+
+def load_scenario(path: str) -> Scenario:
+    with open(path, "r") as f:
+        return Scenario.from_yaml(f.read())
+
+def list_scenarios(directory: str = SCENARIO_DIR) -> List[str]:
+    """Scenario files shipped in config/benchmarks."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith((".yaml", ".yml")))
@@ -0,0 +1,87 @@
+# utils/significance.py
+
+import math
+from typing import Any, Dict, Sequence
+
+from utils.loadgen import LatencyHistogram
+
+def _normal_two_sided(z: float) -> float:
+    return math.erfc(abs(z) / math.sqrt(2))
+
+def _incomplete_beta_fraction(a: float, b: float, x: float) -> float:
+    """Continued fraction for the regularized incomplete beta function (modified Lentz)."""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    fraction = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            fraction *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return fraction
+
+def regularized_beta(a: float, b: float, x: float) -> float:
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _incomplete_beta_fraction(a, b, x) / a
+    return 1.0 - front * _incomplete_beta_fraction(b, a, 1 - x) / b
+
+def student_t_two_sided(t: float, df: float) -> float:
+    """Two-sided p-value of Student's t distribution."""
+    if math.isinf(df):
+        return _normal_two_sided(t)
+    return regularized_beta(df / 2, 0.5, df / (df + t * t))
+
+def welch_t_test(baseline: Sequence[float], candidate: Sequence[float]) -> Dict[str, Any]:
+    """Welch's unequal-variance t-test for a difference in means."""
+    n1, n2 = len(baseline), len(candidate)
+    if n1 < 2 or n2 < 2:
+        return {"t": None, "df": None, "p_value": None, "baseline_mean": None, "candidate_mean": None}
+    m1, m2 = sum(baseline) / n1, sum(candidate) / n2
+    v1 = sum((x - m1) ** 2 for x in baseline) / (n1 - 1)
+    v2 = sum((x - m2) ** 2 for x in candidate) / (n2 - 1)
+    se2 = v1 / n1 + v2 / n2
+    if se2 == 0:
+        p_value = 1.0 if m1 == m2 else 0.0
+        t, df = (0.0 if m1 == m2 else math.copysign(math.inf, m2 - m1)), float(n1 + n2 - 2)
+    else:
+        t = (m2 - m1) / math.sqrt(se2)
+        df = se2 ** 2 / ((v1 / n1) ** 2 / (n1 - 1) + (v2 / n2) ** 2 / (n2 - 1)) if v1 or v2 else math.inf
+        p_value = student_t_two_sided(t, df)
+    return {"t": t, "df": df, "p_value": p_value, "baseline_mean": m1, "candidate_mean": m2}
+
+def mann_whitney(baseline: LatencyHistogram, candidate: LatencyHistogram) -> Dict[str, Any]:
+    """Mann-Whitney U test on two latency histograms, normal approximation with tie correction.
+
+    Samples sharing a histogram bucket (about 1% wide) count as ties. The
+    effect is the probability that a candidate request is slower than a
+    baseline one, ties counting half: 0.5 means no shift.
+    """
+    n1, n2 = baseline.total, candidate.total
+    if not n1 or not n2:
+        return {"u": None, "z": None, "p_value": None, "effect": None}
+
+    rank_sum = 0.0
+    ties = 0.0
+    below = 0
+    for bucket in sorted(set(baseline.counts) | set(candidate.counts)):
+        group = baseline.counts.get(bucket, 0) + candidate.counts.get(bucket, 0)
+        rank_sum += candidate.counts.get(bucket, 0) * (below + (group + 1) / 2)
+        ties += group ** 3 - group
+        below += group
+
+    n = n1 + n2
+    u = rank_sum - n2 * (n2 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    z = (u - n1 * n2 / 2) / math.sqrt(variance) if variance > 0 else 0.0
+    return {"u": u, "z": z, "p_value": _normal_two_sided(z), "effect": u / (n1 * n2)}
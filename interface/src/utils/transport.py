@@ -0,0 +1,82 @@
+# utils/transport.py
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Dict, Optional, Tuple, Union
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_TIMEOUT = (3.05, 10.0)
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF_FACTOR = 0.2
+
+Timeout = Union[float, Tuple[float, float]]
+
+class HTTPTransport:
+    """Pooled, keep-alive HTTP transport shared by the Prometheus clients."""
+
+    def __init__(self,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 timeout: Timeout = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES,
+                 backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                 gzip: bool = True):
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            # Only idempotent requests are resent; a POST may already have taken effect.
+            allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=retry, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Connection": "keep-alive",
+            "Accept-Encoding": "gzip, deflate" if gzip else "identity",
+        })
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[Timeout] = None, **kwargs) -> requests.Response:
+        """Send a GET request over the pooled session."""
+        return self.session.get(url, params=params, timeout=timeout or self.timeout, **kwargs)
+
+    def post(self, url: str, data: Optional[Dict[str, Any]] = None, timeout: Optional[Timeout] = None, **kwargs) -> requests.Response:
+        """Send a POST request over the pooled session."""
+        return self.session.post(url, data=data, timeout=timeout or self.timeout, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+_transport: Optional[HTTPTransport] = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> HTTPTransport:
+    """Return the process-wide transport, creating it on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = HTTPTransport()
+    return _transport
+
+def configure_transport(**kwargs) -> HTTPTransport:
+    """Replace the process-wide transport with one built from the given settings.
+
+    Clients created without an explicit transport look the shared one up on
+    every request, so they switch over too and never use the closed one.
+    """
+    global _transport
+    with _transport_lock:
+        previous, _transport = _transport, HTTPTransport(**kwargs)
+    if previous is not None:
+        previous.close()
+    return _transport